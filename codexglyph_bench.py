@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+CodexGlyph Benchmark Harness
+
+Generates synthetic corpora seeded with known shadow glyphs and
+homophones, times the analysis engine on them and compares the results
+against a saved JSON baseline.
+
+    python codexglyph_bench.py --sizes 10k,1m --save-baseline bench_baseline.json
+    python codexglyph_bench.py --sizes 10k,1m --baseline bench_baseline.json
+
+Each case runs in a fresh interpreter so its peak RSS is its own. The
+exit status is 1 when any case regresses past the threshold.
+"""
+
+import argparse
+import collections
+import json
+import os
+import random
+import sys
+import time
+
+import codexglyph_manual_complete as cg
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "100m": 100_000_000}
+
+# Ordinary words that are neither shadows nor homophones
+NEUTRAL_WORDS = tuple((
+    "the a and of to that with for this from they have will would there "
+    "people time year good work life hand part place case point "
+    "number group problem fact house world family story money water "
+    "state company question school country mother father city market "
+    "paper light table river garden letter simple strong early later "
+    "small large green blue plain clear quiet honest"
+).split())
+
+SHADOW_WORDS = ("information", "experiment", "attention", "object", "undo",
+                "observe", "adjust", "abstract", "impede", "government",
+                "understand", "representative", "illuminate", "irradiate")
+
+HOMOPHONE_WORDS = ("write", "right", "rain", "reign", "meet", "meat", "peace",
+                   "piece", "knight", "night", "week", "weak", "sole", "soul")
+
+SHADOW_RATE = 0.15
+HOMOPHONE_RATE = 0.05
+
+SEARCH_QUERIES = ("tilde", "homophone", "sovereignty score", "prefix*",
+                  "legal OR contract", '"v+cc"', "in", "shadow glyph")
+
+WORDS_PER_LINE = 12
+BLOCK_TOKENS = 100_000
+
+def corpus_path(directory, size_name, seed):
+    return os.path.join(directory, f"corpus-{size_name}-seed{seed}.txt")
+
+def generate_corpus(path, tokens, seed):
+    """Write a synthetic corpus of tokens words and return its expected counts"""
+    for word in NEUTRAL_WORDS:
+        assert not cg.is_shadow(word.upper()) and word.upper() not in cg.HOMOPHONES, word
+    rng = random.Random(seed)
+    vocabulary = NEUTRAL_WORDS + SHADOW_WORDS + HOMOPHONE_WORDS
+    neutral_weight = (1.0 - SHADOW_RATE - HOMOPHONE_RATE) / len(NEUTRAL_WORDS)
+    weights = ([neutral_weight] * len(NEUTRAL_WORDS)
+               + [SHADOW_RATE / len(SHADOW_WORDS)] * len(SHADOW_WORDS)
+               + [HOMOPHONE_RATE / len(HOMOPHONE_WORDS)] * len(HOMOPHONE_WORDS))
+    shadows = homophones = 0
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        remaining = tokens
+        while remaining:
+            block = rng.choices(vocabulary, weights, k=min(BLOCK_TOKENS, remaining))
+            remaining -= len(block)
+            counts = collections.Counter(block)
+            shadows += sum(counts[w] for w in SHADOW_WORDS)
+            homophones += sum(counts[w] for w in HOMOPHONE_WORDS)
+            lines = (" ".join(block[i:i + WORDS_PER_LINE]).capitalize() + ".\n"
+                     for i in range(0, len(block), WORDS_PER_LINE))
+            f.writelines(lines)
+    os.replace(tmp, path)
+    expected = {"tokens": tokens, "shadows": shadows, "homophones": homophones}
+    with open(path + ".json", "w") as f:
+        json.dump(expected, f)
+    return expected
+
+def ensure_corpus(directory, size_name, seed):
+    """Return (path, expected counts), generating the corpus if needed"""
+    os.makedirs(directory, exist_ok=True)
+    path = corpus_path(directory, size_name, seed)
+    try:
+        with open(path + ".json") as f:
+            return path, json.load(f)
+    except (OSError, ValueError):
+        return path, generate_corpus(path, SIZES[size_name], seed)
+
+def _iter_token_chunks(path):
+    word_re = cg._regex(cg._WORD_PATTERN)
+    for chunk in cg.iter_chunks(path, 1 << 20):
+        yield word_re.findall(chunk)
+
+# ----------------------------------------------------------------------------
+# Cases: each returns (units processed, seconds spent in the measured code,
+# correctness flag). Tokenizing the corpus is excluded except for "analyze".
+# ----------------------------------------------------------------------------
+
+def case_search(path, expected):
+    rounds = max(1, expected["tokens"] // 1000)
+    cg.get_search_index()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for query in SEARCH_QUERIES:
+            cg.search_manual(query)
+    elapsed = time.perf_counter() - started
+    ok = sorted(cg.search_manual("tilde")) == sorted(cg.search_manual_linear("tilde"))
+    return rounds * len(SEARCH_QUERIES), elapsed, ok
+
+def case_vcc_scalar(path, expected):
+    units = 0
+    elapsed = 0.0
+    detect = cg.detect_vcc
+    for words in _iter_token_chunks(path):
+        started = time.perf_counter()
+        for word in words:
+            detect(word)
+        elapsed += time.perf_counter() - started
+        units += len(words)
+    return units, elapsed, units == expected["tokens"]
+
+def case_vcc_batch(path, expected):
+    cg.detect_vcc_batch(["warmup"])  # numpy import and table build
+    units = 0
+    elapsed = 0.0
+    for words in _iter_token_chunks(path):
+        started = time.perf_counter()
+        cg.detect_vcc_batch(words)
+        elapsed += time.perf_counter() - started
+        units += len(words)
+    return units, elapsed, units == expected["tokens"]
+
+def case_resonance(path, expected):
+    cg.calculate_resonance_batch(["warmup"])
+    units = 0
+    elapsed = 0.0
+    for words in _iter_token_chunks(path):
+        started = time.perf_counter()
+        cg.calculate_resonance_batch(words)
+        elapsed += time.perf_counter() - started
+        units += len(words)
+    return units, elapsed, units == expected["tokens"]
+
+def case_components(path, expected):
+    units = 0
+    elapsed = 0.0
+    extract = cg.extract_components
+    for words in _iter_token_chunks(path):
+        started = time.perf_counter()
+        for word in words:
+            extract(word)
+        elapsed += time.perf_counter() - started
+        units += len(words)
+    ok = cg.extract_components("INFORMATION") == ("IN", "FORM", "ATION")
+    return units, elapsed, ok
+
+def case_lexicon(path, expected):
+    lexicon_path = path + ".lexicon"
+    cg.build_lexicon(cg.corpus_vocabulary([path]), lexicon_path)
+    started = time.perf_counter()
+    lexicon = cg.Lexicon(lexicon_path)
+    elapsed = time.perf_counter() - started
+    units = shadows = 0
+    for words in _iter_token_chunks(path):
+        started = time.perf_counter()
+        shadow = lexicon.is_shadow
+        shadows += sum(1 for word in words if shadow(word.upper()))
+        elapsed += time.perf_counter() - started
+        units += len(words)
+    lexicon.close()
+    os.remove(lexicon_path)
+    return units, elapsed, units == expected["tokens"] and shadows == expected["shadows"]
+
+def case_analyze(path, expected):
+    started = time.perf_counter()
+    for report in cg.analyze_stream(path, 1 << 20):
+        pass
+    elapsed = time.perf_counter() - started
+    ok = (report["words"] == expected["tokens"]
+          and report["homophone_count"] == expected["homophones"]
+          and report["shadow_count"] == expected["shadows"])
+    return report["words"], elapsed, ok
+
+def case_analyze_mmap(path, expected):
+    started = time.perf_counter()
+    report = cg.analyze_mapped(path)
+    elapsed = time.perf_counter() - started
+    ok = (report["words"] == expected["tokens"]
+          and report["homophone_count"] == expected["homophones"]
+          and report["shadow_count"] == expected["shadows"])
+    return report["words"], elapsed, ok
+
+def case_hit_table(path, expected):
+    hits = cg.HitTable()
+    started = time.perf_counter()
+    report = cg.analyze_mapped(path, hits)
+    elapsed = time.perf_counter() - started
+    ok = (len(hits) == report["shadow_count"] + report["homophone_count"]
+          and hits.nbytes <= 16 * len(hits))
+    return len(hits), elapsed, ok
+
+class _CharCounter:
+    """Text stream wrapper (or, without one, a sink) that only counts characters
+
+    Keeps the rewrite case streaming: neither the input nor the output is
+    ever held whole, so its peak RSS stays flat as the corpus grows.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.chars = 0
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.chars += len(data)
+        return data
+
+    def write(self, text):
+        self.chars += len(text)
+        return len(text)
+
+def case_rewrite(path, expected):
+    out = _CharCounter()
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        source = _CharCounter(f)
+        started = time.perf_counter()
+        offsets, counts = cg.rewrite_stream(source, out, chunk_size=1 << 20)
+        elapsed = time.perf_counter() - started
+    ok = (len(offsets) == sum(counts.values())
+          and out.chars == source.chars + sum(e.new_length - e.length for e in offsets))
+    return source.chars, elapsed, ok
+
+def case_letters(path, expected):
+    started = time.perf_counter()
+    counts = cg.count_letters(path, 1 << 20)
+    elapsed = time.perf_counter() - started
+    return counts.words, elapsed, counts.words == expected["tokens"]
+
+def case_transcript(path, expected):
+    transcript_path = path + ".srt"
+    with open(transcript_path, "w", encoding="utf-8") as out:
+        cue = 0
+        for words in _iter_token_chunks(path):
+            for i in range(0, len(words), 10):
+                start = cue * 2.0
+                out.write(f"{cue + 1}\n{cg.format_timestamp(start)} --> "
+                          f"{cg.format_timestamp(start + 1.8)}\n{' '.join(words[i:i + 10])}\n\n")
+                cue += 1
+    monitor = cg.TranscriptMonitor()
+    started = time.perf_counter()
+    for cue in cg.iter_cues(transcript_path):
+        monitor.add(cue)
+    elapsed = time.perf_counter() - started
+    os.remove(transcript_path)
+    ok = (monitor.tally.words == expected["tokens"]
+          and sum(monitor.tally.shadows.values()) == expected["shadows"])
+    return monitor.cues, elapsed, ok
+
+# The revisions case edits one document of at most this many tokens, taken
+# from the start of the corpus, so memory stays fixed at every size
+REVISION_TOKENS = 1_000_000
+
+def case_revisions(path, expected):
+    import itertools
+    import random
+    rng = random.Random(7)
+    words = list(itertools.islice(
+        (word for chunk in _iter_token_chunks(path) for word in chunk), REVISION_TOKENS))
+    lines = [" ".join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    history = cg.RevisionHistory()
+    history.add("\n".join(lines))
+    revisions = []
+    for _ in range(20):
+        lines = list(lines)
+        for _ in range(5):
+            i = rng.randrange(len(lines))
+            lines[i:i + 2] = [" ".join(rng.sample(words[:10000], 12))]
+        revisions.append("\n".join(lines))
+    started = time.perf_counter()
+    for text in revisions:
+        diff = history.add(text)
+    elapsed = time.perf_counter() - started
+    return len(revisions), elapsed, history.session.verify()[0] and diff.lines_scanned <= 5
+
+CASES = {
+    "search": (case_search, "queries"),
+    "vcc_scalar": (case_vcc_scalar, "tokens"),
+    "vcc_batch": (case_vcc_batch, "tokens"),
+    "resonance": (case_resonance, "tokens"),
+    "components": (case_components, "tokens"),
+    "lexicon": (case_lexicon, "tokens"),
+    "analyze": (case_analyze, "tokens"),
+    "analyze_mmap": (case_analyze_mmap, "tokens"),
+    "hit_table": (case_hit_table, "hits"),
+    "rewrite": (case_rewrite, "chars"),
+    "letters": (case_letters, "tokens"),
+    "transcript": (case_transcript, "cues"),
+    "revisions": (case_revisions, "revisions"),
+}
+
+def _run_case(name, path, expected):
+    """Child-process entry: run one case and report its peak RSS"""
+    import resource
+    func, unit = CASES[name]
+    units, elapsed, ok = func(path, expected)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "unit": unit,
+        "units": units,
+        "seconds": round(elapsed, 6),
+        "per_second": round(units / elapsed, 1) if elapsed else None,
+        "peak_rss_kb": peak_kb,
+        "ok": ok,
+    }
+
+def run_case(name, path, expected):
+    """Run a case in a fresh interpreter so its RSS is isolated"""
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_run_case, name, path, expected).result()
+
+def compare(results, baseline, threshold, rss_threshold):
+    """Return a list of regression messages against a baseline"""
+    problems = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        if base.get("per_second") and result["per_second"] is not None:
+            floor = base["per_second"] * (1.0 - threshold)
+            if result["per_second"] < floor:
+                problems.append(f"{key}: {result['per_second']:.0f} {result['unit']}/s "
+                                f"is below {floor:.0f} (baseline {base['per_second']:.0f})")
+        if base.get("peak_rss_kb"):
+            ceiling = base["peak_rss_kb"] * (1.0 + rss_threshold)
+            if result["peak_rss_kb"] > ceiling:
+                problems.append(f"{key}: peak RSS {result['peak_rss_kb']} KB "
+                                f"exceeds {ceiling:.0f} KB (baseline {base['peak_rss_kb']})")
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the CodexGlyph engine.")
+    parser.add_argument("--sizes", default="10k,1m",
+                        help=f"comma-separated corpus sizes from {', '.join(SIZES)}")
+    parser.add_argument("--cases", default=",".join(CASES),
+                        help="comma-separated cases to run")
+    parser.add_argument("--seed", type=int, default=1211)
+    parser.add_argument("--corpus-dir", default=os.path.join(
+        os.environ.get("TMPDIR", "/tmp"), "codexglyph-bench"),
+                        help="where generated corpora are kept between runs")
+    parser.add_argument("--baseline", help="JSON baseline to compare against")
+    parser.add_argument("--save-baseline", help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="allowed throughput drop as a fraction (default 0.20)")
+    parser.add_argument("--rss-threshold", type=float, default=0.50,
+                        help="allowed peak RSS growth as a fraction (default 0.50)")
+    parser.add_argument("--output", help="also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    sizes = [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [s for s in sizes if s not in SIZES] + [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown size or case: {', '.join(unknown)}")
+
+    results = {}
+    print(f"{'CASE':<24} {'UNITS':>12} {'SECONDS':>9} {'PER SEC':>14} {'PEAK RSS':>10}  OK")
+    for size_name in sizes:
+        path, expected = ensure_corpus(args.corpus_dir, size_name, args.seed)
+        for name in cases:
+            key = f"{name}@{size_name}"
+            result = results[key] = run_case(name, path, expected)
+            print(f"{key:<24} {result['units']:>12} {result['seconds']:>9.3f} "
+                  f"{result['per_second'] or 0:>10.0f} {result['unit'][:3]}/s "
+                  f"{result['peak_rss_kb'] / 1024:>7.1f} MB  {'✓' if result['ok'] else '✗'}")
+
+    document = {"python": sys.version.split()[0], "seed": args.seed, "results": results}
+    for target in (args.output, args.save_baseline):
+        if target:
+            with open(target, "w") as f:
+                json.dump(document, f, indent=2)
+                f.write("\n")
+
+    status = 0 if all(r["ok"] for r in results.values()) else 1
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        problems = compare(results, baseline, args.threshold, args.rss_threshold)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,19 +6,39 @@ A Complete Guide to Sovereign Language Analysis
 This script contains the full manual with interactive navigation.
 All tilde formatting corrections have been applied.
 
+Run without arguments for the interactive viewer, or with a subcommand
+(show, search, analyze, scan, ... see --help) for scripts and cron jobs.
+"python -m codexglyph_manual_complete ..." reuses the cached bytecode
+and starts fastest.
+
 Author: Captain Don & Claude
 Date: December 11, 2024
 Status: CANONICAL
 Version: 1.0 COMPLETE
 """
 
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import bisect
+import collections
+import functools
+import heapq
+import io
+import marshal
 import os
 import sys
 
+# Heavier modules (re, json, hashlib, argparse, numpy, multiprocessing)
+# are imported where they are used so one-shot commands start quickly.
+
 # ============================================================================
 # MANUAL CONTENT DATABASE
 # ============================================================================
 
+# {{name}} marks a table rendered from the databases (see manual_text), so
+# the JSON files stay the only source of truth for Parts 7-9 and the glossary
 MANUAL_CONTENT = {
     "header": """
 ═══════════════════════════════════════════════════════════════════════
@@ -257,41 +277,7 @@ Speakers exploit this to create multiple meanings in the subconscious.
 7.2 Top 20 Critical Homophones
 ────────────────────────────────────────────────────────────────────────
 
-LEGAL/CONTRACTUAL:
-  1. WRITE/RIGHT/RITE - Legal binding through ritual
-  2. DUE/DO - Action = debt creation
-  3. COUNSEL/COUNCIL - Authority confusion
-
-TEMPORAL:
-  4. MORNING/MOURNING - Daily grief programming
-  5. WEEK/WEAK - Work cycle = weakness
-  6. PEACE/PIECE - Harmony = fragmentation
-  7. HOUR/OUR - Time ownership confusion
-
-PERCEPTION/AUTHORITY:
-  8. SEE/SEA/C - Maritime law trigger
-  9. HEAR/HERE - Positional binding
-  10. KNOW/NO - Knowledge = negation
-
-ECONOMIC:
-  11. PROFIT/PROPHET - Money = religious authority
-  12. CAPITAL/CAPITOL - Wealth = government power
-
-IDENTITY:
-  13. SOLE/SOUL - Spirit trampling
-  14. HOLE/WHOLE - Completeness = emptiness
-
-ACTION:
-  15. BRAKE/BREAK - Stop = destroy
-  16. RAISE/RAZE/RAYS - Build = destroy = radiate
-  17. WASTE/WAIST - Squander vs center
-
-AUTHORITY:
-  18. NIGHT/KNIGHT - Darkness = enforcer
-  19. RAIN/REIGN/REIN - Weather = rule = control
-
-SUBSTANCE:
-  20. MEET/MEAT/METE - Gather = consume = judge
+{{homophones}}
 
 7.3 Primary Defense
 ────────────────────────────────────────────────────────────────────────
@@ -304,70 +290,34 @@ PART 8: LETTER COMBINATIONS
 
 8.1 Single-Letter Root Meanings (Selected)
 ────────────────────────────────────────────────────────────────────────
-  A (1) - Initiation, being, presence
-  E (5) - Freedom, change, essence
-  I (9) - Completion, self, interior
-  K (11) - Master duality, sharp knowing
-  N (14) - Network, negation, present
-  S (19) - Spirit, sound, vibration
-  T (20) - Direction, touch, time
-  U (21) - Foundation, under, collective
+{{letter_roots}}
 
 8.2 Common 2-Letter Combinations
 ────────────────────────────────────────────────────────────────────────
 
-DIGRAPHS:
-  TH - Directed breath (THE, THAT)
-  CH - Caught breath (CHILD)
-  SH - Spirit breath (SHALL)
-  KN - Sharp knowing (KNOW, KNIFE)
-
-CLUSTERS:
-  ST - Spirit touch (STAND, STAY)
-  TR - Touch return (TRUE, TRUST)
-  BL - Bounded light (BLESS, BLOOD)
+{{letter_pairs}}
 """,
 
     "part9": """
 PART 9: DATABASES
 ═══════════════════════════════════════════════════════════════════════
 
-9.1 V+CC Prefixes (11 total)
+9.1 V+CC Prefixes ({{vcc_count}} total)
 ────────────────────────────────────────────────────────────────────────
-IN, EX, AT, OB, OP, AD, AB, IM, IL, IR, UN
+{{vcc_prefixes}}
 
 9.2 Other Key Prefixes
 ────────────────────────────────────────────────────────────────────────
-  RE - again/back
-  DE - removal/down
-  PRE - before
-  PRO - forward
-  UNDER - beneath
-  OVER - above
-  INTER - between
+{{other_prefixes}}
 
 9.3 Key Suffixes
 ────────────────────────────────────────────────────────────────────────
 
-FULL-WORD:
-  MENT - the mind
-  NESS - projection/manifestation
-  HOOD - territory/covering
-  SHIP - vessel/journey
+{{suffixes}}
 
-OPERATORS:
-  ER - agent/one who
-  ING - ongoing action
-  ED - past action
-  TION - process/state
-
-9.4 Semantic Shadows (Top 5)
+9.4 Semantic Shadows (Top {{shadow_count}})
 ────────────────────────────────────────────────────────────────────────
-  1. GOVERNMENT → GOVERN-MENT (mind-steering)
-  2. INFORMATION → IN~FORMATION (forming within)
-  3. REPRESENTATIVE → RE-PRESENT-ATIVE (false representation)
-  4. UNDERSTAND → UNDER-STAND (complex structure)
-  5. SYSTEM → (organized whole)
+{{shadows}}
 """,
 
     "part10": """
@@ -533,212 +483,4574 @@ PARSING LEVELS:
 GLOSSARY
 ═══════════════════════════════════════════════════════════════════════
 
-BASE - Core part of word (not prefix/suffix)
+{{glossary}}
+"""
+}
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
 
-BASE+BASE - Two complete words joined (no V+CC applies)
+# Upper bounds of histogram buckets; the last bucket is unbounded
+HISTOGRAM_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
 
-HOMOPHONE - Words that sound identical, different meanings
+class _NullStage:
+    """The stage timer used while metrics are off: does nothing"""
 
-MASTER NUMBER - 11-99 (not reduced in resonance)
+    __slots__ = ()
 
-OPERATIONAL PREFIX - Performs action (UN-), uses hyphen
+    def __enter__(self):
+        return self
 
-POSITIONAL PREFIX - Shows location (IN, EX), uses tilde
+    def __exit__(self, *exc):
+        return False
 
-PREFIX+BASE - Where V+CC applies
+_NULL_STAGE = _NullStage()
 
-SHADOW GLYPH - Word with hidden negative structure
+class _Stage:
+    """Times one pass through a pipeline stage, wall and CPU"""
 
-SOVEREIGNTY SCORE - % of non-shadow words in text
+    __slots__ = ("totals", "wall", "cpu")
 
-V+CC PATTERN - Vowel + consonant + consonant seam
-"""
-}
+    def __init__(self, totals):
+        self.totals = totals
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        totals = self.totals
+        totals[0] += 1
+        totals[1] += time.perf_counter() - self.wall
+        totals[2] += time.process_time() - self.cpu
+        return False
+
+class Metrics:
+    """Per-stage timers, counters and histograms for one run"""
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = collections.Counter()
+        self.histograms = {}
+
+    def stage(self, name):
+        totals = self.stages.get(name)
+        if totals is None:
+            totals = self.stages[name] = [0, 0.0, 0.0]
+        return _Stage(totals)
+
+    def observe(self, name, value):
+        """Add value to a histogram of HISTOGRAM_BUCKETS"""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = [[0] * (len(HISTOGRAM_BUCKETS) + 1), 0, 0]
+        histogram[0][bisect.bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def snapshot(self):
+        """Return the metrics as plain data (JSON and pickle friendly)"""
+        return {"stages": {name: list(totals) for name, totals in self.stages.items()},
+                "counters": dict(self.counters),
+                "histograms": {name: [list(h[0]), h[1], h[2]]
+                               for name, h in self.histograms.items()}}
+
+    def merge(self, snapshot):
+        """Add a snapshot, e.g. from a worker process, into these metrics"""
+        for name, (calls, wall, cpu) in snapshot["stages"].items():
+            totals = self.stages.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += calls
+            totals[1] += wall
+            totals[2] += cpu
+        self.counters.update(snapshot["counters"])
+        for name, (buckets, total, count) in snapshot["histograms"].items():
+            histogram = self.histograms.setdefault(
+                name, [[0] * (len(HISTOGRAM_BUCKETS) + 1), 0, 0])
+            histogram[0] = [a + b for a, b in zip(histogram[0], buckets)]
+            histogram[1] += total
+            histogram[2] += count
+        return self
+
+    def summary(self):
+        """Render a human-readable summary"""
+        lines = ["PIPELINE STATS", "─" * 70,
+                 f"  {'STAGE':<14} {'CALLS':>8} {'WALL ms':>11} {'CPU ms':>11}"]
+        for name, (calls, wall, cpu) in sorted(self.stages.items(), key=lambda i: -i[1][1]):
+            lines.append(f"  {name:<14} {calls:>8} {wall * 1000:>11.2f} {cpu * 1000:>11.2f}")
+        if self.counters:
+            lines.append("")
+            lines.extend(f"  {name:<24} {value}" for name, value in sorted(self.counters.items()))
+        for name, (buckets, total, count) in sorted(self.histograms.items()):
+            mean = total / count if count else 0.0
+            lines.append(f"\n  {name}: {count} observations, mean {mean:.2f}")
+            bounds = [f"<={b}" for b in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}"]
+            lines.extend(f"    {bound:>8} {n}" for bound, n in zip(bounds, buckets) if n)
+        return "\n".join(lines)
+
+    def prometheus(self, prefix="codexglyph"):
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric, index, help_text in (("stage_calls_total", 0, "Stage executions"),
+                                         ("stage_wall_seconds_total", 1, "Stage wall time"),
+                                         ("stage_cpu_seconds_total", 2, "Stage CPU time")):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            lines.extend(f'{prefix}_{metric}{{stage="{name}"}} {totals[index]}'
+                         for name, totals in sorted(self.stages.items()))
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value}")
+        for name, (buckets, total, count) in sorted(self.histograms.items()):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            cumulative = 0
+            for bound, n in zip(HISTOGRAM_BUCKETS + ("+Inf",), buckets):
+                cumulative += n
+                lines.append(f'{prefix}_{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{prefix}_{name}_sum {total}")
+            lines.append(f"{prefix}_{name}_count {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write JSON for a .json path, Prometheus text otherwise"""
+        if path.endswith(".json"):
+            import json
+            text = json.dumps(self.snapshot(), indent=2) + "\n"
+        else:
+            text = self.prometheus()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+# The active Metrics, or None while instrumentation is off
+METRICS = None
+
+def enable_metrics():
+    """Turn instrumentation on and return the (new) active Metrics"""
+    global METRICS
+    METRICS = Metrics()
+    return METRICS
+
+def disable_metrics():
+    """Turn instrumentation off and return what was collected"""
+    global METRICS
+    metrics, METRICS = METRICS, None
+    return metrics
+
+def metric_stage(name):
+    """Return a context manager timing a pipeline stage (no-op when off)"""
+    return _NULL_STAGE if METRICS is None else METRICS.stage(name)
+
+def metric_count(name, value=1):
+    """Add to a counter when instrumentation is on"""
+    if METRICS is not None:
+        METRICS.counters[name] += value
+
+def metric_observe(name, value):
+    """Add to a histogram when instrumentation is on"""
+    if METRICS is not None:
+        METRICS.observe(name, value)
 
 # ============================================================================
-# DISPLAY FUNCTIONS
+# SEARCH INDEX
 # ============================================================================
 
-def clear_screen():
-    """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+_TOKEN_PATTERN = r"[a-z0-9]+"
+_QUERY_PATTERN = r'"([^"]*)"|(\S+)'
 
-def show_header():
-    """Display the program header"""
-    print(MANUAL_CONTENT["header"])
+# Relevance weights: a whole-token hit outranks a token prefix, which
+# outranks a bare substring somewhere in the line.
+_EXACT_WEIGHT = 3.0
+_PREFIX_WEIGHT = 2.0
+_SUBSTRING_WEIGHT = 1.0
 
-def show_menu():
-    """Display the main menu"""
-    print("\n" + "─" * 70)
-    print("  TABLE OF CONTENTS")
-    print("─" * 70)
-    print("  [1]  Foundation")
-    print("  [2]  The V+CC Shadow Rule")
-    print("  [3]  The Tilde Positional Clause ⭐ CORRECTED")
-    print("  [4]  Polarity Matching Doctrine")
-    print("  [5]  Compound Word Distinctions")
-    print("  [6]  Parsing Levels")
-    print("  [7]  Homophone Weaponization (Top 20)")
-    print("  [8]  Letter Combinations")
-    print("  [9]  Databases Reference")
-    print("  [10] Advanced Features")
-    print("  [11] Legal Formatting")
-    print("  [12] Use Cases")
-    print("  [13] Implementation Guide")
-    print()
-    print("  [Q]  Quick Reference Card")
-    print("  [G]  Glossary")
-    print("  [A]  About This Manual")
-    print("  [X]  Exit")
-    print("─" * 70)
+@functools.lru_cache(maxsize=None)
+def _regex(pattern):
+    """Compile pattern on first use, keeping re out of cold start"""
+    import re
+    return re.compile(pattern)
 
-def display_part(part_key):
-    """Display a specific part of the manual"""
-    clear_screen()
-    show_header()
-    print(MANUAL_CONTENT[part_key])
-    input("\nPress Enter to return to menu...")
+def _trigrams(text):
+    """Return the set of 3-character substrings of text"""
+    return {text[i:i+3] for i in range(len(text) - 2)}
 
-def show_about():
-    """Display information about the manual"""
-    clear_screen()
-    show_header()
-    print("""
-ABOUT THIS MANUAL
-═══════════════════════════════════════════════════════════════════════
+class SearchIndex:
+    """Token and trigram inverted index over the lines of the manual
 
-Version: 1.0 COMPLETE
-Status: CANONICAL
-Date: December 11, 2024
-Authors: Captain Don & Claude
+    Every line gets a posting id; ``postings[pid]`` is its (part, line)
+    pair and ``lines[pid]`` the (part, line, text) tuple search returns.
+    """
 
-This manual represents the complete, corrected CodexGlyph framework
-for sovereign language analysis. All tilde formatting errors have been
-resolved and the rules are now canonically defined.
+    def __init__(self, content):
+        self.postings = []
+        self.lines = []
+        self.folded = []
+        self.tokens = {}
+        self.trigrams = {}
+        tokenize = _regex(_TOKEN_PATTERN).findall
+        for part_name, text in content.items():
+            for i, line in enumerate(text.split('\n')):
+                pid = len(self.postings)
+                folded = line.lower()
+                self.postings.append((part_name, i+1))
+                self.lines.append((part_name, i+1, line.strip()))
+                self.folded.append(folded)
+                for token in tokenize(folded):
+                    pids = self.tokens.setdefault(token, [])
+                    if not pids or pids[-1] != pid:
+                        pids.append(pid)
+                for gram in _trigrams(folded):
+                    self.trigrams.setdefault(gram, set()).add(pid)
+        self.vocabulary = sorted(self.tokens)
 
-KEY FEATURES:
-  • 13 comprehensive parts covering all aspects
-  • V+CC shadow detection algorithm
-  • Tilde positional clause (corrected)
-  • Top 20 homophone weaponization database
-  • Legal formatting templates
-  • Multiple parsing levels
-  • Quick reference card
+    def _exact_ids(self, term):
+        return set(self.tokens.get(term, ()))
 
-CORRECTIONS APPLIED:
-  ✓ Tilde rule clarified (ONE per word maximum)
-  ✓ All examples updated to match rule
-  ✓ Markdown safety warnings added
-  ✓ Polarity matching doctrine refined
+    def _prefix_ids(self, term):
+        ids = set()
+        start = bisect.bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            ids.update(self.tokens[token])
+        return ids
 
-The foundation is solid. The rules are clear. The vision is captured.
+    def _substring_ids(self, term):
+        if len(term) < 3:
+            candidates = range(len(self.folded))
+        else:
+            postings = sorted((self.trigrams.get(g, set()) for g in _trigrams(term)),
+                              key=len)
+            candidates = set.intersection(*postings) if postings[0] else set()
+        return {pid for pid in candidates if term in self.folded[pid]}
 
-🦊
-""")
-    input("\nPress Enter to return to menu...")
+    def exact(self, term):
+        """Return (part, line) postings whose tokens include term"""
+        return sorted(self.postings[pid] for pid in self._exact_ids(term.lower()))
 
-def search_manual(query):
-    """Search the manual for a term"""
-    results = []
-    query_lower = query.lower()
-    
-    for part_name, content in MANUAL_CONTENT.items():
-        if query_lower in content.lower():
-            # Find line containing query
-            lines = content.split('\n')
-            for i, line in enumerate(lines):
-                if query_lower in line.lower():
-                    results.append((part_name, i+1, line.strip()))
-    
-    return results
+    def prefix(self, term):
+        """Return (part, line) postings with a token starting with term"""
+        return sorted(self.postings[pid] for pid in self._prefix_ids(term.lower()))
 
-def show_search():
-    """Display search interface"""
-    clear_screen()
-    show_header()
-    print("SEARCH MANUAL")
-    print("═" * 70)
-    print()
-    query = input("Enter search term (or press Enter to cancel): ").strip()
-    
-    if not query:
-        return
-    
-    results = search_manual(query)
-    
-    print()
-    if results:
-        print(f"Found {len(results)} result(s) for '{query}':")
-        print("─" * 70)
-        for part, line_num, line in results[:20]:  # Show first 20 results
-            print(f"\n[{part.upper()}] Line {line_num}:")
-            print(f"  {line[:100]}...")
-    else:
-        print(f"No results found for '{query}'")
-    
-    print()
-    input("\nPress Enter to return to menu...")
+    def substring(self, term):
+        """Return (part, line) postings whose text contains term"""
+        return sorted(self.postings[pid] for pid in self._substring_ids(term.lower()))
+
+    def _score_term(self, term, prefix_only):
+        """Map posting id -> relevance for a single query term"""
+        scores = {}
+        if not prefix_only:
+            for pid in self._substring_ids(term):
+                scores[pid] = _SUBSTRING_WEIGHT
+        for pid in self._prefix_ids(term):
+            scores[pid] = _PREFIX_WEIGHT
+        for pid in self._exact_ids(term):
+            scores[pid] = _EXACT_WEIGHT
+        return scores
+
+    def search(self, query):
+        """Run an AND/OR query and return (part, line, text) tuples by rank"""
+        groups = [[]]
+        for phrase, word in _regex(_QUERY_PATTERN).findall(query):
+            if word == 'OR':
+                groups.append([])
+            elif word != 'AND':
+                groups[-1].append(phrase.lower() if phrase else word.lower())
+
+        totals = {}
+        for terms in groups:
+            terms = [t for t in terms if t.rstrip('*')]
+            if not terms:
+                continue
+            matched = None
+            for term in terms:
+                scores = self._score_term(term.rstrip('*'), term.endswith('*'))
+                if matched is None:
+                    matched = scores
+                else:
+                    matched = {pid: score + scores[pid]
+                               for pid, score in matched.items() if pid in scores}
+                if not matched:
+                    break
+            for pid, score in matched.items():
+                totals[pid] = max(totals.get(pid, 0.0), score)
+
+        ranked = sorted(totals, key=lambda pid: (-totals[pid], pid))
+        return [self.lines[pid] for pid in ranked]
+
+_SEARCH_INDEX = None
+
+def get_search_index():
+    """Return the manual search index, building it once on first use"""
+    global _SEARCH_INDEX
+    if _SEARCH_INDEX is None:
+        _SEARCH_INDEX = SearchIndex({part: manual_text(part) for part in MANUAL_CONTENT})
+    return _SEARCH_INDEX
 
 # ============================================================================
-# MAIN PROGRAM
+# DATABASES
 # ============================================================================
 
-def main():
-    """Main program loop"""
-    while True:
-        clear_screen()
-        show_header()
-        show_menu()
-        
-        choice = input("\nEnter selection: ").strip().upper()
-        
-        if choice == 'X':
-            clear_screen()
-            print("\n" + "═" * 70)
-            print("  Thank you for using CodexGlyph Manual Viewer")
-            print("  The work continues. 🦊")
-            print("═" * 70)
-            print()
-            break
-        elif choice == '1':
-            display_part("part1")
-        elif choice == '2':
-            display_part("part2")
-        elif choice == '3':
-            display_part("part3")
-        elif choice == '4':
-            display_part("part4")
-        elif choice == '5':
-            display_part("part5")
-        elif choice == '6':
-            display_part("part6")
-        elif choice == '7':
-            display_part("part7")
-        elif choice == '8':
-            display_part("part8")
-        elif choice == '9':
-            display_part("part9")
-        elif choice == '10':
-            display_part("part10")
-        elif choice == '11':
-            display_part("part11")
-        elif choice == '12':
-            display_part("part12")
-        elif choice == '13':
-            display_part("part13")
-        elif choice == 'Q':
-            display_part("quick_ref")
-        elif choice == 'G':
-            display_part("glossary")
-        elif choice == 'A':
-            show_about()
-        elif choice == 'S':
-            show_search()
+# Part 13.3 option B: the engine's data lives in JSON next to this script
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "databases")
+DATABASE_CACHE_DIR = os.path.join(DATABASE_DIR, "__pycache__")
+
+# Bump when the cache layout changes so stale caches are rebuilt
+DATABASE_CACHE_VERSION = 1
+
+_DATABASES = {}
+
+def _read_database_cache(path, digest):
+    """Return cached data if it was compiled from content with digest"""
+    try:
+        with open(path, "rb") as f:
+            version, cached_digest, data = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if version != DATABASE_CACHE_VERSION or cached_digest != digest:
+        return None
+    return data
+
+def _write_database_cache(path, digest, data):
+    """Write a compiled cache atomically; failures only cost speed"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(DATABASE_CACHE_DIR, exist_ok=True)
+        with open(tmp, "wb") as f:
+            marshal.dump((DATABASE_CACHE_VERSION, digest, data), f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def load_database(name):
+    """Return the named JSON database, loading it at most once
+
+    The parsed data is cached in marshal form keyed by the SHA-256 of
+    the JSON source, so JSON is only parsed again after an edit.
+    """
+    data = _DATABASES.get(name)
+    if data is None:
+        with metric_stage("load"):
+            data = _load_database(name)
+    return data
+
+def _load_database(name):
+    """Read a database from its marshal cache, or parse the JSON source"""
+    import hashlib
+    with open(os.path.join(DATABASE_DIR, name + ".json"), "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    cache = os.path.join(DATABASE_CACHE_DIR, name + ".marshal")
+    data = _read_database_cache(cache, digest)
+    if data is None:
+        import json
+        data = json.loads(raw)
+        _write_database_cache(cache, digest, data)
+    _DATABASES[name] = data
+    return data
+
+VccRules = collections.namedtuple(
+    "VccRules", "positional operational prefixes assimilation excluded")
+
+@functools.lru_cache(maxsize=None)
+def vcc_rules():
+    """Return the Part 2.2 V+CC prefix rules from the prefixes database"""
+    vcc = load_database("prefixes")["vcc"]
+    positional = tuple(vcc["positional"])
+    operational = tuple(vcc["operational"])
+    return VccRules(positional, operational, positional + operational,
+                    dict(vcc["assimilation"]), tuple(vcc["excluded"]))
+
+@functools.lru_cache(maxsize=None)
+def semantic_shadows():
+    """Return the Part 9.4 semantic shadow words"""
+    return frozenset(load_database("shadows")["semantic"])
+
+@functools.lru_cache(maxsize=None)
+def homophone_database():
+    """Return the Part 7.2 homophone groups as a tuple of dicts"""
+    return tuple(dict(group, words=tuple(group["words"]))
+                 for group in load_database("homophones")["groups"])
+
+@functools.lru_cache(maxsize=None)
+def homophone_index():
+    """Return a mapping of homophone word -> its group"""
+    return {word: group for group in homophone_database()
+            for word in group["words"]}
+
+def lookup_glossary(term):
+    """Return (term, definition) pairs matching term, exact match first"""
+    terms = load_database("glossary")["terms"]
+    key = term.strip().upper()
+    if key in terms:
+        return [(key, terms[key])]
+    return [(name, text) for name, text in terms.items() if key in name]
+
+# Part 7.2 headings for the homophone categories
+_HOMOPHONE_HEADINGS = {"LEGAL": "LEGAL/CONTRACTUAL", "PERCEPTION": "PERCEPTION/AUTHORITY"}
+
+def _table_homophones():
+    categories = {}
+    for group in homophone_database():
+        categories.setdefault(group["category"], []).append(
+            f"  {group['rank']}. {'/'.join(group['words'])} - {group['note']}")
+    return "\n\n".join(_HOMOPHONE_HEADINGS.get(category, category) + ":\n" + "\n".join(lines)
+                       for category, lines in categories.items())
+
+def _table_letter_roots():
+    return "\n".join(f"  {letter} ({root['value']}) - {root['meaning']}"
+                     for letter, root in load_database("letters")["roots"].items())
+
+def _table_letter_pairs():
+    letters = load_database("letters")
+    return "\n\n".join(
+        heading + ":\n" + "\n".join(f"  {pair} - {entry['meaning']} ({', '.join(entry['examples'])})"
+                                     for pair, entry in letters[key].items())
+        for key, heading in (("digraphs", "DIGRAPHS"), ("clusters", "CLUSTERS")))
+
+def _table_affixes(table):
+    return "\n".join(f"  {affix} - {meaning}" for affix, meaning in table.items())
+
+def _table_suffixes():
+    suffixes = load_database("suffixes")
+    return (f"FULL-WORD:\n{_table_affixes(suffixes['full_word'])}\n\n"
+            f"OPERATORS:\n{_table_affixes(suffixes['operators'])}")
+
+def _table_shadows():
+    lines = []
+    for rank, (word, shadow) in enumerate(load_database("shadows")["semantic"].items(), 1):
+        # A shadow that does not split (SYSTEM) shows its meaning only
+        breakdown = shadow["breakdown"] + " " if shadow["breakdown"] != word else ""
+        lines.append(f"  {rank}. {word} → {breakdown}({shadow['meaning']})")
+    return "\n".join(lines)
+
+def _table_glossary():
+    return "\n\n".join(f"{term} - {text}"
+                         for term, text in load_database("glossary")["terms"].items())
+
+_MANUAL_TABLES = {
+    "homophones": _table_homophones,
+    "letter_roots": _table_letter_roots,
+    "letter_pairs": _table_letter_pairs,
+    "vcc_count": lambda: str(len(vcc_rules().prefixes)),
+    "vcc_prefixes": lambda: ", ".join(vcc_rules().prefixes),
+    "other_prefixes": lambda: _table_affixes(load_database("prefixes")["other"]),
+    "suffixes": _table_suffixes,
+    "shadow_count": lambda: str(len(load_database("shadows")["semantic"])),
+    "shadows": _table_shadows,
+    "glossary": _table_glossary,
+}
+
+@functools.lru_cache(maxsize=None)
+def manual_text(part):
+    """Return a part of the manual with its database tables filled in
+
+    Only the databases a part actually shows are loaded.
+    """
+    return _regex(r"\{\{(\w+)\}\}").sub(lambda m: _MANUAL_TABLES[m.group(1)](),
+                                         MANUAL_CONTENT[part])
+
+# Cached functions whose results are derived from the databases
+_DATABASE_DERIVED = ("vcc_rules", "semantic_shadows", "homophone_database",
+                     "homophone_index", "is_shadow", "_vcc_tables", "affix_meanings",
+                     "_affix_tries", "extract_components", "_parse_word",
+                     "homophone_automaton", "polarity_rules", "chain_rules",
+                     "rewrite_tables", "rewriter", "database_version", "manual_text")
+
+def reload_databases():
+    """Forget loaded databases and everything derived from them"""
+    global _SEARCH_INDEX
+    _DATABASES.clear()
+    _SEARCH_INDEX = None
+    for name in _DATABASE_DERIVED:
+        globals()[name].cache_clear()
+
+def _format_database(value, indent=""):
+    """Format JSON like the shipped databases: records in lists stay on one line"""
+    import json
+    inner = indent + "  "
+    if isinstance(value, dict) and value:
+        items = (f"{inner}{json.dumps(k, ensure_ascii=False)}: {_format_database(v, inner)}"
+                 for k, v in value.items())
+        return "{\n" + ",\n".join(items) + f"\n{indent}}}"
+    if isinstance(value, list) and value:
+        if all(isinstance(v, dict) for v in value):
+            items = (inner + json.dumps(v, ensure_ascii=False) for v in value)
         else:
-            print("\n❌ Invalid selection. Please try again.")
-            input("Press Enter to continue...")
+            items = (inner + _format_database(v, inner) for v in value)
+        return "[\n" + ",\n".join(items) + f"\n{indent}]"
+    return json.dumps(value, ensure_ascii=False)
+
+def save_database(name, data):
+    """Write a JSON database atomically and reload the databases"""
+    path = os.path.join(DATABASE_DIR, name + ".json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(_format_database(data) + "\n")
+    os.replace(tmp, path)
+    reload_databases()
+
+# Names that used to be module constants, now resolved from the databases
+# on first access so unrelated commands never load them.
+_DATABASE_CONSTANTS = {
+    "VCC_POSITIONAL": lambda: vcc_rules().positional,
+    "VCC_OPERATIONAL": lambda: vcc_rules().operational,
+    "VCC_PREFIXES": lambda: vcc_rules().prefixes,
+    "VCC_ASSIMILATION": lambda: vcc_rules().assimilation,
+    "VCC_EXCLUDED_PREFIXES": lambda: vcc_rules().excluded,
+    "SEMANTIC_SHADOWS": semantic_shadows,
+    "HOMOPHONE_DATABASE": homophone_database,
+    "HOMOPHONE_INDEX": homophone_index,
+    "HOMOPHONES": lambda: frozenset(homophone_index()),
+}
+
+def __getattr__(name):
+    factory = _DATABASE_CONSTANTS.get(name)
+    if factory is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return factory()
+
+# ============================================================================
+# ANALYSIS ENGINE
+# ============================================================================
+
+VOWELS = frozenset("AEIOU")
+
+# Part 12.2: more than 20% shadow words is a red flag
+RED_FLAG_PERCENT = 20.0
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+# A single "word" longer than this is flushed rather than carried forever
+_MAX_CARRY = 1 << 20
+
+_WORD_PATTERN = r"[^\W\d_]+"
+_TRAILING_WORD_PATTERN = r"[^\W\d_]+\Z"
+
+def vcc_prefix(word):
+    """Return the V+C prefix of a V+CC shadow word, or None (Part 13.2)"""
+    if len(word) < 4 or not word.isascii() or not word.isalpha():
+        return None
+    rules = vcc_rules()
+    w = word.upper()
+    prefix = w[:2]
+    if prefix not in rules.prefixes or w[2] in VOWELS:
+        return None
+    allowed = rules.assimilation.get(prefix)
+    if allowed and w[2] not in allowed:
+        return None
+    if w.startswith(rules.excluded):
+        return None
+    return prefix
+
+def detect_vcc(word):
+    """Return True if word is a structural (V+CC) shadow"""
+    return vcc_prefix(word) is not None
+
+def prefix_type(prefix):
+    """Return 'positional' or 'operational' for a V+C prefix"""
+    return "operational" if prefix in vcc_rules().operational else "positional"
+
+@functools.lru_cache(maxsize=1 << 16)
+def is_shadow(word):
+    """Return True if an uppercase word is a structural or semantic shadow"""
+    return word in semantic_shadows() or vcc_prefix(word) is not None
+
+def _open_source(source):
+    """Return (text stream, should_close) for a path, '-' or open file"""
+    if hasattr(source, "read"):
+        return source, False
+    if source == "-":
+        return sys.stdin, False
+    return open(source, encoding="utf-8", errors="replace"), True
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield text chunks from source, each ending on a word boundary
+
+    A word cut by the chunk size is carried into the next chunk so
+    tokenizing each chunk on its own gives the same words as the whole.
+    """
+    stream, should_close = _open_source(source)
+    trailing_word = _regex(_TRAILING_WORD_PATTERN)
+    carry = ""
+    try:
+        while True:
+            data = stream.read(chunk_size)
+            if not data:
+                break
+            data = carry + data
+            tail = trailing_word.search(data)
+            if tail and len(data) - tail.start() < _MAX_CARRY:
+                carry = data[tail.start():]
+                data = data[:tail.start()]
+            else:
+                carry = ""
+            if data:
+                yield data
+        if carry:
+            yield carry
+    finally:
+        if should_close:
+            stream.close()
+
+class AnalysisTally:
+    """Running word, shadow and homophone counts for a body of text
+
+    Tallies can be merged, which is how per-chunk and per-file results
+    are combined into a single report.
+    """
+
+    def __init__(self):
+        self.words = 0
+        self.shadows = collections.Counter()
+        self.homophones = collections.Counter()
+
+    def add_text(self, text):
+        """Tokenize text and add its words to the tally"""
+        shadows = self.shadows
+        homophones = self.homophones
+        homophone_words = homophone_index()
+        shadow = shadow_test()
+        with metric_stage("tokenize"):
+            tokens = _regex(_WORD_PATTERN).findall(text)
+        shadow_hits = homophone_hits = 0
+        with metric_stage("detect"):
+            for token in tokens:
+                token = token.upper()
+                if shadow(token):
+                    shadows[token] += 1
+                    shadow_hits += 1
+                if token in homophone_words:
+                    homophones[token] += 1
+                    homophone_hits += 1
+        self.words += len(tokens)
+        if METRICS is not None:
+            METRICS.counters.update(chunks=1, words=len(tokens), shadow_hits=shadow_hits,
+                                    homophone_hits=homophone_hits)
+            METRICS.observe("chunk_shadow_hits", shadow_hits)
+
+    def merge(self, other):
+        """Add another tally's counts into this one"""
+        self.words += other.words
+        self.shadows.update(other.shadows)
+        self.homophones.update(other.homophones)
+        return self
+
+    def homophone_categories(self):
+        """Return {category: hits} for the homophones counted so far"""
+        categories = collections.Counter()
+        index = homophone_index()
+        for word, count in self.homophones.items():
+            categories[index[word]["category"]] += count
+        return dict(categories.most_common())
+
+    def report(self, final=True, top=10):
+        """Build an analysis report dict from the running totals"""
+        with metric_stage("report"):
+            shadow_count = sum(self.shadows.values())
+            shadow_percent = 100.0 * shadow_count / self.words if self.words else 0.0
+            red_flag = shadow_percent > RED_FLAG_PERCENT
+            return {
+                "words": self.words,
+                "shadow_count": shadow_count,
+                "shadow_percent": round(shadow_percent, 2),
+                "sovereignty_score": round(100.0 - shadow_percent, 2),
+                "red_flag": red_flag,
+                "verdict": "RED FLAG" if red_flag else "ACCEPTABLE",
+                "top_shadows": self.shadows.most_common(top),
+                "homophone_count": sum(self.homophones.values()),
+                "top_homophones": self.homophones.most_common(top),
+                "homophone_categories": self.homophone_categories(),
+                "final": final,
+            }
+
+# Prefix-type codes returned by detect_vcc_batch
+PREFIX_NONE = 0
+PREFIX_POSITIONAL = 1
+PREFIX_OPERATIONAL = 2
+
+def _numpy():
+    """Import numpy on demand; only the batch detectors need it"""
+    import numpy
+    return numpy
+
+def _word_blob(words):
+    """Pack words into one upper-cased ASCII byte array
+
+    Returns (blob, starts, lengths). Every character takes exactly one
+    byte (non-ASCII becomes '?'), so word i is blob[starts[i]:][:lengths[i]].
+    """
+    np = _numpy()
+    if not isinstance(words, list):
+        words = list(words)
+    lengths = np.fromiter(map(len, words), dtype=np.int64, count=len(words))
+    starts = np.zeros(len(words), dtype=np.int64)
+    np.cumsum(lengths[:-1] + 1, out=starts[1:])
+    data = " ".join(words).encode("ascii", "replace").upper()
+    return np.frombuffer(data, dtype=np.uint8), starts, lengths
+
+def _pack_words(blob, starts, lengths, width):
+    """Gather the first width bytes of every word into an (n, width) array"""
+    np = _numpy()
+    padded = np.concatenate([blob, np.zeros(width, dtype=np.uint8)])
+    columns = np.arange(width)
+    packed = padded[starts[:, None] + columns]
+    packed[columns >= lengths[:, None]] = 0
+    return packed
+
+@functools.lru_cache(maxsize=None)
+def _vcc_tables():
+    """Build the lookup tables used by detect_vcc_batch"""
+    np = _numpy()
+    letters = np.zeros(256, dtype=bool)
+    letters[ord("A"):ord("Z") + 1] = True
+    consonants = letters.copy()
+    consonants[[ord(v) for v in VOWELS]] = False
+
+    prefix_index = np.zeros(1 << 16, dtype=np.intp)
+    rules = vcc_rules()
+    allowed = np.zeros((len(rules.prefixes) + 1, 256), dtype=bool)
+    types = np.zeros(len(rules.prefixes) + 1, dtype=np.uint8)
+    for i, prefix in enumerate(rules.prefixes, 1):
+        prefix_index[ord(prefix[0]) << 8 | ord(prefix[1])] = i
+        if prefix in rules.assimilation:
+            allowed[i, [ord(c) for c in rules.assimilation[prefix]]] = True
+        else:
+            allowed[i] = consonants
+        types[i] = (PREFIX_OPERATIONAL if prefix in rules.operational
+                    else PREFIX_POSITIONAL)
+    excluded = [np.frombuffer(p.encode(), dtype=np.uint8)
+                for p in rules.excluded]
+    return letters, prefix_index, allowed, types, excluded
+
+def detect_vcc_batch(words):
+    """Vectorized detect_vcc over a sequence of words (requires numpy)
+
+    Returns (is_vcc, prefix_types): a bool array and a uint8 array of
+    PREFIX_NONE / PREFIX_POSITIONAL / PREFIX_OPERATIONAL codes.
+    """
+    with metric_stage("detect"):
+        np = _numpy()
+        letters, prefix_index, allowed, types, excluded = _vcc_tables()
+        blob, starts, lengths = _word_blob(words)
+
+        width = max(len(p) for p in vcc_rules().excluded)
+        packed = _pack_words(blob, starts, lengths, width)
+        index = prefix_index[packed[:, 0].astype(np.intp) << 8 | packed[:, 1]]
+        is_vcc = (lengths >= 4) & allowed[index, packed[:, 2]]
+        for prefix in excluded:
+            is_vcc &= ~(packed[:, :len(prefix)] == prefix).all(axis=1)
+
+        # Only candidates need the whole-word letter check
+        candidates = np.flatnonzero(is_vcc)
+        count_type = np.int32 if len(blob) < (1 << 31) else np.int64
+        letter_counts = np.zeros(len(blob) + 1, dtype=count_type)
+        np.cumsum(letters[blob], out=letter_counts[1:])
+        ends = starts[candidates] + lengths[candidates]
+        is_vcc[candidates] = (letter_counts[ends] - letter_counts[starts[candidates]]
+                              == lengths[candidates])
+        return is_vcc, np.where(is_vcc, types[index], PREFIX_NONE).astype(np.uint8)
+
+def analyze_stream(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Analyze a file, '-' (stdin) or stream chunk by chunk
+
+    Yields a running report after every chunk and a final report last.
+    Only counters are kept, so memory does not grow with the input.
+    """
+    tally = AnalysisTally()
+    for chunk in iter_chunks(source, chunk_size):
+        tally.add_text(chunk)
+        yield tally.report(final=False)
+    yield tally.report()
+
+def analyze_text(text):
+    """Analyze a string and return the final report (Part 13.1)"""
+    for report in analyze_stream(io.StringIO(text)):
+        pass
+    return report
+
+# Part 10.3: A=1 ... Z=26 indexed by byte value, in either case
+_RESONANCE_TABLE = bytes(
+    (b - 64 if 65 <= b <= 90 else b - 96 if 97 <= b <= 122 else 0)
+    for b in range(256))
+
+# Repeated-digit master numbers survive reduction (K = 11 in Part 8.1)
+MASTER_NUMBERS = frozenset(range(11, 100, 11))
+
+def letter_sum(word):
+    """Return the A=1..Z=26 letter total of word (non-letters count 0)"""
+    return sum(word.encode("ascii", "ignore").translate(_RESONANCE_TABLE))
+
+def reduce_resonance(total):
+    """Reduce a letter total to one digit, keeping master numbers"""
+    while total > 9 and total not in MASTER_NUMBERS:
+        total = sum(map(int, str(total)))
+    return total
+
+@functools.lru_cache(maxsize=1 << 16)
+def _resonance(normalized):
+    return reduce_resonance(letter_sum(normalized))
+
+def calculate_resonance(word):
+    """Return the resonance number of word (Part 10.3)
+
+    >>> calculate_resonance("LOVE")  # L(12) + O(15) + V(22) + E(5) = 54
+    9
+    >>> letter_sum("love")
+    54
+    """
+    return _resonance(word.strip().translate(_ASCII_FOLD))
+
+def calculate_resonance_batch(words):
+    """Vectorized resonance over a sequence of words (requires numpy)
+
+    Returns (letter_sums, resonances) as int64 arrays.
+    """
+    with metric_stage("resonance"):
+        np = _numpy()
+        table = np.frombuffer(_RESONANCE_TABLE, dtype=np.uint8)
+        blob, starts, lengths = _word_blob(words)
+        running = np.zeros(len(blob) + 1, dtype=np.int64)
+        np.cumsum(table[blob], out=running[1:])
+        sums = running[starts + lengths] - running[starts]
+
+        reduced = sums.copy()
+        masters = np.fromiter(MASTER_NUMBERS, dtype=np.int64)
+        pending = (reduced > 9) & ~np.isin(reduced, masters)
+        while pending.any():
+            values = reduced[pending]
+            digits = np.zeros_like(values)
+            while values.any():
+                digits += values % 10
+                values //= 10
+            reduced[pending] = digits
+            pending = (reduced > 9) & ~np.isin(reduced, masters)
+        return sums, reduced
+
+# ============================================================================
+# WORD COMPONENTS
+# ============================================================================
+
+# Part 6 parsing levels
+PARSE_CASUAL = 1
+PARSE_STRUCTURAL = 2
+PARSE_CEREMONIAL = 3
+PARSE_EDUCATIONAL = 4
+
+PARSE_LEVELS = {"casual": PARSE_CASUAL, "structural": PARSE_STRUCTURAL,
+                "ceremonial": PARSE_CEREMONIAL, "educational": PARSE_EDUCATIONAL}
+
+# Shortest base left after stripping a V+C prefix (UN-DO) or anything else
+_MIN_VCC_BASE = 2
+_MIN_BASE = 3
+
+Components = collections.namedtuple("Components", "prefix base suffix")
+
+def _build_trie(words):
+    """Build a dict trie; the None key of a node holds the word ending there"""
+    root = {}
+    for word in words:
+        node = root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[None] = word
+    return root
+
+def _trie_matches(trie, letters):
+    """Yield every trie word that is a prefix of the letters iterable"""
+    node = trie
+    for ch in letters:
+        node = node.get(ch)
+        if node is None:
+            return
+        if None in node:
+            yield node[None]
+
+@functools.lru_cache(maxsize=None)
+def affix_meanings():
+    """Return {affix: meaning} for every Part 9 prefix and suffix"""
+    prefixes = load_database("prefixes")
+    suffixes = load_database("suffixes")
+    meanings = dict(prefixes["other"])
+    meanings.update(prefixes["vcc"]["positional"])
+    meanings.update(prefixes["vcc"]["operational"])
+    meanings.update(suffixes["full_word"])
+    meanings.update(suffixes["operators"])
+    return meanings
+
+@functools.lru_cache(maxsize=None)
+def _affix_tries():
+    """Compile the prefix trie and the reversed-suffix trie"""
+    prefixes = load_database("prefixes")
+    suffixes = load_database("suffixes")
+    prefix_words = set(prefixes["other"]) | set(vcc_rules().prefixes)
+    suffix_words = set(suffixes["full_word"]) | set(suffixes["operators"])
+    return (_build_trie(prefix_words),
+            _build_trie(suffix[::-1] for suffix in suffix_words))
+
+@functools.lru_cache(maxsize=1 << 16)
+def extract_components(word):
+    """Split word into (prefix, base, suffix) using the Part 9 affixes
+
+    The longest prefix and suffix are taken that still leave a base;
+    2-letter V+C prefixes only split off a consonant-starting base.
+    Each trie walk is bounded by the word length.
+    """
+    w = word.strip().upper()
+    if not w.isascii() or not w.isalpha():
+        return Components("", w, "")
+    prefix_trie, suffix_trie = _affix_tries()
+    vcc_prefixes = vcc_rules().prefixes
+
+    prefix = ""
+    for candidate in _trie_matches(prefix_trie, w):
+        if candidate in vcc_prefixes:
+            if len(w) - 2 >= _MIN_VCC_BASE and vcc_prefix(w) == candidate:
+                prefix = candidate
+        elif len(w) - len(candidate) >= _MIN_BASE:
+            prefix = candidate
+
+    rest = w[len(prefix):]
+    suffix = ""
+    for candidate in _trie_matches(suffix_trie, reversed(rest)):
+        if len(rest) - len(candidate) >= _MIN_BASE:
+            suffix = candidate[::-1]
+    return Components(prefix, rest[:len(rest) - len(suffix)], suffix)
+
+def _match_case(template, text):
+    """Return text in the letter case of template (UPPER, Title or lower)"""
+    if template.isupper() and len(template) > 1:
+        return text.upper()
+    if template[:1].isupper():
+        return text[:1].upper() + text[1:]
+    return text.lower()
+
+def _short_meaning(meaning):
+    """Reduce a database meaning to one inline word: 'the mind' -> 'mind'"""
+    meaning = meaning.split("/")[0].split(" (")[0].strip()
+    return meaning[4:] if meaning.startswith("the ") else meaning
+
+def parse_word(word, level=PARSE_STRUCTURAL):
+    """Render word at a Part 6 parsing level (1-4 or its name)"""
+    with metric_stage("extract"):
+        level = PARSE_LEVELS.get(str(level).lower(), level)
+        if level not in (PARSE_CASUAL, PARSE_STRUCTURAL, PARSE_CEREMONIAL, PARSE_EDUCATIONAL):
+            raise ValueError(f"unknown parsing level: {level!r}")
+        return _parse_word(word.strip(), level)
+
+@functools.lru_cache(maxsize=1 << 16)
+def _parse_word(word, level):
+    if level == PARSE_CASUAL:
+        casual = load_database("substitutions")["casual"].get(word.upper())
+        return _match_case(word, casual) if casual else word
+
+    prefix, base, suffix = extract_components(word)
+    parts = [part for part in (prefix, base, suffix) if part]
+    if level == PARSE_STRUCTURAL:
+        # Part 3: one tilde, only after a positional V+CC prefix, and it
+        # stays the only seam in the word.
+        if prefix in vcc_rules().positional:
+            return f"{prefix}~{base}{suffix}".lower()
+        return "-".join(parts).lower()
+    if level == PARSE_CEREMONIAL:
+        return "_".join(parts)
+
+    meanings = affix_meanings()
+    base_meanings = load_database("bases")["meanings"]
+    rendered = []
+    for part in parts:
+        meaning = meanings.get(part) if part in (prefix, suffix) else base_meanings.get(part)
+        rendered.append(f"{part}[{_short_meaning(meaning)}]" if meaning else part)
+    return "-".join(rendered)
+
+# ============================================================================
+# HOMOPHONE AUTOMATON
+# ============================================================================
+
+HomophoneHit = collections.namedtuple("HomophoneHit", "offset word rank category")
+
+# Lower-cases ASCII only, so offsets in the folded text match the original
+_ASCII_FOLD = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+class PatternAutomaton:
+    """Aho-Corasick automaton matching many whole words in one pass
+
+    patterns maps a word to an arbitrary payload; matching is ASCII
+    case-insensitive and only reports hits on word boundaries.
+    """
+
+    def __init__(self, patterns):
+        goto = [{}]
+        outputs = [[]]
+        for word, payload in patterns.items():
+            state = 0
+            for ch in word.translate(_ASCII_FOLD):
+                if ch not in goto[state]:
+                    goto[state][ch] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = goto[state][ch]
+            outputs[state].append((len(word), word, payload))
+
+        # Breadth-first failure links, folded straight into a full
+        # transition table so scanning never has to walk fail chains.
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = collections.deque()
+        fail = [0] * len(goto)
+        for state in goto[0].values():
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            delta[state] = dict(delta[fail[state]])
+            delta[state].update(goto[state])
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0) if state else 0
+                outputs[child] = outputs[child] + outputs[fail[child]]
+                queue.append(child)
+        self.delta = delta
+        self.outputs = outputs
+
+    def iter_matches(self, text, base=0):
+        """Yield (offset, matched text, payload) for whole-word hits"""
+        delta = self.delta
+        outputs = self.outputs
+        end = len(text)
+        state = 0
+        for i, ch in enumerate(text.translate(_ASCII_FOLD)):
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                if i + 1 < end and text[i + 1].isalpha():
+                    continue
+                for length, word, payload in outputs[state]:
+                    start = i + 1 - length
+                    if start == 0 or not text[start - 1].isalpha():
+                        yield base + start, text[start:i + 1], payload
+
+@functools.lru_cache(maxsize=None)
+def homophone_automaton():
+    """Return the automaton compiled from the homophone database"""
+    return PatternAutomaton(homophone_index())
+
+def find_homophones(text, base=0):
+    """Return a HomophoneHit for every homophone occurrence in text"""
+    return [HomophoneHit(offset, found, group["rank"], group["category"])
+            for offset, found, group in homophone_automaton().iter_matches(text, base)]
+
+def iter_homophones(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield HomophoneHits from a file, '-' (stdin) or stream in one pass"""
+    offset = 0
+    for chunk in iter_chunks(source, chunk_size):
+        yield from find_homophones(chunk, offset)
+        offset += len(chunk)
+
+# ============================================================================
+# REWRITER
+# ============================================================================
+
+# Substitution tables in their default precedence: Part 6.1 casual swaps,
+# Part 10.2 Anglo-Saxon forms, then the first Part 4.3 alternative
+REWRITE_TABLES = ("casual", "anglo_saxon", "alternatives")
+
+RewriteEdit = collections.namedtuple("RewriteEdit", "offset length new_offset new_length")
+
+@functools.lru_cache(maxsize=None)
+def rewrite_tables():
+    """Return {table name: {WORD: replacement}} for every substitution table"""
+    substitutions = load_database("substitutions")
+    tables = {name: substitutions[name] for name in REWRITE_TABLES if name in substitutions}
+    tables["alternatives"] = {word: alternatives[0]
+                              for word, alternatives in polarity_rules().alternatives.items()
+                              if alternatives}
+    return tables
+
+@functools.lru_cache(maxsize=None)
+def rewriter(tables=REWRITE_TABLES):
+    """Return the Rewriter for a tuple of table names; earlier tables win"""
+    known = rewrite_tables()
+    for name in tables:
+        if name not in known:
+            raise ValueError(f"unknown substitution table: {name!r}")
+    merged = {}
+    for name in reversed(tables):
+        merged.update(known[name])
+    return Rewriter(merged)
+
+class OffsetMap:
+    """Original <-> rewritten character offsets, one row per substitution
+
+    Rows are stored in four array columns in offset order. Text between
+    substitutions is copied unchanged, so any position maps across by the
+    length difference accumulated before it.
+
+    >>> offsets = OffsetMap()
+    >>> offsets.append(4, 10, 4, 9)
+    >>> offsets.to_rewritten(20), offsets.to_original(19), offsets.to_rewritten(7)
+    (19, 20, 4)
+    """
+
+    def __init__(self):
+        from array import array
+        self.offsets = array("Q")
+        self.lengths = array("I")
+        self.new_offsets = array("Q")
+        self.new_lengths = array("I")
+
+    def append(self, offset, length, new_offset, new_length):
+        self.offsets.append(offset)
+        self.lengths.append(length)
+        self.new_offsets.append(new_offset)
+        self.new_lengths.append(new_length)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        return RewriteEdit(self.offsets[index], self.lengths[index],
+                           self.new_offsets[index], self.new_lengths[index])
+
+    def __iter__(self):
+        return map(RewriteEdit, self.offsets, self.lengths, self.new_offsets, self.new_lengths)
+
+    @property
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in
+                   (self.offsets, self.lengths, self.new_offsets, self.new_lengths))
+
+    @staticmethod
+    def _translate(position, starts, lengths, targets, target_lengths):
+        index = bisect.bisect_right(starts, position) - 1
+        if index < 0:
+            return position
+        start = starts[index]
+        if position < start + lengths[index]:
+            # Inside a substituted word: map to the start of its replacement
+            return targets[index]
+        return targets[index] + target_lengths[index] + position - start - lengths[index]
+
+    def to_rewritten(self, offset):
+        """Return the rewritten position of an original offset"""
+        return self._translate(offset, self.offsets, self.lengths,
+                               self.new_offsets, self.new_lengths)
+
+    def to_original(self, offset):
+        """Return the original position of a rewritten offset"""
+        return self._translate(offset, self.new_offsets, self.new_lengths,
+                               self.offsets, self.lengths)
+
+class Rewriter:
+    """Whole-word substitutions compiled into one PatternAutomaton
+
+    Replacements take the letter case of the word they replace; all other
+    characters are copied through unchanged.
+    """
+
+    def __init__(self, table):
+        self.table = {word.upper(): replacement for word, replacement in table.items()}
+        self.automaton = PatternAutomaton(self.table)
+
+    def rewrite(self, text, offsets=None, base=0, new_base=0, counts=None):
+        """Return text with its substitutions applied
+
+        Each substitution is appended to offsets as positions in the whole
+        stream, where text starts at base and its rewrite at new_base, and
+        counted per word in counts.
+        """
+        pieces = []
+        last = 0
+        new_position = new_base
+        for start, found, replacement in self.automaton.iter_matches(text):
+            if start < last:
+                continue
+            replacement = _match_case(found, replacement)
+            pieces.append(text[last:start])
+            new_position += start - last
+            if offsets is not None:
+                offsets.append(base + start, len(found), new_position, len(replacement))
+            if counts is not None:
+                counts[found.upper()] += 1
+            pieces.append(replacement)
+            new_position += len(replacement)
+            last = start + len(found)
+        if not pieces:
+            return text
+        pieces.append(text[last:])
+        return "".join(pieces)
+
+    def stream(self, source, out, chunk_size=DEFAULT_CHUNK_SIZE, offsets=None):
+        """Rewrite source into the text stream out; return per-word counts"""
+        counts = collections.Counter()
+        base = new_base = 0
+        for chunk in iter_chunks(source, chunk_size):
+            with metric_stage("rewrite"):
+                rewritten = self.rewrite(chunk, offsets, base, new_base, counts)
+            out.write(rewritten)
+            base += len(chunk)
+            new_base += len(rewritten)
+        metric_count("substitutions", sum(counts.values()))
+        return counts
+
+def rewrite_text(text, tables=REWRITE_TABLES):
+    """Return (rewritten text, OffsetMap) for a string
+
+    >>> rewrite_text("Government: the EXPERIMENT failed.", ("anglo_saxon",))[0]
+    'Mind-rule: the TRY-OUT failed.'
+    """
+    offsets = OffsetMap()
+    return rewriter(tuple(tables)).rewrite(text, offsets), offsets
+
+def rewrite_stream(source, out, tables=REWRITE_TABLES, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rewrite a file, '-' (stdin) or stream into out in one pass
+
+    Returns (OffsetMap, Counter of replaced words). Paths are read with
+    line endings untouched so only the substituted words differ.
+    """
+    offsets = OffsetMap()
+    if hasattr(source, "read") or source == "-":
+        counts = rewriter(tuple(tables)).stream(source, out, chunk_size, offsets)
+    else:
+        with open(source, encoding="utf-8", errors="replace", newline="") as stream:
+            counts = rewriter(tuple(tables)).stream(stream, out, chunk_size, offsets)
+    return offsets, counts
+
+# ============================================================================
+# PHONETIC INDEX
+# ============================================================================
+
+_UNSTRESSED = str.maketrans("AEIOU", "eeeee")
+
+def _reduce_vowels(match):
+    """Reduce the short vowels after a word's first vowel to one sound"""
+    return match.group(1) + match.group(2).translate(_UNSTRESSED)
+
+# Metaphone-style spelling-to-sound rules, applied in order to a blob of
+# upper-case words, one per line. Output is lower case so no later rule
+# can match it again. Unlike Metaphone, vowel sounds are kept (roughly)
+# and voicing is not merged: homophones must sound the same, not merely
+# share consonants.
+_PHONETIC_RULES = (
+    (r"[^A-Z\n]+", ""),
+    (r"([B-DF-HJ-NP-TV-Z])\1+", r"\1"),
+    (r"^(?:KN|GN|PN)", "n"),
+    (r"^WR", "r"),
+    (r"^PS", "s"),
+    (r"^WHO", "HO"),
+    (r"^WH", "w"),
+    (r"^X", "z"),
+    (r"MB$", "m"),
+    (r"GN$", "n"),
+    # Vowel sounds
+    (r"EIGH", "ay"),
+    (r"IGH", "ai"),
+    (r"(?:AI|AY|EI|EY)", "ay"),
+    (r"(?:EE|EA|IE)", "iy"),
+    (r"(?:OA|OW|OU(?=L))", "ow"),
+    (r"OU", "aw"),
+    (r"(?:OO|EW|UE)", "uw"),
+    (r"(?:UY|YE$)", "ai"),
+    (r"^([B-DF-HJ-NP-TV-XZ]+)E$", r"\1iy"),
+    (r"^([B-DF-HJ-NP-TV-XZ]+)Y$", r"\1ai"),
+    (r"^([B-DF-HJ-NP-TV-XZ]+)O$", r"\1ow"),
+    # A vowel, one consonant (or ST) and a silent final E: the vowel is long
+    (r"A(?=(?:[B-DF-HJ-NP-TV-XZ]|ST)E$)", "ay"),
+    (r"I(?=(?:[B-DF-HJ-NP-TV-XZ]|ST)E$)", "ai"),
+    (r"O(?=(?:[B-DF-HJ-NP-TV-XZ]|ST)E$)", "ow"),
+    (r"U(?=(?:[B-DF-HJ-NP-TV-XZ]|ST)E$)", "uw"),
+    (r"E(?=(?:[B-DF-HJ-NP-TV-XZ]|ST)E$)", "iy"),
+    (r"Y$", "iy"),
+    # Consonant sounds
+    (r"PH", "f"),
+    (r"GH", ""),
+    (r"CK", "k"),
+    (r"SCH", "sk"),
+    (r"T?CH|SH", "x"),
+    (r"TH", "0"),
+    (r"DG(?=[EIY])", "j"),
+    (r"C(?=[EIY])", "s"),
+    (r"[CQ]", "k"),
+    (r"G(?=[EIY])", "j"),
+    (r"X", "ks"),
+    (r"Z", "s"),
+    (r"[WH](?![AEIOUYaeiou])", ""),
+    (r"E$", ""),
+    # Short vowels after the first are usually unstressed (PROFIT, PROPHET)
+    (r"^([^AEIOUaiou\n]*[AEIOUaiouy]+)([^\n]+)$", _reduce_vowels),
+)
+
+@functools.lru_cache(maxsize=None)
+def _phonetic_rules():
+    import re
+    return tuple((re.compile(pattern, re.MULTILINE), replacement)
+                 for pattern, replacement in _PHONETIC_RULES)
+
+def phonetic_keys(words):
+    """Return the phonetic key of every word, computed in one pass per rule
+
+    Whitespace inside a word is dropped, since the words are joined
+    one per line.
+
+    >>> phonetic_keys(["knight", "night", "write", "right", "reign", "rain"])
+    ['nait', 'nait', 'rait', 'rait', 'rayn', 'rayn']
+    >>> phonetic_keys(["kni\\nght", "rain"])
+    ['nait', 'rayn']
+    """
+    words = [word if word.isalpha() else "".join(word.split()) for word in words]
+    if not words:
+        return []
+    blob = "\n".join(words).upper()
+    for pattern, replacement in _phonetic_rules():
+        blob = pattern.sub(replacement, blob)
+    keys = blob.lower().split("\n")
+    assert len(keys) == len(words), "phonetic rules must keep one line per word"
+    return keys
+
+def phonetic_key(word):
+    """Return the phonetic key of a single word"""
+    return phonetic_keys([word])[0]
+
+class PhoneticIndex:
+    """Words bucketed by phonetic key, with corpus frequencies
+
+    Words can be added at any time; only words not seen before have
+    their keys computed.
+    """
+
+    def __init__(self, words=()):
+        self.keys = {}
+        self.buckets = {}
+        self.counts = {}
+        self.add(words)
+
+    def add(self, words):
+        """Add words (an iterable, or a mapping of word -> frequency)"""
+        if not isinstance(words, dict):
+            words = collections.Counter(words)
+        counts = self.counts
+        fresh = []
+        for word, count in words.items():
+            word = word.upper()
+            known = counts.get(word)
+            if known is None:
+                fresh.append(word)
+                counts[word] = count
+            else:
+                counts[word] = known + count
+        buckets = self.buckets
+        keys = phonetic_keys(fresh)
+        self.keys.update(zip(fresh, keys))
+        for word, key in zip(fresh, keys):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [word]
+            else:
+                bucket.append(word)
+        return self
+
+    def __len__(self):
+        return len(self.keys)
+
+    def group_of(self, word):
+        """Return the words sharing word's phonetic key"""
+        key = self.keys.get(word.upper()) or phonetic_key(word)
+        return sorted(self.buckets.get(key, ()))
+
+    def groups(self, min_count=1, new_only=True):
+        """Return candidate homophone groups, most frequent first
+
+        Groups are ranked by the frequency of their second most common
+        word, so one common word with a rare spelling variant does not
+        outrank two words that both occur often. With new_only, groups
+        containing a word already in the database are left out.
+        """
+        known = homophone_index()
+        counts = self.counts
+        found = []
+        for key, members in self.buckets.items():
+            if not key or len(members) < 2:
+                continue
+            words = sorted((w for w in members if counts[w] >= min_count),
+                           key=lambda w: (-counts[w], w))
+            if len(words) < 2 or (new_only and any(w in known for w in words)):
+                continue
+            frequencies = tuple(counts[w] for w in words)
+            found.append(PhoneticGroup(key, tuple(words), frequencies))
+        found.sort(key=lambda g: (-g.frequencies[1], -sum(g.frequencies), g.key))
+        return found
+
+PhoneticGroup = collections.namedtuple("PhoneticGroup", "key words frequencies")
+
+def corpus_vocabulary(sources, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return a Counter of upper-case word frequencies across sources"""
+    vocabulary = collections.Counter()
+    word_re = _regex(_WORD_PATTERN)
+    for source in sources:
+        for chunk in iter_chunks(source, chunk_size):
+            vocabulary.update(word_re.findall(chunk))
+    folded = collections.Counter()
+    for word, count in vocabulary.items():
+        folded[word.upper()] += count
+    return folded
+
+def extend_homophone_database(groups, category="DISCOVERED"):
+    """Append phonetic groups to the Part 7 database and return those added
+
+    Groups that share a word with an existing group are skipped, so the
+    curated groups are never altered.
+    """
+    data = dict(load_database("homophones"))
+    existing = list(data["groups"])
+    known = set(homophone_index())
+    rank = max((group["rank"] for group in existing), default=0)
+    added = []
+    for group in groups:
+        if known.intersection(group.words):
+            continue
+        rank += 1
+        known.update(group.words)
+        added.append({"rank": rank, "words": list(group.words), "category": category,
+                      "note": f"Phonetic key '{group.key}'"})
+    if added:
+        data["groups"] = existing + added
+        save_database("homophones", data)
+    return added
+
+# ============================================================================
+# HIT TABLES
+# ============================================================================
+
+# Flag bits stored per hit
+HIT_SHADOW = 1
+HIT_HOMOPHONE = 2
+
+class Hit:
+    """A lazy view of one row of a HitTable"""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    @property
+    def offset(self):
+        return self.table.offsets[self.index]
+
+    @property
+    def word(self):
+        return self.table.vocabulary[self.table.word_ids[self.index]]
+
+    @property
+    def prefix(self):
+        return self.table.prefixes[self.index]
+
+    @property
+    def flags(self):
+        return self.table.flags[self.index]
+
+    @property
+    def kind(self):
+        flags = self.flags
+        kinds = [name for bit, name in ((HIT_SHADOW, "shadow"), (HIT_HOMOPHONE, "homophone"))
+                 if flags & bit]
+        return "+".join(kinds)
+
+    def __repr__(self):
+        return f"Hit(offset={self.offset}, word={self.word!r}, kind={self.kind!r})"
+
+class HitTable:
+    """Shadow and homophone hits stored as parallel typed columns
+
+    Each hit costs 14 bytes: a 64-bit offset, a 32-bit id into an
+    interned vocabulary, a prefix code (PREFIX_*) and HIT_* flags.
+    Hit views are only created when rows are accessed.
+    """
+
+    def __init__(self):
+        from array import array
+        self.offsets = array("Q")
+        self.word_ids = array("I")
+        self.prefixes = array("B")
+        self.flags = array("B")
+        self.vocabulary = []
+        self.ids = {}
+
+    def intern(self, word):
+        """Return the vocabulary id of word, adding it if new"""
+        word_id = self.ids.get(word)
+        if word_id is None:
+            word_id = self.ids[word] = len(self.vocabulary)
+            self.vocabulary.append(word)
+        return word_id
+
+    def append(self, offset, word_id, prefix, flags):
+        self.offsets.append(offset)
+        self.word_ids.append(word_id)
+        self.prefixes.append(prefix)
+        self.flags.append(flags)
+
+    def merge(self, other, base=0):
+        """Append another table's rows, shifting their offsets by base"""
+        remap = [self.intern(word) for word in other.vocabulary]
+        self.offsets.extend(offset + base for offset in other.offsets)
+        self.word_ids.extend(remap[word_id] for word_id in other.word_ids)
+        self.prefixes.extend(other.prefixes)
+        self.flags.extend(other.flags)
+        return self
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return Hit(self, index)
+
+    def __iter__(self):
+        return (Hit(self, i) for i in range(len(self)))
+
+    @property
+    def nbytes(self):
+        """Bytes used by the columns (the vocabulary is shared and small)"""
+        return sum(column.itemsize * len(column)
+                   for column in (self.offsets, self.word_ids, self.prefixes, self.flags))
+
+    def counts(self, flag=HIT_SHADOW, start=0):
+        """Return a Counter of words whose hits (from row start) carry flag"""
+        rows = zip(self.word_ids[start:], self.flags[start:])
+        per_id = collections.Counter(word_id for word_id, flags in rows if flags & flag)
+        return collections.Counter({self.vocabulary[i]: n for i, n in per_id.items()})
+
+    def columns(self):
+        """Return zero-copy numpy views of the columns, keyed by name"""
+        np = _numpy()
+        return {
+            "offset": np.frombuffer(self.offsets, dtype=np.uint64),
+            "word_id": np.frombuffer(self.word_ids, dtype=np.uint32),
+            "prefix": np.frombuffer(self.prefixes, dtype=np.uint8),
+            "flags": np.frombuffer(self.flags, dtype=np.uint8),
+        }
+
+def _hit_verdict(word, table, homophone_words, shadow):
+    """Return (word id, prefix code, flags) for an uppercase word; flags may be 0
+
+    shadow is the predicate from shadow_test().
+    """
+    flags = 0
+    if shadow(word):
+        flags |= HIT_SHADOW
+    if word in homophone_words:
+        flags |= HIT_HOMOPHONE
+    if not flags:
+        return None, PREFIX_NONE, 0
+    prefix = vcc_prefix(word)
+    if prefix is None:
+        code = PREFIX_NONE
+    elif prefix_type(prefix) == "operational":
+        code = PREFIX_OPERATIONAL
+    else:
+        code = PREFIX_POSITIONAL
+    return table.intern(word), code, flags
+
+def collect_hits(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return (AnalysisTally, HitTable) for source; offsets are characters"""
+    tally = AnalysisTally()
+    table = HitTable()
+    homophone_words = homophone_index()
+    shadow = shadow_test()
+    word_re = _regex(_WORD_PATTERN)
+    verdicts = {}
+    base = 0
+    for chunk in iter_chunks(source, chunk_size):
+        words = 0
+        for match in word_re.finditer(chunk):
+            words += 1
+            token = match.group()
+            verdict = verdicts.get(token)
+            if verdict is None:
+                verdict = verdicts[token] = _hit_verdict(token.upper(), table,
+                                                         homophone_words, shadow)
+            word_id, prefix, flags = verdict
+            if flags:
+                table.append(base + match.start(), word_id, prefix, flags)
+        tally.words += words
+        base += len(chunk)
+    tally.shadows = table.counts(HIT_SHADOW)
+    tally.homophones = table.counts(HIT_HOMOPHONE)
+    return tally, table
+
+# ============================================================================
+# BYTE-LEVEL SCANNING
+# ============================================================================
+
+# A run of ASCII letters and UTF-8 multibyte sequences. Pure-ASCII runs
+# are words as they stand; runs with multibyte characters are decoded
+# and split exactly like the text path would split them.
+_BYTE_WORD_PATTERN = rb"(?:[A-Za-z]|[\xc2-\xf4][\x80-\xbf]+)+"
+
+def _iter_buffer_words(buffer):
+    """Yield (byte offset, ASCII word bytes or None) for words in buffer
+
+    Non-ASCII words are yielded as None: they count as words but can
+    never be shadows or homophones.
+    """
+    word_re = _regex(_WORD_PATTERN)
+    for match in _regex(_BYTE_WORD_PATTERN).finditer(buffer):
+        token = match.group()
+        if token.isascii():
+            yield match.start(), token
+            continue
+        text = token.decode("utf-8", "surrogateescape")
+        for word in word_re.finditer(text):
+            offset = match.start() + len(text[:word.start()].encode("utf-8", "surrogateescape"))
+            value = word.group()
+            yield offset, value.encode("ascii") if value.isascii() else None
+
+def _scan_buffer(buffer, tally, hits=None):
+    """Add a buffer's words to tally; record byte-offset hits in hits if given
+
+    Without a HitTable only a count per distinct token is kept, so memory
+    does not grow with the number of hits. Tokens stay bytes copies:
+    memoryview slices hash the same but cost more to make, and any left
+    alive would stop the map from closing.
+    """
+    with metric_stage("detect"):
+        homophone_words = homophone_index()
+        shadow = shadow_test()
+        table = hits if hits is not None else HitTable()
+        start = len(table)
+        verdicts = {}
+        flagged = collections.Counter()
+        words = 0
+        for offset, token in _iter_buffer_words(buffer):
+            words += 1
+            if token is None:
+                continue
+            verdict = verdicts.get(token)
+            if verdict is None:
+                word = token.decode("ascii").upper()
+                verdict = verdicts[token] = _hit_verdict(word, table, homophone_words, shadow)
+            word_id, prefix, flags = verdict
+            if not flags:
+                continue
+            if hits is None:
+                flagged[token] += 1
+            else:
+                table.append(offset, word_id, prefix, flags)
+        tally.words += words
+        if hits is not None:
+            tally.shadows.update(table.counts(HIT_SHADOW, start))
+            tally.homophones.update(table.counts(HIT_HOMOPHONE, start))
+        for token, count in flagged.items():
+            word_id, _, flags = verdicts[token]
+            word = table.vocabulary[word_id]
+            if flags & HIT_SHADOW:
+                tally.shadows[word] += count
+            if flags & HIT_HOMOPHONE:
+                tally.homophones[word] += count
+        return table
+
+class MappedFile:
+    """A read-only memory map of a file plus a zero-copy memoryview"""
+
+    def __init__(self, path):
+        import mmap
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            self.map = b""
+        self.view = memoryview(self.map)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.view.release()
+        if not isinstance(self.map, bytes):
+            self.map.close()
+        self.file.close()
+
+    def snippet(self, offset, length, context=40):
+        """Decode the text around a hit, never splitting a UTF-8 character"""
+        view = self.view
+        start = max(0, offset - context)
+        end = min(len(view), offset + length + context)
+        # Continuation bytes look like 10xxxxxx; step off them
+        while start > 0 and view[start] & 0xC0 == 0x80:
+            start -= 1
+        while end < len(view) and view[end] & 0xC0 == 0x80:
+            end += 1
+        return bytes(view[start:end]).decode("utf-8", "replace").replace("\n", " ")
+
+def analyze_mapped(path, hits=None):
+    """Analyze a file through mmap on raw bytes; same report as analyze_text
+
+    Pass a HitTable as hits to also keep every hit's byte offset.
+    """
+    tally = AnalysisTally()
+    with MappedFile(path) as mapped:
+        _scan_buffer(mapped.map, tally, hits)
+    return tally.report()
+
+def iter_mapped_hits(path, context=40, tally=None):
+    """Yield (Hit, snippet) for every shadow and homophone in a file
+
+    Pass an AnalysisTally to fill it from the same scan, which is then
+    the one analyze_mapped would have built.
+    """
+    hits = HitTable()
+    with MappedFile(path) as mapped:
+        _scan_buffer(mapped.map, AnalysisTally() if tally is None else tally, hits)
+        for hit in hits:
+            yield hit, mapped.snippet(hit.offset, len(hit.word), context)
+
+# ============================================================================
+# LEXICON
+# ============================================================================
+
+LEXICON_MAGIC = b"CGLEX\x00\x00\x01"
+LEXICON_PATH = os.path.join(DATABASE_CACHE_DIR, "lexicon.bin")
+
+# Header: magic, database_version() digest, slot count, word count,
+# offset of the key blob. Padded to 64 bytes.
+_LEXICON_HEADER = "<8s32sIII12x"
+# Slot: crc32 of the key, key offset, key length (0 = empty), flags,
+# resonance, prefix length, letter sum, suffix length. 16 bytes.
+_LEXICON_RECORD = "<IIBBBBHBx"
+
+LEXICON_SHADOW = 1
+LEXICON_HOMOPHONE = 2
+
+LexiconEntry = collections.namedtuple(
+    "LexiconEntry", "word shadow homophone prefix_type letter_sum resonance components")
+
+def _lexicon_record(word, homophone_words):
+    """Compute (flags, resonance, prefix length, letter sum, suffix length)"""
+    flags = 0
+    if is_shadow(word):
+        flags |= LEXICON_SHADOW
+    if word in homophone_words:
+        flags |= LEXICON_HOMOPHONE
+    prefix = vcc_prefix(word)
+    if prefix is not None:
+        code = PREFIX_OPERATIONAL if prefix_type(prefix) == "operational" else PREFIX_POSITIONAL
+        flags |= code << 2
+    components = extract_components(word)
+    total = letter_sum(word)
+    return flags, reduce_resonance(total), len(components.prefix), total, len(components.suffix)
+
+def build_lexicon(words, path=LEXICON_PATH):
+    """Precompute verdicts for a vocabulary and write an mmap-able lexicon
+
+    Keys are upper-case ASCII words, stored in an open-addressing table
+    of fixed-width records (load factor at most 1/2) hashed with crc32.
+    Returns the number of words written.
+    """
+    import struct
+    import zlib
+    header = struct.Struct(_LEXICON_HEADER)
+    record = struct.Struct(_LEXICON_RECORD)
+    keys = sorted({w.upper() for w in words
+                   if w.isascii() and w.isalpha() and len(w) < 256})
+    slots = 1
+    while slots < 2 * len(keys):
+        slots <<= 1
+    blob_offset = header.size + slots * record.size
+    table = bytearray(slots * record.size)
+    mask = slots - 1
+    homophone_words = homophone_index()
+    blob = []
+    offset = blob_offset
+    with metric_stage("lexicon_build"):
+        for word in keys:
+            raw = word.encode("ascii")
+            key_hash = zlib.crc32(raw)
+            slot = key_hash & mask
+            while table[slot * record.size + 8]:
+                slot = (slot + 1) & mask
+            flags, resonance, prefix_len, total, suffix_len = _lexicon_record(word, homophone_words)
+            record.pack_into(table, slot * record.size, key_hash, offset, len(raw), flags,
+                             resonance, prefix_len, total, suffix_len)
+            blob.append(raw)
+            offset += len(raw)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header.pack(LEXICON_MAGIC, bytes.fromhex(database_version()),
+                            slots, len(keys), blob_offset))
+        f.write(table)
+        f.write(b"".join(blob))
+    os.replace(tmp, path)
+    return len(keys)
+
+class Lexicon:
+    """A memory-mapped lexicon written by build_lexicon
+
+    Opening it only maps the file and reads the header. Words found in
+    the table are remembered in a dict, so repeated words cost one dict
+    lookup and the memo never outgrows the lexicon. Words not in the
+    lexicon fall back to live analysis, which has its own bounded caches.
+    A file that is not a current, complete lexicon raises ValueError.
+    """
+
+    def __init__(self, path=LEXICON_PATH):
+        import mmap
+        import struct
+        header = struct.Struct(_LEXICON_HEADER)
+        self.record = struct.Struct(_LEXICON_RECORD)
+        with open(path, "rb") as f:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f"{path} is empty") from None
+        try:
+            if len(self.map) < header.size:
+                raise ValueError(f"{path} is truncated")
+            magic, version, self.slots, self.count, self.blob_offset = header.unpack_from(self.map)
+            if magic != LEXICON_MAGIC:
+                raise ValueError(f"{path} is not a CodexGlyph lexicon")
+            self.table_offset = header.size
+            if (not self.slots or self.slots & (self.slots - 1)
+                    or self.table_offset + self.slots * self.record.size > self.blob_offset
+                    or self.blob_offset > len(self.map)):
+                raise ValueError(f"{path} is truncated or corrupt")
+            if version.hex() != database_version():
+                raise ValueError(f"{path} was built from other databases; rebuild it")
+        except BaseException:
+            self.map.close()
+            raise
+        self.memo = {}
+        self.shadow_memo = {}
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, word):
+        return self.lookup(word) is not None
+
+    def _probe(self, key):
+        import zlib
+        try:
+            raw = key.encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        key_hash = zlib.crc32(raw)
+        mask = self.slots - 1
+        slot = key_hash & mask
+        data = self.map
+        unpack = self.record.unpack_from
+        size = self.record.size
+        while True:
+            (slot_hash, offset, length, flags, resonance, prefix_len, total,
+             suffix_len) = unpack(data, self.table_offset + slot * size)
+            if not length:
+                return None
+            if slot_hash == key_hash and length == len(raw) and data[offset:offset + length] == raw:
+                components = Components(key[:prefix_len], key[prefix_len:length - suffix_len],
+                                        key[length - suffix_len:])
+                return LexiconEntry(key, bool(flags & LEXICON_SHADOW),
+                                    bool(flags & LEXICON_HOMOPHONE), flags >> 2,
+                                    total, resonance, components)
+            slot = (slot + 1) & mask
+
+    def lookup(self, word):
+        """Return the LexiconEntry for word, or None if it is not listed"""
+        key = word.upper()
+        try:
+            return self.memo[key]
+        except KeyError:
+            entry = self._probe(key)
+            if entry is not None:
+                self.memo[key] = entry
+            return entry
+
+    def is_shadow(self, word):
+        """is_shadow() for an upper-case word, through the lexicon"""
+        try:
+            return self.shadow_memo[word]
+        except KeyError:
+            entry = self.lookup(word)
+            if entry is None:
+                return is_shadow(word)
+            shadow = self.shadow_memo[word] = entry.shadow
+            return shadow
+
+    def resonance(self, word):
+        """calculate_resonance() through the lexicon"""
+        entry = self.lookup(word.strip())
+        return calculate_resonance(word) if entry is None else entry.resonance
+
+    def components(self, word):
+        """extract_components() through the lexicon"""
+        entry = self.lookup(word.strip())
+        return extract_components(word) if entry is None else entry.components
+
+# The lexicon consulted by the analysis engine, or None
+LEXICON = None
+
+def use_lexicon(path=LEXICON_PATH):
+    """Make the lexicon at path the active one and return it"""
+    global LEXICON
+    LEXICON = Lexicon(path)
+    return LEXICON
+
+def shadow_test():
+    """Return the is_shadow predicate to use: the lexicon's when active"""
+    return is_shadow if LEXICON is None else LEXICON.is_shadow
+
+# ============================================================================
+# POLARITY MATCHING
+# ============================================================================
+
+PolarityRules = collections.namedtuple("PolarityRules", "window cues negative alternatives")
+
+PolarityHit = collections.namedtuple(
+    "PolarityHit", "offset word acceptable negations alternatives")
+
+# Words, plus the punctuation that ends a clause and empties the window
+_POLARITY_TOKEN_PATTERN = r"[^\W\d_]+|[.;:!?]"
+
+@functools.lru_cache(maxsize=None)
+def polarity_rules():
+    """Return the Part 4 polarity rules from the shadows database"""
+    data = load_database("shadows")["polarity"]
+    return PolarityRules(data["window"], frozenset(data["negation_cues"]),
+                         frozenset(data["negative"]),
+                         {word: tuple(words) for word, words in data["alternatives"].items()})
+
+def polarity_alternatives(word):
+    """Return the Part 4.3 alternatives for a shadow word
+
+    Words without listed alternatives get their Part 3 separated form.
+    """
+    word = word.upper()
+    alternatives = polarity_rules().alternatives.get(word)
+    if alternatives is None:
+        separated = parse_word(word, PARSE_STRUCTURAL).upper()
+        alternatives = (separated,) if separated != word else ()
+    return alternatives
+
+class PolarityMatcher:
+    """Tag shadow hits as acceptable or flagged in one streaming pass
+
+    A hit is acceptable when its meaning is negative (Part 4.1): an odd
+    number of negations between the word itself (a Part 4.2 word such
+    as IMPOSSIBLE) and the cues among the preceding window tokens. So
+    IMPOSSIBLE and "do not understand" pass, while UNDERSTAND and "not
+    impossible" are flagged. Clause punctuation empties the window.
+    Each token costs a set lookup and a fixed-size deque update.
+    """
+
+    def __init__(self, window=None):
+        self.rules = polarity_rules()
+        self.window = collections.deque(maxlen=window or self.rules.window)
+        self.negations = 0
+        self.offset = 0
+        self.words = 0
+        self.acceptable = collections.Counter()
+        self.flagged = collections.Counter()
+
+    def feed(self, text):
+        """Yield PolarityHits for the next chunk of a stream
+
+        Chunks must end on word boundaries, as iter_chunks guarantees.
+        """
+        if METRICS is not None:
+            METRICS.counters["polarity_chunks"] += 1
+        cues = self.rules.cues
+        negative = self.rules.negative
+        shadow = shadow_test()
+        window = self.window
+        size = window.maxlen
+        base = self.offset
+        words = 0
+        for match in _regex(_POLARITY_TOKEN_PATTERN).finditer(text):
+            token = match.group()
+            if token in ".;:!?":
+                window.clear()
+                self.negations = 0
+                continue
+            words += 1
+            word = token.upper()
+            if shadow(word):
+                count = self.negations + (word in negative)
+                if count % 2:
+                    self.acceptable[word] += 1
+                    yield PolarityHit(base + match.start(), word, True, self.negations, ())
+                else:
+                    self.flagged[word] += 1
+                    yield PolarityHit(base + match.start(), word, False, self.negations,
+                                      polarity_alternatives(word))
+            if len(window) == size:
+                self.negations -= window[0]
+            cue = word in cues
+            window.append(cue)
+            self.negations += cue
+        self.words += words
+        self.offset += len(text)
+
+    def report(self, top=10):
+        """Summarize the hits seen so far"""
+        acceptable = sum(self.acceptable.values())
+        flagged = sum(self.flagged.values())
+        flagged_percent = 100.0 * flagged / self.words if self.words else 0.0
+        return {
+            "acceptable": acceptable,
+            "flagged": flagged,
+            "flagged_percent": round(flagged_percent, 2),
+            "adjusted_sovereignty_score": round(100.0 - flagged_percent, 2),
+            "top_acceptable": self.acceptable.most_common(top),
+            "top_flagged": self.flagged.most_common(top),
+            "alternatives": {word: list(polarity_alternatives(word))
+                             for word, _ in self.flagged.most_common(top)},
+        }
+
+def iter_polarity(source, chunk_size=DEFAULT_CHUNK_SIZE, window=None):
+    """Yield a PolarityHit for every shadow word in a file, '-' or stream"""
+    matcher = PolarityMatcher(window)
+    for chunk in iter_chunks(source, chunk_size):
+        yield from matcher.feed(chunk)
+
+def analyze_polarity(source, chunk_size=DEFAULT_CHUNK_SIZE, window=None):
+    """Return the final analysis report with a "polarity" section, in one pass"""
+    tally = AnalysisTally()
+    matcher = PolarityMatcher(window)
+    for chunk in iter_chunks(source, chunk_size):
+        tally.add_text(chunk)
+        for _ in matcher.feed(chunk):
+            pass
+    report = tally.report()
+    report["polarity"] = matcher.report()
+    return report
+
+# ============================================================================
+# SEPARATOR CHAINS
+# ============================================================================
+
+ChainRules = collections.namedtuple("ChainRules", "capacities canonical separators")
+
+ChainMatch = collections.namedtuple(
+    "ChainMatch", "line column text words separators form problems suggestion")
+
+CHAIN_PROBLEMS = {
+    "missing-separator": "capacities with no separator between them",
+    "doubled-separator": "more than one separator between capacities",
+    "colon-inside": "':' introduces the entity and may only end a chain",
+    "joiner-separator": "'-', '~' and '_' join words, not capacities (Part 5.3)",
+    "missing-colon": "a chain must end with ':' before the entity",
+    "missing-entity": "nothing follows the chain's ':'",
+    "outside-template": "a template-only separator ('>') outside its Part 11 template",
+    "court-caution": "a separator to use cautiously in court documents ('_', Part 11.1)",
+    "court-explain": "a separator to explain if used in court documents ('~', Part 11.1)",
+    "non-canonical": "not one of the Part 5.2 chains",
+    "spacing": "spacing differs from the canonical form",
+}
+
+_CHAIN_JOINERS = "-~_"
+
+# Opening punctuation an entity may start with: [Entity Name], "Acme", (the Company)
+_ENTITY_OPENERS = "([{<\"'“‘«*"
+
+# chains.json "court" standing of a separator -> problem it raises (Part
+# 11.1); "template" separators are only a problem outside canonical chains
+_COURT_PROBLEMS = {"caution": "court-caution", "explain": "court-explain"}
+
+# Chain state machine over tokens: (state, token kind) -> (state, action).
+# Pairs that are missing end the current chain and return to "out".
+_CHAIN_TRANSITIONS = {
+    ("out", "capacity"): ("word", "begin"),
+    ("word", "space"): ("word", "gap"),
+    ("word", "sep"): ("sep", "gap"),
+    ("word", "capacity"): ("word", "next"),
+    ("sep", "space"): ("sep", "gap"),
+    ("sep", "sep"): ("sep", "gap"),
+    ("sep", "capacity"): ("word", "next"),
+}
+
+class _ChainClasses(dict):
+    """str.translate table from character to chain token class"""
+
+    def __missing__(self, code):
+        char = chr(code)
+        if char.isalpha() or char in _CHAIN_JOINERS:
+            cls = "w"
+        elif char in " \t":
+            cls = "s"
+        elif char in ";>:":
+            cls = char
+        else:
+            cls = "o"
+        self[code] = cls
+        return cls
+
+_CHAIN_CLASSES = _ChainClasses()
+
+def _split_capacities(word, capacities):
+    """Split IN~AS~FOR style words into (capacities, joiners), or None"""
+    if word in capacities:
+        return [word], []
+    parts = []
+    joiners = []
+    start = 0
+    for i, char in enumerate(word):
+        if char in _CHAIN_JOINERS:
+            parts.append(word[start:i])
+            joiners.append(char)
+            start = i + 1
+    parts.append(word[start:])
+    if all(part in capacities for part in parts):
+        return parts, joiners
+    return None
+
+def _chain_tokens(line, capacities):
+    """Yield (kind, start, end, words, joiners) for a line, without regex
+
+    Characters are classified with one str.translate call and grouped
+    into runs, so work is linear in the line length.
+    """
+    import itertools
+    position = 0
+    for cls, run in itertools.groupby(line.translate(_CHAIN_CLASSES)):
+        end = position + len(list(run))
+        if cls == "w":
+            text = line[position:end]
+            split = _split_capacities(text, capacities) if text.isupper() else None
+            if split:
+                yield "capacity", position, end, split[0], split[1]
+            else:
+                yield "word", position, end, None, None
+        elif cls == "s":
+            yield "space", position, end, None, None
+        elif cls == "o":
+            yield "other", position, end, None, None
+        else:
+            yield "sep", position, end, None, None
+        position = end
+
+@functools.lru_cache(maxsize=None)
+def chain_rules():
+    """Return the Part 5.2/5.3 chain rules, with canonical chains pre-parsed"""
+    data = load_database("chains")
+    rules = ChainRules(frozenset(data["capacities"]), {}, data["separators"])
+    for name, text in data["canonical"].items():
+        words, separators = _parse_chains(text + " ENTITY", rules)[0][2:4]
+        rules.canonical[(tuple(words), tuple(s.strip() for s in separators))] = (name, text)
+    return rules
+
+def _parse_chains(line, rules):
+    """Run the chain state machine over a line
+
+    Returns (start, end, words, separators, entity) per chain found;
+    separators holds the raw text after each word, the last one
+    included. entity is True when a letter or digit follows the chain,
+    after any opening brackets or quotes.
+    """
+    chains = []
+    state = "out"
+    words = separators = None
+    start = end = gap_start = 0
+    for kind, token_start, token_end, parts, joiners in _chain_tokens(line, rules.capacities):
+        state, action = _CHAIN_TRANSITIONS.get((state, kind), ("out", "end" if state != "out" else None))
+        if action == "begin" or action == "next":
+            if action == "begin":
+                words, separators, start = [], [], token_start
+            else:
+                separators.append(line[gap_start:token_start])
+            words.append(parts[0])
+            for joiner, part in zip(joiners, parts[1:]):
+                separators.append(joiner)
+                words.append(part)
+            end = gap_start = token_end
+        elif action == "gap":
+            end = token_end
+        elif action == "end":
+            separators.append(line[gap_start:end])
+            entity = line[token_start:].lstrip(_ENTITY_OPENERS + " \t")[:1].isalnum()
+            chains.append((start, end, words, separators, entity))
+    if state != "out":
+        separators.append(line[gap_start:end])
+        chains.append((start, end, words, separators, False))
+    return chains
+
+def _check_chain(words, separators, entity, rules):
+    """Return (canonical name or None, problems, suggestion) for a chain"""
+    symbols = [s.replace(" ", "").replace("\t", "") for s in separators]
+    between, final = symbols[:-1], symbols[-1]
+    problems = []
+    for symbol in between:
+        if not symbol:
+            problems.append("missing-separator")
+        elif len(symbol) > 1:
+            problems.append("doubled-separator")
+        elif symbol == ":":
+            problems.append("colon-inside")
+        elif symbol in _CHAIN_JOINERS:
+            problems.append("joiner-separator")
+    if final != ":":
+        problems.append("doubled-separator" if len(final) > 1 and ":" in final
+                        else "missing-colon")
+    elif not entity:
+        problems.append("missing-entity")
+    canonical = rules.canonical.get((tuple(words), tuple(symbols)))
+    courts = [rules.separators[char]["court"]
+              for char in dict.fromkeys("".join(symbols)) if char in rules.separators]
+    problems.extend(_COURT_PROBLEMS[court] for court in courts if court in _COURT_PROBLEMS)
+    suggestion = None
+    if canonical is None:
+        problems.append("non-canonical")
+        if "template" in courts:
+            problems.append("outside-template")
+        for (canonical_words, _), (_, text) in rules.canonical.items():
+            if canonical_words == tuple(words):
+                suggestion = text
+    else:
+        text = "".join(w + s for w, s in zip(words, separators)).rstrip()
+        if text != canonical[1]:
+            problems.append("spacing")
+            suggestion = canonical[1]
+    return (canonical[0] if canonical else None), tuple(dict.fromkeys(problems)), suggestion
+
+def _is_chain(words, separators):
+    """Tell chains apart from ordinary capitalised prose such as IN AND FOR"""
+    symbols = "".join(separators)
+    return (any(char in symbols for char in ";>" + _CHAIN_JOINERS)
+            or (len(words) > 1 and ":" in separators[-1]))
+
+def find_chains(lines, first_line=1):
+    """Yield a ChainMatch for every capacity chain in an iterable of lines
+
+    Chains do not span lines. Lines with no separator character or no
+    capacity word are skipped without being tokenized.
+    """
+    rules = chain_rules()
+    capacities = tuple(rules.capacities)
+    for number, line in enumerate(lines, first_line):
+        if not (";" in line or ">" in line or ":" in line
+                or "~" in line or "_" in line):
+            continue
+        if not any(capacity in line for capacity in capacities):
+            continue
+        line = line.rstrip("\r\n")
+        for start, end, words, separators, entity in _parse_chains(line, rules):
+            if not _is_chain(words, separators):
+                continue
+            form, problems, suggestion = _check_chain(words, separators, entity, rules)
+            yield ChainMatch(number, start + 1, line[start:end].rstrip(), tuple(words),
+                             tuple(s.strip() for s in separators), form, problems, suggestion)
+
+def iter_chains(source):
+    """Yield ChainMatches from a file, '-' (stdin) or open text stream"""
+    stream, should_close = _open_source(source)
+    try:
+        yield from find_chains(stream)
+    finally:
+        if should_close:
+            stream.close()
+
+# ============================================================================
+# INCREMENTAL ANALYSIS
+# ============================================================================
+
+def _scan_line(line):
+    """Return (words, shadow words, homophone words) for one line"""
+    homophone_words = homophone_index()
+    shadow = shadow_test()
+    words = 0
+    shadows = []
+    homophones = []
+    for token in _regex(_WORD_PATTERN).findall(line):
+        words += 1
+        token = token.upper()
+        if shadow(token):
+            shadows.append(token)
+        if token in homophone_words:
+            homophones.append(token)
+    return words, tuple(shadows), tuple(homophones)
+
+def _discount(counter, words):
+    for word in words:
+        counter[word] -= 1
+        if not counter[word]:
+            del counter[word]
+
+class AnalysisSession:
+    """Analysis of a document under live editing (Part 12.1)
+
+    Per-line results are kept alongside running totals, so an edit only
+    re-tokenizes the lines it touches and the report is updated in time
+    proportional to the edit rather than the document. Lines are
+    0-based and never include the newline.
+    """
+
+    def __init__(self, text=""):
+        self.lines = []
+        self._stats = []
+        self.tally = AnalysisTally()
+        self.replace_lines(0, 0, text.split("\n"))
+
+    def __len__(self):
+        return len(self.lines)
+
+    @property
+    def text(self):
+        """The full document text"""
+        return "\n".join(self.lines)
+
+    def replace_lines(self, start, end, new_lines, stats=None):
+        """Replace lines[start:end] with new_lines and rescore only those
+
+        stats may supply the new lines' _scan_line results when the
+        caller already has them.
+        """
+        if not 0 <= start <= end <= len(self.lines):
+            raise IndexError(f"line range {start}:{end} outside 0:{len(self.lines)}")
+        tally = self.tally
+        for words, shadows, homophones in self._stats[start:end]:
+            tally.words -= words
+            _discount(tally.shadows, shadows)
+            _discount(tally.homophones, homophones)
+        new_lines = list(new_lines)
+        new_stats = [_scan_line(line) for line in new_lines] if stats is None else list(stats)
+        for words, shadows, homophones in new_stats:
+            tally.words += words
+            tally.shadows.update(shadows)
+            tally.homophones.update(homophones)
+        self.lines[start:end] = new_lines
+        self._stats[start:end] = new_stats
+
+    def set_line(self, index, text):
+        """Replace a single line"""
+        self.replace_lines(index, index + 1, [text])
+
+    def insert_lines(self, index, new_lines):
+        """Insert lines before index"""
+        self.replace_lines(index, index, new_lines)
+
+    def delete_lines(self, start, end=None):
+        """Delete lines[start:end] (a single line when end is omitted)"""
+        self.replace_lines(start, start + 1 if end is None else end, [])
+
+    def edit(self, start, end, text):
+        """Replace the text between (line, column) positions start and end
+
+        This is what an editor sends for a keystroke or paste; text may
+        contain newlines.
+        """
+        (start_line, start_col), (end_line, end_col) = start, end
+        if (start_line, start_col) > (end_line, end_col):
+            raise ValueError("edit start is after its end")
+        if end_line >= len(self.lines):
+            raise IndexError(f"line {end_line} outside 0:{len(self.lines)}")
+        head = self.lines[start_line][:start_col]
+        tail = self.lines[end_line][end_col:]
+        self.replace_lines(start_line, end_line + 1, (head + text + tail).split("\n"))
+
+    def report(self, top=10):
+        """Return the current analysis report"""
+        return self.tally.report(top=top)
+
+    def shadow_lines(self):
+        """Yield (line index, shadow word) for every shadow in the document"""
+        for index, (_, shadows, _) in enumerate(self._stats):
+            for word in shadows:
+                yield index, word
+
+    def verify(self):
+        """Compare the running totals with a full re-analysis
+
+        Returns (consistent, full_report).
+        """
+        full = AnalysisTally()
+        full.add_text(self.text)
+        consistent = (full.words == self.tally.words
+                      and full.shadows == self.tally.shadows
+                      and full.homophones == self.tally.homophones)
+        return consistent, full.report()
+
+# ============================================================================
+# REVISION DIFF
+# ============================================================================
+
+RevisionDiff = collections.namedtuple(
+    "RevisionDiff", "label report score_delta shadows_added shadows_removed "
+                    "chains_added chains_removed hunks lines_scanned")
+
+# A change ends where the revisions agree again for this many lines; the
+# window searched for that point starts small and doubles
+_RESYNC_LINES = 3
+_RESYNC_WINDOW = 64
+
+def _line_opcodes(old, new):
+    """Return (tag, i1, i2, j1, j2) for the changed hunks between two lists of lines
+
+    Equal lines are skipped in lockstep. At each change difflib aligns
+    only a window of lines after it, so the work grows with the size of
+    the changes rather than the document.
+    """
+    import difflib
+    limit = min(len(old), len(new))
+    tail = 0
+    while tail < limit and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+    n = len(old) - tail
+    m = len(new) - tail
+    opcodes = []
+    i = j = 0
+    while True:
+        while i < n and j < m and old[i] == new[j]:
+            i += 1
+            j += 1
+        if i == n or j == m:
+            if i < n or j < m:
+                opcodes.append(("delete" if j == m else "insert", i, n, j, m))
+            return opcodes
+        window = _RESYNC_WINDOW
+        while True:
+            matcher = difflib.SequenceMatcher(None, old[i:min(i + window, n)],
+                                              new[j:min(j + window, m)])
+            if i + window >= n and j + window >= m:
+                opcodes.extend((tag, i1 + i, i2 + i, j1 + j, j2 + j)
+                               for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+                               if tag != "equal")
+                return opcodes
+            block = next((block for block in matcher.get_matching_blocks()
+                          if block.size >= _RESYNC_LINES), None)
+            if block is not None:
+                tag = "replace" if block.a and block.b else "delete" if block.a else "insert"
+                opcodes.append((tag, i, i + block.a, j, j + block.b))
+                i += block.a
+                j += block.b
+                break
+            window *= 2
+
+def _unmatched_chains(chains, others):
+    """Return the chains with no counterpart (same text and problems) in others"""
+    remaining = collections.Counter((chain.text, chain.problems) for chain in others)
+    unmatched = []
+    for chain in chains:
+        key = (chain.text, chain.problems)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            unmatched.append(chain)
+    return unmatched
+
+class RevisionHistory:
+    """Analysis of successive revisions of one document (Part 12.2)
+
+    Each revision is aligned line by line with the one before and only
+    the changed hunks are analyzed; the AnalysisSession keeps the results
+    for every other line, and lines moved within the document reuse
+    theirs. The first revision is compared with an empty document.
+    """
+
+    def __init__(self):
+        self.session = AnalysisSession()
+        self.revisions = 0
+
+    def add(self, text, label=None, top=10):
+        """Move to the next revision and return its RevisionDiff"""
+        session = self.session
+        old_lines = session.lines
+        new_lines = text.split("\n")
+        previous_score = session.report(top=0)["sovereignty_score"]
+        opcodes = _line_opcodes(old_lines, new_lines)
+
+        # Results of the lines leaving the document, by text, so lines
+        # that only moved are not analyzed again
+        known = {}
+        shadows_before = collections.Counter()
+        chains_before = []
+        chains_after = []
+        for _, i1, i2, j1, j2 in opcodes:
+            for line, stats in zip(old_lines[i1:i2], session._stats[i1:i2]):
+                known[line] = stats
+                shadows_before.update(stats[1])
+            chains_before.extend(find_chains(old_lines[i1:i2], i1 + 1))
+            chains_after.extend(find_chains(new_lines[j1:j2], j1 + 1))
+
+        shadows_after = collections.Counter()
+        scanned = 0
+        with metric_stage("detect"):
+            # Back to front, so the old line numbers of earlier hunks stay valid
+            for _, i1, i2, j1, j2 in reversed(opcodes):
+                hunk_stats = []
+                for line in new_lines[j1:j2]:
+                    stats = known.get(line)
+                    if stats is None:
+                        stats = known[line] = _scan_line(line)
+                        scanned += 1
+                    hunk_stats.append(stats)
+                    shadows_after.update(stats[1])
+                session.replace_lines(i1, i2, new_lines[j1:j2], hunk_stats)
+
+        report = session.report(top=top)
+        first = not self.revisions
+        self.revisions += 1
+        return RevisionDiff(
+            label, report,
+            None if first else round(report["sovereignty_score"] - previous_score, 2),
+            (shadows_after - shadows_before).most_common(),
+            (shadows_before - shadows_after).most_common(),
+            _unmatched_chains(chains_after, chains_before),
+            _unmatched_chains(chains_before, chains_after),
+            len(opcodes), scanned)
+
+def diff_revisions(sources, top=10):
+    """Yield a RevisionDiff for each revision file in order (Part 12.2)"""
+    history = RevisionHistory()
+    for source in sources:
+        stream, should_close = _open_source(source)
+        try:
+            text = stream.read()
+        finally:
+            if should_close:
+                stream.close()
+        yield history.add(text, source, top)
+
+# ============================================================================
+# TRANSCRIPTS
+# ============================================================================
+
+# Part 12.3 alert defaults: hits (shadows and homophones) as a share of the
+# words spoken in the last TRANSCRIPT_WINDOW seconds, once the window holds
+# at least TRANSCRIPT_MIN_WORDS words
+TRANSCRIPT_WINDOW = 30.0
+TRANSCRIPT_MIN_WORDS = 20
+
+Cue = collections.namedtuple("Cue", "index start end text")
+CueReport = collections.namedtuple("CueReport", "cue words shadows homophones alert")
+TranscriptAlert = collections.namedtuple("TranscriptAlert", "start end words hits percent top")
+
+# SRT "00:01:02,500 --> 00:01:04,000" or WebVTT "01:02.500 --> 01:04.000 align:start"
+_CUE_TIMING_PATTERN = (r"\s*((?:\d+:)?\d{1,2}:\d{2}(?:[,.]\d{1,3})?)\s*-->"
+                       r"\s*((?:\d+:)?\d{1,2}:\d{2}(?:[,.]\d{1,3})?)")
+# WebVTT <c.yellow>/<00:01.000> tags, SRT <i> tags and {\an8} overrides
+_CUE_MARKUP_PATTERN = r"<[^>]*>|\{\\[^}]*\}"
+
+def parse_timestamp(text):
+    """Return seconds for an SRT or WebVTT timestamp
+
+    >>> parse_timestamp("01:02:03,450"), parse_timestamp("02:03.5")
+    (3723.45, 123.5)
+    """
+    clock, _, fraction = text.replace(",", ".").partition(".")
+    seconds = 0
+    for part in clock.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds + int(fraction.ljust(3, "0")) / 1000 if fraction else float(seconds)
+
+def format_timestamp(seconds):
+    """Return seconds as HH:MM:SS.mmm"""
+    millis = round(seconds * 1000)
+    return (f"{millis // 3600000:02d}:{millis // 60000 % 60:02d}:"
+            f"{millis // 1000 % 60:02d}.{millis % 1000:03d}")
+
+class CueParser:
+    """Incremental SRT/WebVTT parser: feed lines, receive finished cues
+
+    A cue is finished by the blank line after it (or close()). Header,
+    NOTE, STYLE and REGION blocks are skipped, as are blocks without a
+    timing line.
+    """
+
+    def __init__(self):
+        self.block = []
+        self.count = 0
+        self.timing = _regex(_CUE_TIMING_PATTERN)
+        self.markup = _regex(_CUE_MARKUP_PATTERN)
+
+    def feed_line(self, line):
+        """Add one line; return the Cue it finishes, or None"""
+        line = line.rstrip("\r\n").lstrip("\ufeff")
+        if line.strip():
+            self.block.append(line)
+            return None
+        return self.close()
+
+    def close(self):
+        """Finish the pending block; return its Cue, or None"""
+        block, self.block = self.block, []
+        # The timing line comes first (WebVTT) or after an identifier
+        for position, line in enumerate(block[:2]):
+            match = self.timing.match(line)
+            if match:
+                break
+        else:
+            return None
+        text = " ".join(self.markup.sub("", line).strip() for line in block[position + 1:])
+        if "&" in text:
+            import html
+            text = html.unescape(text)
+        self.count += 1
+        return Cue(self.count, parse_timestamp(match.group(1)),
+                   parse_timestamp(match.group(2)), text)
+
+def iter_cues(source, follow=False, poll=0.25, idle_timeout=None):
+    """Yield Cues from an SRT/WebVTT file, '-' (stdin) or stream
+
+    With follow, keep reading as the file grows (like tail -f) until
+    idle_timeout seconds pass without new data (forever when None). A
+    file that shrinks, as a rotated caption log does, is read again from
+    the start.
+    """
+    stream, should_close = _open_source(source)
+    parser = CueParser()
+    partial = ""
+    idle = 0.0
+    try:
+        while True:
+            line = stream.readline()
+            if line:
+                idle = 0.0
+                partial += line
+                if follow and not partial.endswith("\n"):
+                    continue
+                cue = parser.feed_line(partial)
+                partial = ""
+                if cue is not None:
+                    yield cue
+                continue
+            if not follow or idle_timeout is not None and idle >= idle_timeout:
+                break
+            if should_close and os.fstat(stream.fileno()).st_size < stream.tell():
+                stream.seek(0)
+                parser = CueParser()
+                partial = ""
+            time.sleep(poll)
+            idle += poll
+        if partial:
+            parser.feed_line(partial)
+        cue = parser.close()
+        if cue is not None:
+            yield cue
+    finally:
+        if should_close:
+            stream.close()
+
+def replay_cues(cues, speed=1.0):
+    """Yield cues no earlier than their start times, as a live feed would"""
+    started = time.perf_counter()
+    for cue in cues:
+        delay = cue.start / speed - (time.perf_counter() - started)
+        if delay > 0:
+            time.sleep(delay)
+        yield cue
+
+class TranscriptMonitor:
+    """Per-cue shadow and homophone detection with windowed alerts (Part 12.3)
+
+    The window holds the cues that ended in the last window seconds. An
+    alert is raised when the share of hit words in it reaches threshold
+    percent, and not again until the share has dropped below it.
+    """
+
+    def __init__(self, window=TRANSCRIPT_WINDOW, threshold=RED_FLAG_PERCENT,
+                 min_words=TRANSCRIPT_MIN_WORDS):
+        self.window = window
+        self.threshold = threshold
+        self.min_words = min_words
+        self.recent = collections.deque()
+        self.window_words = 0
+        self.window_hits = collections.Counter()
+        self.alerting = False
+        self.alerts = []
+        self.tally = AnalysisTally()
+        self.cues = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def add(self, cue):
+        """Analyze one cue and return its CueReport"""
+        started = time.perf_counter()
+        with metric_stage("detect"):
+            words, shadows, homophones = _scan_line(cue.text)
+        tally = self.tally
+        tally.words += words
+        tally.shadows.update(shadows)
+        tally.homophones.update(homophones)
+        hits = shadows + tuple(word for word in homophones if word not in shadows)
+
+        recent = self.recent
+        recent.append((cue.start, cue.end, words, hits))
+        self.window_words += words
+        self.window_hits.update(hits)
+        horizon = cue.end - self.window
+        while recent and recent[0][1] < horizon:
+            _, _, old_words, old_hits = recent.popleft()
+            self.window_words -= old_words
+            _discount(self.window_hits, old_hits)
+
+        alert = None
+        hit_count = sum(self.window_hits.values())
+        percent = 100.0 * hit_count / self.window_words if self.window_words else 0.0
+        if self.window_words >= self.min_words and percent >= self.threshold:
+            if not self.alerting:
+                alert = TranscriptAlert(recent[0][0], cue.end, self.window_words, hit_count,
+                                        round(percent, 2), self.window_hits.most_common(3))
+                self.alerts.append(alert)
+                metric_count("transcript_alerts")
+            self.alerting = True
+        else:
+            self.alerting = False
+
+        elapsed = time.perf_counter() - started
+        self.cues += 1
+        self.latency_total += elapsed
+        self.latency_max = max(self.latency_max, elapsed)
+        metric_observe("cue_latency_ms", elapsed * 1000)
+        return CueReport(cue, words, shadows, homophones, alert)
+
+    def report(self, top=10):
+        """Return the transcript's analysis report with its alerts"""
+        report = self.tally.report(top=top)
+        report["cues"] = self.cues
+        report["alerts"] = [alert._asdict() for alert in self.alerts]
+        report["latency_ms"] = {
+            "mean": round(1000 * self.latency_total / self.cues, 4) if self.cues else 0.0,
+            "max": round(1000 * self.latency_max, 4),
+        }
+        return report
+
+# ============================================================================
+# ANALYSIS SERVICE
+# ============================================================================
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+
+# Longest request line accepted (one JSON document per line)
+SERVICE_LINE_LIMIT = 1 << 24
+
+def _detect_words(words):
+    """Batch V+CC detection, falling back to the scalar path without numpy"""
+    try:
+        is_vcc, types = detect_vcc_batch(words)
+    except ImportError:
+        prefixes = [vcc_prefix(word) for word in words]
+        operational = vcc_rules().operational
+        return ([p is not None for p in prefixes],
+                [PREFIX_NONE if p is None else PREFIX_OPERATIONAL if p in operational
+                 else PREFIX_POSITIONAL for p in prefixes])
+    return is_vcc.tolist(), types.tolist()
+
+def _resonate_words(words):
+    try:
+        sums, reduced = calculate_resonance_batch(words)
+    except ImportError:
+        sums = [letter_sum(word) for word in words]
+        return sums, [reduce_resonance(total) for total in sums]
+    return sums.tolist(), reduced.tolist()
+
+def _request_words(request):
+    """Return a request's "words", which must be a list of strings"""
+    words = request.get("words")
+    if not isinstance(words, list) or not all(isinstance(word, str) for word in words):
+        raise TypeError('"words" must be a list of strings')
+    return words
+
+class _RequestBatcher:
+    """Coalesce concurrent word-list requests into one vectorized call
+
+    Requests wait at most window seconds (or until max_words are queued)
+    before the combined batch runs. The queue is bounded, so a flood of
+    requests makes submitters wait instead of growing memory.
+    """
+
+    def __init__(self, func, stats, window=0.002, max_words=1 << 16, max_pending=1024):
+        import asyncio
+        self.func = func
+        self.stats = stats
+        self.window = window
+        self.max_words = max_words
+        self.queue = asyncio.Queue(max_pending)
+        self.task = None
+
+    async def submit(self, words):
+        import asyncio
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((words, future))
+        return await future
+
+    async def _run(self):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.window
+            while size < self.max_words:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[0])
+
+            words = [word for item, _ in batch for word in item]
+            try:
+                columns = await loop.run_in_executor(None, self.func, words)
+            except Exception:
+                # Run each request on its own so an error reaches only
+                # the request that caused it
+                for item, future in batch:
+                    try:
+                        result = await loop.run_in_executor(None, self.func, item)
+                    except Exception as exc:
+                        if not future.done():
+                            future.set_exception(exc)
+                    else:
+                        if not future.done():
+                            future.set_result(list(result))
+                continue
+            self.stats.batches += 1
+            self.stats.batched_words += len(words)
+            start = 0
+            for item, future in batch:
+                end = start + len(item)
+                if not future.done():
+                    future.set_result([column[start:end] for column in columns])
+                start = end
+
+class ServiceStats:
+    """Request counters and a rolling latency window for the service"""
+
+    def __init__(self, window=4096):
+        self.started = time.monotonic()
+        self.requests = collections.Counter()
+        self.errors = 0
+        self.batches = 0
+        self.batched_words = 0
+        self.latencies = collections.deque(maxlen=window)
+
+    def record(self, op, seconds):
+        self.requests[op] += 1
+        self.latencies.append(seconds)
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        total = sum(self.requests.values())
+        ordered = sorted(self.latencies)
+
+        def percentile(q):
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+        return {
+            "uptime_s": round(uptime, 3),
+            "requests": total,
+            "requests_by_op": dict(self.requests),
+            "errors": self.errors,
+            "throughput_rps": round(total / uptime, 2) if uptime else 0.0,
+            "latency_ms": ({"p50": percentile(0.50), "p95": percentile(0.95),
+                            "p99": percentile(0.99), "max": round(ordered[-1] * 1000, 3)}
+                           if ordered else {}),
+            "batches": self.batches,
+            "mean_batch_words": (round(self.batched_words / self.batches, 1)
+                                 if self.batches else 0.0),
+        }
+
+class AnalysisService:
+    """Line-delimited JSON analysis server for local tools
+
+    Each request is one JSON object per line with an "op" and optional
+    "id"; each response echoes the id with "ok" and "result" or "error".
+    Ops: analyze, detect, resonance, homophones, components, stats, ping.
+    """
+
+    def __init__(self, window=0.002, max_batch=1 << 16, max_inflight=64):
+        self.stats = ServiceStats()
+        self.max_inflight = max_inflight
+        self.detect = _RequestBatcher(_detect_words, self.stats, window, max_batch)
+        self.resonance = _RequestBatcher(_resonate_words, self.stats, window, max_batch)
+        self.server = None
+        self.connections = {}
+
+    @staticmethod
+    def warm_up():
+        """Load every database and compiled table once, before serving"""
+        vcc_rules()
+        semantic_shadows()
+        homophone_automaton()
+        _affix_tries()
+        try:
+            _vcc_tables()
+        except ImportError:
+            pass
+
+    async def start(self, host=SERVICE_HOST, port=SERVICE_PORT, unix_path=None):
+        """Start listening; returns the asyncio server"""
+        import asyncio
+        self.warm_up()
+        if unix_path:
+            self.server = await asyncio.start_unix_server(
+                self.handle, unix_path, limit=SERVICE_LINE_LIMIT)
+        else:
+            self.server = await asyncio.start_server(
+                self.handle, host, port, limit=SERVICE_LINE_LIMIT)
+        return self.server
+
+    async def close(self):
+        """Stop listening, close open connections and stop the batch workers"""
+        import asyncio
+        if self.server is not None:
+            self.server.close()
+        for writer in list(self.connections):
+            writer.close()
+        if self.connections:
+            await asyncio.gather(*self.connections.values(), return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        for batcher in (self.detect, self.resonance):
+            if batcher.task is not None:
+                batcher.task.cancel()
+                await asyncio.gather(batcher.task, return_exceptions=True)
+                batcher.task = None
+
+    async def handle(self, reader, writer):
+        """Serve one connection, pipelining up to max_inflight requests"""
+        import asyncio
+        import json
+        inflight = asyncio.Semaphore(self.max_inflight)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        self.connections[writer] = asyncio.current_task()
+
+        async def respond(line):
+            try:
+                started = time.perf_counter()
+                response = await self.dispatch(line)
+                self.stats.record(response.pop("_op", "?"), time.perf_counter() - started)
+                data = (json.dumps(response, ensure_ascii=False) + "\n").encode()
+                async with write_lock:
+                    writer.write(data)
+                    await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                inflight.release()
+
+        try:
+            while True:
+                # Backpressure: stop reading until a request slot frees up
+                await inflight.acquire()
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    inflight.release()
+                    break
+                if not line:
+                    inflight.release()
+                    break
+                task = asyncio.ensure_future(respond(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+
+    async def dispatch(self, line):
+        """Decode one request line and return the response dict"""
+        import json
+        request_id = op = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            op = request.get("op")
+            result = await self.run(op, request)
+            return {"id": request_id, "ok": True, "result": result, "_op": op}
+        except Exception as exc:
+            self.stats.errors += 1
+            return {"id": request_id, "ok": False,
+                    "error": f"{type(exc).__name__}: {exc}", "_op": op or "invalid"}
+
+    async def run(self, op, request):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if op == "ping":
+            return "pong"
+        if op == "stats":
+            return self.stats.snapshot()
+        if op == "detect":
+            is_vcc, types = await self.detect.submit(_request_words(request))
+            return {"vcc": is_vcc, "prefix_types": types}
+        if op == "resonance":
+            sums, reduced = await self.resonance.submit(_request_words(request))
+            return {"letter_sums": sums, "resonance": reduced}
+        if op == "analyze":
+            return await loop.run_in_executor(None, analyze_text, request["text"])
+        if op == "homophones":
+            hits = await loop.run_in_executor(None, find_homophones, request["text"])
+            return [hit._asdict() for hit in hits]
+        if op == "components":
+            return [extract_components(word)._asdict() for word in _request_words(request)]
+        raise ValueError(f"unknown op {op!r}")
+
+class ServiceClient:
+    """Minimal asyncio client for AnalysisService (used by tools and tests)"""
+
+    def __init__(self, reader, writer):
+        import asyncio
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self.next_id = 0
+        self.listener = asyncio.ensure_future(self._listen())
+
+    @classmethod
+    async def connect(cls, host=SERVICE_HOST, port=SERVICE_PORT, unix_path=None):
+        import asyncio
+        if unix_path:
+            reader, writer = await asyncio.open_unix_connection(
+                unix_path, limit=SERVICE_LINE_LIMIT)
+        else:
+            reader, writer = await asyncio.open_connection(
+                host, port, limit=SERVICE_LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        import json
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.pending.pop(response.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("service closed the connection"))
+
+    async def request(self, op, **fields):
+        """Send one request and return its result, raising on service errors"""
+        import asyncio
+        import json
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[self.next_id] = future
+        self.writer.write((json.dumps(dict(fields, op=op, id=self.next_id)) + "\n").encode())
+        await self.writer.drain()
+        response = await future
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT, unix_path=None, **options):
+    """Run the analysis service until interrupted"""
+    import asyncio
+
+    async def main():
+        service = AnalysisService(**options)
+        server = await service.start(host, port, unix_path)
+        where = unix_path or "{}:{}".format(*server.sockets[0].getsockname()[:2])
+        print(f"CodexGlyph analysis service listening on {where}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+# ============================================================================
+# DISPLAY FUNCTIONS
+# ============================================================================
+
+ABOUT_TEXT = """
+ABOUT THIS MANUAL
+═══════════════════════════════════════════════════════════════════════
+
+Version: 1.0 COMPLETE
+Status: CANONICAL
+Date: December 11, 2024
+Authors: Captain Don & Claude
+
+This manual represents the complete, corrected CodexGlyph framework
+for sovereign language analysis. All tilde formatting errors have been
+resolved and the rules are now canonically defined.
+
+KEY FEATURES:
+  • 13 comprehensive parts covering all aspects
+  • V+CC shadow detection algorithm
+  • Tilde positional clause (corrected)
+  • Top 20 homophone weaponization database
+  • Legal formatting templates
+  • Multiple parsing levels
+  • Quick reference card
+
+CORRECTIONS APPLIED:
+  ✓ Tilde rule clarified (ONE per word maximum)
+  ✓ All examples updated to match rule
+  ✓ Markdown safety warnings added
+  ✓ Polarity matching doctrine refined
+
+The foundation is solid. The rules are clear. The vision is captured.
+
+🦊
+"""
+
+def clear_screen():
+    """Clear the terminal screen"""
+    os.system('cls' if os.name == 'nt' else 'clear')
+
+def show_header():
+    """Display the program header"""
+    print(MANUAL_CONTENT["header"])
+
+def show_menu():
+    """Display the main menu"""
+    print("\n" + "─" * 70)
+    print("  TABLE OF CONTENTS")
+    print("─" * 70)
+    print("  [1]  Foundation")
+    print("  [2]  The V+CC Shadow Rule")
+    print("  [3]  The Tilde Positional Clause ⭐ CORRECTED")
+    print("  [4]  Polarity Matching Doctrine")
+    print("  [5]  Compound Word Distinctions")
+    print("  [6]  Parsing Levels")
+    print("  [7]  Homophone Weaponization (Top 20)")
+    print("  [8]  Letter Combinations")
+    print("  [9]  Databases Reference")
+    print("  [10] Advanced Features")
+    print("  [11] Legal Formatting")
+    print("  [12] Use Cases")
+    print("  [13] Implementation Guide")
+    print()
+    print("  [Q]  Quick Reference Card")
+    print("  [G]  Glossary")
+    print("  [A]  About This Manual")
+    print("  [X]  Exit")
+    print("─" * 70)
+
+def display_part(part_key):
+    """Display a specific part of the manual"""
+    clear_screen()
+    show_header()
+    print(manual_text(part_key))
+    input("\nPress Enter to return to menu...")
+
+def show_about():
+    """Display information about the manual"""
+    clear_screen()
+    show_header()
+    print(ABOUT_TEXT)
+    input("\nPress Enter to return to menu...")
+
+def search_manual(query, index=None):
+    """Search the manual for a term using the prebuilt index, best hits first
+
+    Terms are ANDed; put OR between terms to widen the match. A trailing *
+    makes a term prefix-only and "quoted words" are matched as one phrase.
+    """
+    return (index or get_search_index()).search(query)
+
+def search_manual_linear(query):
+    """Search the manual for a term (linear fallback, document order)"""
+    results = []
+    query_lower = query.lower()
+    
+    for part_name in MANUAL_CONTENT:
+        content = manual_text(part_name)
+        if query_lower in content.lower():
+            # Find line containing query
+            lines = content.split('\n')
+            for i, line in enumerate(lines):
+                if query_lower in line.lower():
+                    results.append((part_name, i+1, line.strip()))
+    
+    return results
+
+def show_search():
+    """Display search interface"""
+    clear_screen()
+    show_header()
+    print("SEARCH MANUAL")
+    print("═" * 70)
+    print()
+    query = input("Enter search term (or press Enter to cancel): ").strip()
+    
+    if not query:
+        return
+    
+    results = search_manual(query)
+    
+    print()
+    if results:
+        print(f"Found {len(results)} result(s) for '{query}':")
+        print("─" * 70)
+        for part, line_num, line in results[:20]:  # Show first 20 results
+            print(f"\n[{part.upper()}] Line {line_num}:")
+            print(f"  {line[:100]}...")
+    else:
+        print(f"No results found for '{query}'")
+    
+    print()
+    input("\nPress Enter to return to menu...")
+
+# ============================================================================
+# CORPUS SCANNER
+# ============================================================================
+
+# File types scanned by default (contracts, emails, transcripts ...)
+SCAN_EXTENSIONS = (".txt", ".text", ".md", ".eml", ".srt", ".vtt", ".csv", ".log")
+
+def iter_corpus_files(root, extensions=SCAN_EXTENSIONS):
+    """Yield (path, size) for matching files under root in sorted order"""
+    if os.path.isfile(root):
+        yield root, os.path.getsize(root)
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if extensions and not name.lower().endswith(extensions):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                yield path, os.path.getsize(path)
+            except OSError:
+                continue
+
+def balanced_batches(sized_items, count):
+    """Split (item, size) pairs into at most count batches of similar size
+
+    Largest items are placed first, each into the currently lightest
+    batch, so one huge file does not end up queued behind many others.
+    """
+    batches = [(0, i, []) for i in range(max(1, count))]
+    for item, size in sorted(sized_items, key=lambda pair: -pair[1]):
+        total, i, items = heapq.heappop(batches)
+        items.append(item)
+        heapq.heappush(batches, (total + size, i, items))
+    return [items for _, _, items in sorted(batches, key=lambda b: b[1]) if items]
+
+def analyze_file(path):
+    """Return the AnalysisTally for a single file"""
+    tally = AnalysisTally()
+    for chunk in iter_chunks(path):
+        tally.add_text(chunk)
+    if METRICS is not None:
+        METRICS.counters["files"] += 1
+        if tally.words:
+            METRICS.observe("file_shadow_percent",
+                            100.0 * sum(tally.shadows.values()) / tally.words)
+    return tally
+
+def _scan_batch(paths):
+    """Worker: analyze a batch of files, returning (path, tally) pairs"""
+    return [(path, analyze_file(path)) for path in paths]
+
+def _run_instrumented(worker, batch):
+    """Worker wrapper: run with fresh metrics and send them back"""
+    enable_metrics()
+    result = worker(batch)
+    return result, disable_metrics().snapshot()
+
+def run_batches(worker, batches, workers):
+    """Run worker over batches, in-process or across a process pool
+
+    Yields each batch's result in batch order. With instrumentation on,
+    worker processes collect their own metrics and they are merged here.
+    """
+    if workers <= 1 or len(batches) <= 1:
+        for batch in batches:
+            yield worker(batch)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if METRICS is None:
+            yield from pool.map(worker, batches)
+            return
+        metrics = METRICS
+        for result, snapshot in pool.map(functools.partial(_run_instrumented, worker), batches):
+            metrics.merge(snapshot)
+            yield result
+
+def scan_corpus(root, workers=None, extensions=SCAN_EXTENSIONS, cache=None):
+    """Analyze every document under root across a process pool
+
+    With a ResultCache, files whose content was analyzed before (under
+    the same databases) are not analyzed again. Returns (per-file list
+    of (path, tally) sorted by path, corpus tally).
+    """
+    workers = workers or os.cpu_count() or 1
+    files = list(iter_corpus_files(root, extensions))
+    results = []
+    digests = {}
+    if cache is not None:
+        files, results, digests = cache.lookup_files(files)
+    # A few batches per worker keeps the pool busy when sizes are uneven
+    batches = balanced_batches(files, workers * 4)
+    analyzed = []
+    for batch_result in run_batches(_scan_batch, batches, workers):
+        analyzed.extend(batch_result)
+    if cache is not None:
+        cache.store((digests[path], tally) for path, tally in analyzed)
+        cache.evict()
+    results.extend(analyzed)
+    results.sort(key=lambda pair: pair[0])
+
+    corpus = AnalysisTally()
+    for _, tally in results:
+        corpus.merge(tally)
+    return results, corpus
+
+# ============================================================================
+# LETTER STATISTICS
+# ============================================================================
+
+# Part 8 letters as codes 0-25 by byte value, in either case; any other
+# byte is 26 and separates words
+_LETTER_CODES = bytes(
+    (b - 65 if 65 <= b <= 90 else b - 97 if 97 <= b <= 122 else 26) for b in range(256))
+
+def _pair_index(pair):
+    return (ord(pair[0]) - 65) * 26 + ord(pair[1]) - 65
+
+class LetterCounts:
+    """Letter, letter-pair and word-initial pair counts for Part 8 profiles
+
+    Pairs are adjacent letters inside a word, which covers both the
+    digraphs (TH, KN) and the clusters (ST, BL). Counts are int64 arrays,
+    so partial counts from chunks, files or worker processes combine by
+    addition with merge().
+
+    >>> counts = LetterCounts()
+    >>> counts.add_text("Know the knife")
+    >>> counts.words, counts.pair("KN"), counts.pair("TH", initial=True)
+    (3, 2, 1)
+    """
+
+    def __init__(self):
+        np = _numpy()
+        self.letters = np.zeros(26, dtype=np.int64)
+        self.pairs = np.zeros(26 * 26, dtype=np.int64)
+        self.initials = np.zeros(26 * 26, dtype=np.int64)
+        self.words = 0
+
+    def add_text(self, text):
+        """Count a piece of text on its own (non-ASCII letters end a word)"""
+        self.add_bytes(text.encode("ascii", "replace"))
+
+    def add_bytes(self, data, tail=b"\x1a\x1a"):
+        """Count ASCII or UTF-8 bytes and return the codes of the last two
+
+        Passing that tail on with the next block of the same stream counts
+        words cut at the block boundary as whole words.
+        """
+        with metric_stage("letters"):
+            np = _numpy()
+            codes = np.frombuffer(tail + data.translate(_LETTER_CODES), dtype=np.uint8)
+            current = codes[2:]
+            letters = current < 26
+            self.letters += np.bincount(current[letters], minlength=26)
+            self.words += int(np.count_nonzero(letters & (codes[1:-1] == 26)))
+
+            first = codes[1:-1]
+            joined = (first < 26) & (current < 26)
+            index = first.astype(np.uint16) * 26 + current
+            self.pairs += np.bincount(index[joined], minlength=26 * 26)
+            initial = joined & (codes[:-2] == 26)
+            self.initials += np.bincount(index[initial], minlength=26 * 26)
+            return codes[-2:].tobytes()
+
+    def merge(self, other):
+        """Add another LetterCounts into this one"""
+        self.letters += other.letters
+        self.pairs += other.pairs
+        self.initials += other.initials
+        self.words += other.words
+        return self
+
+    def letter(self, letter):
+        return int(self.letters[ord(letter.upper()) - 65])
+
+    def pair(self, pair, initial=False):
+        """Return how often a two-letter pair occurs (only word-initially if initial)"""
+        counts = self.initials if initial else self.pairs
+        return int(counts[_pair_index(pair.upper())])
+
+    def profile(self, top=10):
+        """Return the counts as a report annotated with the Part 8 meanings"""
+        np = _numpy()
+        data = load_database("letters")
+        total = int(self.letters.sum())
+        pair_total = int(self.pairs.sum())
+
+        def percent(count, whole):
+            return round(100.0 * count / whole, 3) if whole else 0.0
+
+        def annotate(table):
+            return [{"pair": pair, "meaning": entry["meaning"], "count": self.pair(pair),
+                     "initial": self.pair(pair, initial=True),
+                     "percent": percent(self.pair(pair), pair_total)}
+                    for pair, entry in table.items() if len(pair) == 2 and pair.isalpha()]
+
+        def ranked(counts, name):
+            order = np.argsort(-counts, kind="stable")[:top]
+            return [(name(int(i)), int(counts[i])) for i in order if counts[i]]
+
+        return {
+            "letters": total,
+            "words": self.words,
+            "pairs": pair_total,
+            "roots": [{"letter": letter, "value": entry["value"], "meaning": entry["meaning"],
+                       "count": self.letter(letter),
+                       "percent": percent(self.letter(letter), total)}
+                      for letter, entry in data["roots"].items()],
+            "digraphs": annotate(data["digraphs"]),
+            "clusters": annotate(data["clusters"]),
+            "top_letters": ranked(self.letters, lambda i: chr(65 + i)),
+            "top_pairs": ranked(self.pairs, lambda i: chr(65 + i // 26) + chr(65 + i % 26)),
+        }
+
+def count_letters(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return the LetterCounts of a file, '-' (stdin) or stream
+
+    Files are counted as raw bytes block by block, so they are neither
+    decoded nor split on word boundaries first.
+    """
+    counts = LetterCounts()
+    if hasattr(source, "read") or source == "-":
+        for chunk in iter_chunks(source, chunk_size):
+            counts.add_text(chunk)
+        return counts
+    tail = b"\x1a\x1a"
+    with open(source, "rb") as f:
+        for block in iter(functools.partial(f.read, chunk_size), b""):
+            tail = counts.add_bytes(block, tail)
+    return counts
+
+def _letter_batch(paths):
+    """Worker: count letters in a batch of files, returning (path, counts) pairs"""
+    return [(path, count_letters(path)) for path in paths]
+
+def letter_statistics(root, workers=None, extensions=SCAN_EXTENSIONS):
+    """Count letters in every document under root across a process pool
+
+    Returns (per-file list of (path, LetterCounts) sorted by path,
+    corpus LetterCounts).
+    """
+    workers = workers or os.cpu_count() or 1
+    batches = balanced_batches(iter_corpus_files(root, extensions), workers * 4)
+    results = []
+    for batch_result in run_batches(_letter_batch, batches, workers):
+        results.extend(batch_result)
+    results.sort(key=lambda pair: pair[0])
+
+    corpus = LetterCounts()
+    for _, counts in results:
+        corpus.merge(counts)
+    return results, corpus
+
+# ============================================================================
+# RESULT CACHE
+# ============================================================================
+
+RESULT_CACHE_VERSION = 1
+
+@functools.lru_cache(maxsize=None)
+def database_version():
+    """Return a digest of every database and the result format version"""
+    import hashlib
+    digest = hashlib.sha256(str(RESULT_CACHE_VERSION).encode())
+    for name in sorted(os.listdir(DATABASE_DIR)):
+        if name.endswith(".json"):
+            with open(os.path.join(DATABASE_DIR, name), "rb") as f:
+                digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()
+
+def _file_digest(path):
+    import hashlib
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ResultCache:
+    """Per-document analysis results in SQLite, keyed by content hash
+
+    Entries are keyed by (SHA-256 of the file, database_version()), so
+    editing a database invalidates them. A path table remembers each
+    file's size and mtime, letting unchanged files skip even hashing.
+    The database runs in WAL mode and every batch of writes is one
+    transaction, so a crash loses at most the scan in progress.
+    Eviction is LRU by last access, bounded by max_bytes and max_age
+    (seconds); either may be None.
+    """
+
+    def __init__(self, path, max_bytes=None, max_age=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.version = database_version()
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        self.db = self._connect()
+
+    def _connect(self):
+        import sqlite3
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        try:
+            return self._open(sqlite3)
+        except sqlite3.DatabaseError:
+            # A damaged cache is only lost speed: start a new one
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except OSError:
+                    pass
+            return self._open(sqlite3)
+
+    def _open(self, sqlite3):
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                digest TEXT NOT NULL, version TEXT NOT NULL, data BLOB NOT NULL,
+                size INTEGER NOT NULL, accessed REAL NOT NULL,
+                PRIMARY KEY (digest, version));
+            CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+            CREATE TABLE IF NOT EXISTS paths (
+                path TEXT PRIMARY KEY, size INTEGER NOT NULL,
+                mtime INTEGER NOT NULL, digest TEXT NOT NULL);
+        """)
+        return db
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _encode(tally):
+        return marshal.dumps((tally.words, dict(tally.shadows), dict(tally.homophones)))
+
+    @staticmethod
+    def _decode(data):
+        words, shadows, homophones = marshal.loads(data)
+        tally = AnalysisTally()
+        tally.words = words
+        tally.shadows.update(shadows)
+        tally.homophones.update(homophones)
+        return tally
+
+    def get(self, digest):
+        """Return the cached AnalysisTally for a content digest, or None"""
+        row = self.db.execute("SELECT data FROM results WHERE digest = ? AND version = ?",
+                              (digest, self.version)).fetchone()
+        if row is None:
+            return None
+        with self.db:
+            self.db.execute("UPDATE results SET accessed = ? WHERE digest = ? AND version = ?",
+                            (time.time(), digest, self.version))
+        return self._decode(row[0])
+
+    def lookup_files(self, files):
+        """Split (path, size) pairs into cache misses and hits
+
+        Returns (missing (path, size) pairs, [(path, tally)] for hits,
+        {path: digest} for the misses).
+        """
+        db = self.db
+        missing = []
+        hits = []
+        digests = {}
+        touched = []
+        paths = []
+        now = time.time()
+        for path, size in files:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            row = db.execute("SELECT size, mtime, digest FROM paths WHERE path = ?",
+                             (path,)).fetchone()
+            if row and row[0] == size and row[1] == mtime:
+                digest = row[2]
+            else:
+                digest = _file_digest(path)
+                paths.append((path, size, mtime, digest))
+            found = db.execute("SELECT data FROM results WHERE digest = ? AND version = ?",
+                               (digest, self.version)).fetchone()
+            if found is None:
+                missing.append((path, size))
+                digests[path] = digest
+            else:
+                hits.append((path, self._decode(found[0])))
+                touched.append((now, digest, self.version))
+        with db:
+            db.executemany("INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?)", paths)
+            db.executemany("UPDATE results SET accessed = ? WHERE digest = ? AND version = ?",
+                           touched)
+        self.stats["hits"] += len(hits)
+        self.stats["misses"] += len(missing)
+        metric_count("cache_hits", len(hits))
+        metric_count("cache_misses", len(missing))
+        return missing, hits, digests
+
+    def store(self, items):
+        """Store (digest, tally) pairs in one transaction"""
+        now = time.time()
+        rows = []
+        for digest, tally in items:
+            data = self._encode(tally)
+            rows.append((digest, self.version, data, len(data), now))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", rows)
+        self.stats["stored"] += len(rows)
+
+    def evict(self):
+        """Drop entries past max_age, then least recently used past max_bytes"""
+        db = self.db
+        evicted = 0
+        with db:
+            if self.max_age is not None:
+                evicted += db.execute("DELETE FROM results WHERE accessed < ?",
+                                      (time.time() - self.max_age,)).rowcount
+            if self.max_bytes is not None:
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                if total > self.max_bytes:
+                    doomed = []
+                    for rowid, size in db.execute(
+                            "SELECT rowid, size FROM results ORDER BY accessed"):
+                        if total <= self.max_bytes:
+                            break
+                        doomed.append((rowid,))
+                        total -= size
+                    db.executemany("DELETE FROM results WHERE rowid = ?", doomed)
+                    evicted += len(doomed)
+            db.execute("DELETE FROM paths WHERE digest NOT IN (SELECT digest FROM results)")
+        self.stats["evicted"] += evicted
+        return evicted
+
+# ============================================================================
+# TILDE LINTER
+# ============================================================================
+
+LINT_EXTENSIONS = (".md", ".markdown")
+LINT_CACHE_NAME = ".codexglyph-lint.json"
+LINT_CACHE_VERSION = 2
+
+LintViolation = collections.namedtuple(
+    "LintViolation", "line column rule text suggestion")
+
+LINT_MESSAGES = {
+    "tilde-wrap": "tildes around text render as strikethrough (Part 3.4)",
+    "tilde-chain": "more than one tilde in a word (Part 3.1, 3.4)",
+    "tilde-prefix": "tilde after a non-positional prefix (Part 3.1)",
+}
+
+# One pass over the document. Code is matched first so its tildes are
+# skipped, then text wrapped in tildes; what is left is every word that
+# has a tilde in it or at either end, classified in lint_text.
+_LINT_PATTERN = (
+    r"(?m)(?P<fence>^[ \t]*(?P<mark>`{3,}|~{3,})[^\n]*\n[\s\S]*?(?:^[ \t]*(?P=mark)[ \t]*$|\Z))"
+    r"|(?P<code>(?P<ticks>`+)[^\n]*?(?P=ticks))"
+    r"|(?P<wrap>(?<![^\W_])~~?(?=[^\s~])[^~\n]*?(?<=[^\s~])~~?(?![^\W_]))"
+    r"|(?P<word>(?<![^\W_~])(?=~|[^\W_]+~)~*[^\W_]+(?:~+[^\W_]+)*~*)"
+)
+
+def _tilde_fix(word):
+    """Keep a tilde only after a leading positional prefix; hyphenate the rest"""
+    left, sep, rest = word.partition("~")
+    positional = vcc_rules().positional
+    if sep and left.upper() in positional:
+        return f"{left}~{rest.replace('~', '-')}"
+    return word.replace("~", "-")
+
+def lint_text(text):
+    """Return the LintViolations in a Markdown document"""
+    violations = []
+    if "~" not in text:
+        return violations
+    import re
+    pattern = _regex(_LINT_PATTERN)
+    positional = vcc_rules().positional
+    line_starts = None
+    for match in pattern.finditer(text):
+        rule = match.lastgroup
+        if rule in ("fence", "code"):
+            continue
+        found = match.group()
+        if rule == "wrap":
+            suggestion = found.strip("~").replace("~", "-")
+            rule = "tilde-wrap"
+        elif found.count("~") > 1:
+            suggestion = _tilde_fix(_regex("~+").sub("~", found.strip("~")))
+            rule = "tilde-chain"
+        elif found[0] == "~" or found[-1] == "~":
+            # A lone tilde before or after a word (~5 minutes) is not a seam
+            continue
+        elif found.partition("~")[0].upper() in positional:
+            continue
+        else:
+            suggestion = found.replace("~", "-")
+            rule = "tilde-prefix"
+        if line_starts is None:
+            line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+        line = bisect.bisect_right(line_starts, match.start())
+        column = match.start() - line_starts[line - 1] + 1
+        violations.append(LintViolation(line, column, rule, found, suggestion))
+    return violations
+
+def lint_file(path):
+    """Return (sha256 of the content, LintViolations) for a file"""
+    import hashlib
+    with open(path, "rb") as f:
+        raw = f.read()
+    return hashlib.sha256(raw).hexdigest(), lint_text(raw.decode("utf-8", "replace"))
+
+def _lint_batch(items):
+    """Worker: lint (path, cached digest) items whose content changed
+
+    Returns (path, digest, violations) triples; violations is None when
+    the digest matches the cached one, leaving the cached result valid.
+    """
+    import hashlib
+    results = []
+    for path, cached in items:
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        violations = None
+        if digest != cached:
+            violations = lint_text(raw.decode("utf-8", "replace"))
+        results.append((path, digest, violations))
+    return results
+
+def _lint_fingerprint():
+    """Identify the rules a cached result was produced under"""
+    return [LINT_CACHE_VERSION, list(vcc_rules().positional)]
+
+def _load_lint_cache(path):
+    import json
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("fingerprint") != _lint_fingerprint():
+        return {}
+    return cache.get("files", {})
+
+def _save_lint_cache(path, files):
+    import json
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": _lint_fingerprint(), "files": files}, f)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+def lint_tree(root, workers=None, cache_path=None, extensions=LINT_EXTENSIONS):
+    """Lint every Markdown file under root, reusing cached results
+
+    A file is skipped when its size and mtime match the cache, and is
+    only re-linted when its SHA-256 differs from the cached digest.
+    Pass cache_path="" to disable the cache. Returns (sorted list of
+    (path, violations), {"files", "linted", "cached"}).
+    """
+    workers = workers or os.cpu_count() or 1
+    if cache_path is None:
+        base = root if os.path.isdir(root) else os.path.dirname(root) or "."
+        cache_path = os.path.join(base, LINT_CACHE_NAME)
+    cache = _load_lint_cache(cache_path) if cache_path else {}
+    files = {}
+    pending = []
+    for path, size in iter_corpus_files(root, extensions):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        entry = cache.get(path)
+        if entry and entry["size"] == size and entry["mtime"] == mtime:
+            files[path] = entry
+            continue
+        files[path] = {"size": size, "mtime": mtime,
+                       "sha256": entry and entry["sha256"],
+                       "violations": entry and entry["violations"]}
+        pending.append(((path, entry and entry["sha256"]), size))
+
+    linted = 0
+    batches = balanced_batches(pending, workers * 4) if pending else []
+    for batch_result in run_batches(_lint_batch, batches, workers):
+        for path, digest, violations in batch_result:
+            files[path]["sha256"] = digest
+            if violations is not None:
+                files[path]["violations"] = [list(v) for v in violations]
+                linted += 1
+    if cache_path:
+        _save_lint_cache(cache_path, files)
+
+    results = [(path, [LintViolation(*v) for v in entry["violations"]])
+               for path, entry in sorted(files.items())]
+    stats = {"files": len(files), "linted": linted, "cached": len(files) - linted}
+    return results, stats
+
+# ============================================================================
+# MAIN PROGRAM
+# ============================================================================
+
+def main():
+    """Main program loop"""
+    while True:
+        clear_screen()
+        show_header()
+        show_menu()
+        
+        choice = input("\nEnter selection: ").strip().upper()
+        
+        if choice == 'X':
+            clear_screen()
+            print("\n" + "═" * 70)
+            print("  Thank you for using CodexGlyph Manual Viewer")
+            print("  The work continues. 🦊")
+            print("═" * 70)
+            print()
+            break
+        elif choice == '1':
+            display_part("part1")
+        elif choice == '2':
+            display_part("part2")
+        elif choice == '3':
+            display_part("part3")
+        elif choice == '4':
+            display_part("part4")
+        elif choice == '5':
+            display_part("part5")
+        elif choice == '6':
+            display_part("part6")
+        elif choice == '7':
+            display_part("part7")
+        elif choice == '8':
+            display_part("part8")
+        elif choice == '9':
+            display_part("part9")
+        elif choice == '10':
+            display_part("part10")
+        elif choice == '11':
+            display_part("part11")
+        elif choice == '12':
+            display_part("part12")
+        elif choice == '13':
+            display_part("part13")
+        elif choice == 'Q':
+            display_part("quick_ref")
+        elif choice == 'G':
+            display_part("glossary")
+        elif choice == 'A':
+            show_about()
+        elif choice == 'S':
+            show_search()
+        else:
+            print("\n❌ Invalid selection. Please try again.")
+            input("Press Enter to continue...")
+
+# ============================================================================
+# COMMAND-LINE INTERFACE
+# ============================================================================
+
+# Part names accepted by "show", matching the interactive menu keys
+PART_KEYS = {str(n): f"part{n}" for n in range(1, 14)}
+PART_KEYS.update({"q": "quick_ref", "g": "glossary", "header": "header"})
+
+def format_report(report, title="ANALYSIS REPORT"):
+    """Render an analysis report as display text"""
+    lines = [
+        title,
+        "═" * 70,
+        f"  Words:             {report['words']}",
+        f"  Shadow glyphs:     {report['shadow_count']} ({report['shadow_percent']:.2f}%)",
+        f"  Sovereignty score: {report['sovereignty_score']:.2f}%",
+        f"  Verdict:           {report['verdict']}",
+        f"  Homophones:        {report['homophone_count']}",
+    ]
+    if report["top_shadows"]:
+        lines.append("\n  Top shadow glyphs:")
+        lines.extend(f"    {word:<20} {count}" for word, count in report["top_shadows"])
+    if report["top_homophones"]:
+        lines.append("\n  Top homophones:")
+        lines.extend(f"    {word:<20} {count}" for word, count in report["top_homophones"])
+    polarity = report.get("polarity")
+    if polarity:
+        lines.append(f"\n  Polarity (Part 4): {polarity['acceptable']} acceptable, "
+                     f"{polarity['flagged']} flagged; adjusted score "
+                     f"{polarity['adjusted_sovereignty_score']:.2f}%")
+        for word, count in polarity["top_flagged"]:
+            alternatives = ", ".join(polarity["alternatives"].get(word, ()))
+            lines.append(f"    {word:<20} {count:<6} {alternatives}")
+    return "\n".join(lines)
+
+def format_letter_profile(profile, title="LETTER PROFILE"):
+    """Render a LetterCounts profile as display text (Parts 8 and 12.4)"""
+    lines = [
+        title,
+        "═" * 70,
+        f"  Words: {profile['words']}   Letters: {profile['letters']}   "
+        f"Letter pairs: {profile['pairs']}",
+        "\n  Root letters (Part 8.1):",
+    ]
+    lines.extend(f"    {root['letter']} = {root['value']:<3} {root['count']:>10} "
+                 f"{root['percent']:>7.3f}%  {root['meaning']}" for root in profile["roots"])
+    for key, heading in (("digraphs", "Digraphs (Part 8.2)"), ("clusters", "Clusters (Part 8.2)")):
+        lines.append(f"\n  {heading + ':':<24} {'COUNT':>10} {'INITIAL':>10}")
+        lines.extend(f"    {entry['pair']:<22} {entry['count']:>10} {entry['initial']:>10} "
+                     f"{entry['percent']:>7.3f}%  {entry['meaning']}" for entry in profile[key])
+    if profile["top_letters"]:
+        lines.append("\n  Most frequent letters: "
+                     + ", ".join(f"{letter} {count}" for letter, count in profile["top_letters"]))
+        lines.append("  Most frequent pairs:   "
+                     + ", ".join(f"{pair} {count}" for pair, count in profile["top_pairs"]))
+    return "\n".join(lines)
+
+def _print_json(data):
+    import json
+    print(json.dumps(data, indent=2, ensure_ascii=False))
+
+def _cmd_show(args):
+    key = args.part.lower()
+    if key in ("a", "about"):
+        print(ABOUT_TEXT)
+        return 0
+    part = PART_KEYS.get(key, key)
+    if part not in MANUAL_CONTENT:
+        print(f"Unknown part '{args.part}' (use 1-13, q, g or a)", file=sys.stderr)
+        return 2
+    print(manual_text(part))
+    return 0
+
+def _cmd_search(args):
+    query = " ".join(args.query)
+    results = search_manual_linear(query) if args.linear else search_manual(query)
+    if args.json:
+        _print_json([{"part": part, "line": num, "text": text}
+                     for part, num, text in results[:args.limit]])
+    elif results:
+        print(f"Found {len(results)} result(s) for '{query}':")
+        for part, line_num, line in results[:args.limit]:
+            print(f"[{part.upper()}] Line {line_num}: {line}")
+    else:
+        print(f"No results found for '{query}'")
+    return 0 if results else 1
+
+def _cmd_analyze(args):
+    if args.polarity:
+        report = analyze_polarity(args.file, args.chunk_size, args.window)
+    elif args.mmap and args.file != "-" and args.hits:
+        tally = AnalysisTally()
+        for hit, snippet in iter_mapped_hits(args.file, tally=tally):
+            print(f"{hit.offset}: {hit.kind} {hit.word}: {snippet}")
+        report = tally.report()
+    elif args.mmap and args.file != "-":
+        report = analyze_mapped(args.file)
+    else:
+        for report in analyze_stream(args.file, args.chunk_size):
+            if args.progress and not report["final"]:
+                print(f"  ... {report['words']} words, sovereignty "
+                      f"{report['sovereignty_score']:.2f}%", file=sys.stderr)
+    if args.json:
+        _print_json(report)
+    else:
+        print(format_report(report))
+    return 1 if report["red_flag"] else 0
+
+def _cmd_discover(args):
+    index = PhoneticIndex(corpus_vocabulary(args.sources))
+    groups = index.groups(args.min_count, new_only=not args.all)[:args.top]
+    added = extend_homophone_database(groups) if args.save else []
+    if args.json:
+        _print_json({"words": len(index), "groups": [g._asdict() for g in groups],
+                     "added": added})
+        return 0
+    print(f"{len(index)} distinct words, {len(groups)} candidate groups")
+    for group in groups:
+        words = ", ".join(f"{w} ({n})" for w, n in zip(group.words, group.frequencies))
+        print(f"  {group.key:<12} {words}")
+    if args.save:
+        print(f"Added {len(added)} groups to the homophone database")
+    return 0
+
+def _cmd_rewrite(args):
+    import json
+    tables = tuple(args.table or REWRITE_TABLES)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as out:
+            offsets, counts = rewrite_stream(args.file, out, tables, args.chunk_size)
+    else:
+        offsets, counts = rewrite_stream(args.file, sys.stdout, tables, args.chunk_size)
+    if args.map:
+        with open(args.map, "w", encoding="utf-8") as f:
+            json.dump({"tables": list(tables), "columns": list(RewriteEdit._fields),
+                       "edits": [list(edit) for edit in offsets]}, f)
+    summary = ", ".join(f"{word} {count}" for word, count in counts.most_common())
+    print(f"{len(offsets)} substitutions" + (f" ({summary})" if summary else ""),
+          file=sys.stderr)
+    return 0
+
+def _cmd_glossary(args):
+    term = " ".join(args.term)
+    entries = (lookup_glossary(term) if term
+               else sorted(load_database("glossary")["terms"].items()))
+    for name, definition in entries:
+        print(f"{name} - {definition}")
+    if not entries:
+        print(f"No glossary entry for '{term}'", file=sys.stderr)
+    return 0 if entries else 1
+
+def _cmd_parse(args):
+    levels = [args.level] if args.level else sorted(PARSE_LEVELS.values())
+    names = {number: name.title() for name, number in PARSE_LEVELS.items()}
+    for word in args.words:
+        if len(levels) == 1:
+            print(parse_word(word, levels[0]))
+            continue
+        print(word.upper())
+        for level in levels:
+            print(f"  {level}. {names[level]:<12} {parse_word(word, level)}")
+    return 0
+
+def _cmd_serve(args):
+    serve(args.host, args.port, args.unix, window=args.batch_window_ms / 1000.0,
+          max_batch=args.max_batch, max_inflight=args.max_inflight)
+    return 0
+
+def _add_scan_arguments(parser):
+    parser.add_argument("root", help="directory (or single file) to scan")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--ext", default=",".join(SCAN_EXTENSIONS),
+                        help="comma-separated file extensions, empty for all files")
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of top shadow glyphs to list")
+    parser.add_argument("--cache", metavar="FILE",
+                        default=os.environ.get("CODEXGLYPH_CACHE") or None,
+                        help="SQLite result cache; unchanged files are not analyzed "
+                             "again (also CODEXGLYPH_CACHE=FILE)")
+    parser.add_argument("--cache-max-mb", type=float, default=None,
+                        help="evict least recently used results beyond this size")
+    parser.add_argument("--cache-max-age-days", type=float, default=None,
+                        help="evict results not used for this many days")
+    parser.add_argument("--json", action="store_true", help="emit JSON instead of text")
+
+_SCAN_DESCRIPTION = ("Scan a directory of documents for shadow glyphs and homophones. "
+                     "Exits with status 1 when the corpus is a red flag (>20%% shadows).")
+
+def _cmd_scan(args):
+    extensions = tuple(e if e.startswith(".") else "." + e
+                       for e in args.ext.lower().split(",") if e)
+    cache = None
+    if args.cache:
+        max_bytes = int(args.cache_max_mb * (1 << 20)) if args.cache_max_mb is not None else None
+        max_age = args.cache_max_age_days * 86400 if args.cache_max_age_days is not None else None
+        cache = ResultCache(args.cache, max_bytes, max_age)
+    try:
+        results, corpus = scan_corpus(args.root, args.workers, extensions, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    summary = corpus.report(top=args.top)
+    if cache is not None:
+        summary["cache"] = dict(cache.stats)
+
+    if args.json:
+        summary["files"] = [dict(tally.report(top=args.top), path=path)
+                            for path, tally in results]
+        _print_json(summary)
+        return 1 if summary["red_flag"] else 0
+
+    print("CORPUS SCAN")
+    print("═" * 70)
+    print(f"  {'SCORE':>7}  {'WORDS':>10}  {'SHADOWS':>8}  FILE")
+    for path, tally in results:
+        report = tally.report(top=0)
+        flag = " ⚠" if report["red_flag"] else ""
+        print(f"  {report['sovereignty_score']:>6.2f}%  {report['words']:>10}  "
+              f"{report['shadow_count']:>8}  {os.path.relpath(path, args.root)}{flag}")
+    print("─" * 70)
+    print(f"  Files: {len(results)}   Words: {summary['words']}   "
+          f"Shadows: {summary['shadow_count']}   Homophones: {summary['homophone_count']}")
+    print(f"  Sovereignty score: {summary['sovereignty_score']:.2f}%  "
+          f"({summary['verdict']})")
+    if cache is not None:
+        stats = summary["cache"]
+        looked_up = stats["hits"] + stats["misses"]
+        rate = 100.0 * stats["hits"] / looked_up if looked_up else 0.0
+        print(f"  Cache: {stats['hits']} hits, {stats['misses']} misses ({rate:.1f}% hit rate), "
+              f"{stats['evicted']} evicted")
+    if summary["top_shadows"]:
+        print("\n  Top shadow glyphs:")
+        for word, count in summary["top_shadows"]:
+            print(f"    {word:<20} {count}")
+    return 1 if summary["red_flag"] else 0
+
+def _cmd_letters(args):
+    extensions = tuple(e if e.startswith(".") else "." + e
+                       for e in args.ext.lower().split(",") if e)
+    results, corpus = letter_statistics(args.root, args.workers, extensions)
+    summary = corpus.profile(top=args.top)
+    if args.json:
+        if args.files:
+            summary["files"] = [dict(counts.profile(top=args.top), path=path)
+                                for path, counts in results]
+        _print_json(summary)
+        return 0
+    if args.files:
+        for path, counts in results:
+            print(format_letter_profile(counts.profile(top=args.top),
+                                        os.path.relpath(path, args.root) if path != args.root
+                                        else path))
+            print()
+    print(format_letter_profile(summary, f"CORPUS LETTER PROFILE ({len(results)} files)"))
+    return 0
+
+def _cmd_transcript(args):
+    monitor = TranscriptMonitor(args.window, args.threshold, args.min_words)
+    cues = iter_cues(args.file, args.follow, args.poll, args.idle_timeout)
+    if args.replay:
+        cues = replay_cues(cues, args.replay)
+    try:
+        for cue_report in map(monitor.add, cues):
+            cue = cue_report.cue
+            if args.cues and not args.json:
+                hits = ", ".join(cue_report.shadows + cue_report.homophones)
+                print(f"{format_timestamp(cue.start)}  {cue.text}" + (f"  [{hits}]" if hits else ""))
+            alert = cue_report.alert
+            if alert and not args.json:
+                top = ", ".join(f"{word} {count}" for word, count in alert.top)
+                print(f"ALERT {format_timestamp(alert.start)} - {format_timestamp(alert.end)}: "
+                      f"{alert.percent:.1f}% hits ({alert.hits}/{alert.words} words): {top}",
+                      flush=True)
+    except KeyboardInterrupt:
+        pass
+    report = monitor.report()
+    if args.json:
+        _print_json(report)
+    else:
+        print(format_report(report, "TRANSCRIPT REPORT"))
+        print(f"\n  Cues: {report['cues']}   Alerts: {len(report['alerts'])}   "
+              f"Latency per cue: {report['latency_ms']['mean']:.3f} ms mean, "
+              f"{report['latency_ms']['max']:.3f} ms max")
+    return 1 if report["alerts"] else 0
+
+def _cmd_diff(args):
+    sources = args.revisions
+    if len(sources) == 1 and os.path.isdir(sources[0]):
+        sources = [path for path, _ in iter_corpus_files(sources[0], ())]
+    diffs = list(diff_revisions(sources, args.top))
+    if args.json:
+        _print_json([{"revision": diff.label, "report": diff.report,
+                      "score_delta": diff.score_delta,
+                      "shadows_added": diff.shadows_added,
+                      "shadows_removed": diff.shadows_removed,
+                      "chains_added": [chain._asdict() for chain in diff.chains_added],
+                      "chains_removed": [chain._asdict() for chain in diff.chains_removed],
+                      "hunks": diff.hunks, "lines_scanned": diff.lines_scanned}
+                     for diff in diffs])
+        return 1 if diffs and diffs[-1].report["red_flag"] else 0
+
+    print("REVISION DIFF")
+    print("═" * 70)
+    for diff in diffs:
+        report = diff.report
+        flag = " ⚠" if report["red_flag"] else ""
+        delta = "" if diff.score_delta is None else f" ({diff.score_delta:+.2f})"
+        print(f"  {diff.label}: sovereignty {report['sovereignty_score']:.2f}%{delta}{flag}, "
+              f"{diff.hunks} hunks, {diff.lines_scanned} lines analyzed")
+        if diff.score_delta is None:
+            continue
+        for sign, words in (("+", diff.shadows_added), ("-", diff.shadows_removed)):
+            if words:
+                print(f"    {sign} shadows: " + ", ".join(f"{word} {count}" for word, count in words))
+        for sign, chains in (("+", diff.chains_added), ("-", diff.chains_removed)):
+            for chain in chains:
+                status = ", ".join(chain.problems) or "ok"
+                print(f"    {sign} chain line {chain.line}: {chain.text!r} ({status})")
+    return 1 if diffs and diffs[-1].report["red_flag"] else 0
+
+def _cmd_chains(args):
+    matches = [(source, match) for source in args.files for match in iter_chains(source)
+               if args.all or match.problems]
+    malformed = sum(1 for _, match in matches if match.problems)
+    if args.json:
+        _print_json([dict(match._asdict(), file=source) for source, match in matches])
+        return 1 if malformed else 0
+    for source, match in matches:
+        status = ", ".join(match.problems) or f"ok ({match.form})"
+        line = f"{source}:{match.line}:{match.column}: {match.text!r}: {status}"
+        if match.suggestion:
+            line += f"; use {match.suggestion!r}"
+        print(line)
+    print(f"{malformed} malformed chains", file=sys.stderr)
+    return 1 if malformed else 0
+
+def _cmd_lexicon(args):
+    if args.action == "build":
+        started = time.perf_counter()
+        count = build_lexicon(corpus_vocabulary(args.words), args.output)
+        print(f"Wrote {count} words to {args.output} "
+              f"({os.path.getsize(args.output) / 1024:.0f} KB, "
+              f"{time.perf_counter() - started:.2f} s)")
+        return 0
+    try:
+        lexicon = LEXICON or Lexicon(args.output)
+    except (OSError, ValueError) as exc:
+        print(f"Cannot use the lexicon: {exc}\n"
+              f"Run 'lexicon build WORDLIST...' to create it.", file=sys.stderr)
+        return 2
+    missing = 0
+    for word in args.words:
+        entry = lexicon.lookup(word)
+        if entry is None:
+            missing += 1
+            print(f"{word.upper()}: not in lexicon")
+            continue
+        kinds = [name for name, on in (("shadow", entry.shadow), ("homophone", entry.homophone))
+                 if on]
+        print(f"{entry.word}: {', '.join(kinds) or 'clean'}; components "
+              f"{'-'.join(part for part in entry.components if part)}; "
+              f"letter sum {entry.letter_sum}, resonance {entry.resonance}")
+    return 1 if missing else 0
+
+def _cmd_lint(args):
+    extensions = tuple(e if e.startswith(".") else "." + e
+                       for e in args.ext.lower().split(",") if e)
+    cache_path = "" if args.no_cache else args.cache
+    results, stats = lint_tree(args.root, args.workers, cache_path, extensions)
+    count = sum(len(violations) for _, violations in results)
+    if args.json:
+        _print_json({"stats": stats, "violations": [
+            dict(v._asdict(), path=path, message=LINT_MESSAGES[v.rule])
+            for path, violations in results for v in violations]})
+        return 1 if count else 0
+    for path, violations in results:
+        for v in violations:
+            print(f"{path}:{v.line}:{v.column}: {v.rule} {v.text!r}: "
+                  f"{LINT_MESSAGES[v.rule]}; use {v.suggestion!r}")
+    print(f"{count} violations in {stats['files']} files "
+          f"({stats['linted']} linted, {stats['cached']} unchanged)", file=sys.stderr)
+    return 1 if count else 0
+
+def scan(argv=None):
+    """Command-line entry point: scan a document tree for shadows"""
+    import argparse
+    parser = argparse.ArgumentParser(prog="codexglyph_manual_complete.py scan",
+                                     description=_SCAN_DESCRIPTION)
+    _add_scan_arguments(parser)
+    return _cmd_scan(parser.parse_args(argv))
+
+def _process_started():
+    """Return the perf_counter reading when the process started, or None
+
+    Covers interpreter startup and compiling this script, which happen
+    before _IMPORT_STARTED. Linux only, to clock-tick resolution (10 ms).
+    """
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        # Fields after the parenthesised name start at field 3; starttime is 22
+        ticks = int(stat[stat.rindex(b")") + 2:].split()[19])
+        age = time.clock_gettime(time.CLOCK_BOOTTIME) - ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return time.perf_counter() - age
+
+def build_parser():
+    """Build the argument parser for the non-interactive subcommands"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="codexglyph_manual_complete.py",
+        description="CodexGlyph Manual Viewer. Run without arguments for the "
+                    "interactive menu.")
+    parser.add_argument("--timing", action="store_true",
+                        default=bool(os.environ.get("CODEXGLYPH_TIMING")),
+                        help="report startup, import and run time on stderr "
+                             "(also enabled by CODEXGLYPH_TIMING=1)")
+    parser.add_argument("--stats", nargs="?", const="-",
+                        default=os.environ.get("CODEXGLYPH_STATS") or None, metavar="FILE",
+                        help="collect per-stage timers and counters, print a summary on "
+                             "stderr and optionally write them to FILE (.json for JSON, "
+                             "else Prometheus text); also CODEXGLYPH_STATS=1 or =FILE")
+    parser.add_argument("--lexicon", metavar="FILE",
+                        default=os.environ.get("CODEXGLYPH_LEXICON") or None,
+                        help="precompiled lexicon to use (default: the built one, if "
+                             "current); also CODEXGLYPH_LEXICON=FILE")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="run the command under cProfile and save the stats to FILE")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+
+    show = commands.add_parser("show", help="print a part of the manual")
+    show.add_argument("part", help="1-13, q (quick reference), g (glossary) or a (about)")
+    show.set_defaults(func=_cmd_show)
+
+    search = commands.add_parser("search", help="search the manual")
+    search.add_argument("query", nargs="+", help="terms (AND by default, OR between terms)")
+    search.add_argument("-n", "--limit", type=int, default=20, help="maximum results shown")
+    search.add_argument("--linear", action="store_true",
+                        help="use the unindexed linear search")
+    search.add_argument("--json", action="store_true", help="emit JSON")
+    search.set_defaults(func=_cmd_search)
+
+    analyze = commands.add_parser("analyze", help="analyze a text file ('-' for stdin)")
+    analyze.add_argument("file", help="path to a text file, or - for stdin")
+    analyze.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                         help="characters read per chunk")
+    analyze.add_argument("--progress", action="store_true",
+                         help="print running totals on stderr")
+    analyze.add_argument("--mmap", action="store_true",
+                         help="scan the memory-mapped file as raw bytes")
+    analyze.add_argument("--hits", action="store_true",
+                         help="with --mmap, list each hit with a snippet")
+    analyze.add_argument("--polarity", action="store_true",
+                         help="tag shadow hits by context polarity (Part 4)")
+    analyze.add_argument("--window", type=int, default=None,
+                         help="tokens searched for negation cues (default from database)")
+    analyze.add_argument("--json", action="store_true", help="emit JSON")
+    analyze.set_defaults(func=_cmd_analyze)
+
+    parse = commands.add_parser("parse", help="show words at the Part 6 parsing levels")
+    parse.add_argument("words", nargs="+", help="words to parse")
+    parse.add_argument("-l", "--level", type=int, choices=sorted(PARSE_LEVELS.values()),
+                       help="print only this level (default: all four)")
+    parse.set_defaults(func=_cmd_parse)
+
+    rewrite = commands.add_parser("rewrite", help="apply substitution tables to a text",
+                                  description="Rewrite a text with the Part 6.1, 10.2 and "
+                                              "4.3 substitution tables in one pass, keeping "
+                                              "case, punctuation and line endings.")
+    rewrite.add_argument("file", help="path to a text file, or - for stdin")
+    rewrite.add_argument("-t", "--table", action="append", choices=REWRITE_TABLES,
+                         help="table to apply, repeatable; earlier tables win "
+                              f"(default: {', '.join(REWRITE_TABLES)})")
+    rewrite.add_argument("-o", "--output", default=None,
+                         help="write the rewritten text here instead of stdout")
+    rewrite.add_argument("--map", default=None,
+                         help="write the original/rewritten offset map as JSON")
+    rewrite.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                         help="characters read per chunk")
+    rewrite.set_defaults(func=_cmd_rewrite)
+
+    discover = commands.add_parser("discover", help="find homophone groups by phonetic key")
+    discover.add_argument("sources", nargs="+",
+                          help="corpus files or word lists ('-' for stdin)")
+    discover.add_argument("--top", type=int, default=25, help="groups to show")
+    discover.add_argument("--min-count", type=int, default=1,
+                          help="ignore words seen fewer times than this")
+    discover.add_argument("--all", action="store_true",
+                          help="include groups already in the database")
+    discover.add_argument("--save", action="store_true",
+                          help="add the groups shown to the homophone database")
+    discover.add_argument("--json", action="store_true", help="emit JSON")
+    discover.set_defaults(func=_cmd_discover)
+
+    glossary = commands.add_parser("glossary", help="look up glossary terms")
+    glossary.add_argument("term", nargs="*", help="term to look up (all terms if omitted)")
+    glossary.set_defaults(func=_cmd_glossary)
+
+    scan_parser = commands.add_parser("scan", help="scan a document tree",
+                                      description=_SCAN_DESCRIPTION)
+    _add_scan_arguments(scan_parser)
+    scan_parser.set_defaults(func=_cmd_scan)
+
+    letters = commands.add_parser("letters", help="letter and letter-pair statistics",
+                                  description="Count letters, digraphs and clusters in a "
+                                              "document tree and annotate them with their "
+                                              "Part 8 meanings.")
+    letters.add_argument("root", help="directory (or single file) to count")
+    letters.add_argument("-j", "--workers", type=int, default=None,
+                         help="worker processes (default: CPU count)")
+    letters.add_argument("--ext", default=",".join(SCAN_EXTENSIONS),
+                         help="comma-separated file extensions, empty for all files")
+    letters.add_argument("--top", type=int, default=10,
+                         help="number of most frequent letters and pairs to list")
+    letters.add_argument("--files", action="store_true", help="also profile each file")
+    letters.add_argument("--json", action="store_true", help="emit JSON")
+    letters.set_defaults(func=_cmd_letters)
+
+    transcript = commands.add_parser("transcript", help="decode an SRT/WebVTT transcript",
+                                     description="Analyze caption cues as they arrive and "
+                                                 "alert when shadows and homophones crowd a "
+                                                 "stretch of speech (Part 12.3). Exits with "
+                                                 "status 1 when any alert was raised.")
+    transcript.add_argument("file", help="SRT or WebVTT file, or - for stdin")
+    transcript.add_argument("-f", "--follow", action="store_true",
+                            help="keep reading as the file grows")
+    transcript.add_argument("--poll", type=float, default=0.25,
+                            help="seconds between checks for new data with --follow")
+    transcript.add_argument("--idle-timeout", type=float, default=None,
+                            help="with --follow, stop after this many seconds without data")
+    transcript.add_argument("--replay", type=float, nargs="?", const=1.0, default=None,
+                            metavar="SPEED", help="release cues at their start times, "
+                                                  "optionally sped up, like a live feed")
+    transcript.add_argument("--window", type=float, default=TRANSCRIPT_WINDOW,
+                            help="alert window in seconds")
+    transcript.add_argument("--threshold", type=float, default=RED_FLAG_PERCENT,
+                            help="alert when this percentage of window words are hits")
+    transcript.add_argument("--min-words", type=int, default=TRANSCRIPT_MIN_WORDS,
+                            help="words the window must hold before alerting")
+    transcript.add_argument("--cues", action="store_true", help="print every cue")
+    transcript.add_argument("--json", action="store_true", help="emit the final report as JSON")
+    transcript.set_defaults(func=_cmd_transcript)
+
+    diff = commands.add_parser("diff", help="compare revisions of a document",
+                               description="Analyze revisions of one document in order, "
+                                           "re-analyzing only the changed lines, and report "
+                                           "score deltas, shadow glyphs and chains added or "
+                                           "removed (Part 12.2). Exits with status 1 when the "
+                                           "last revision is a red flag.")
+    diff.add_argument("revisions", nargs="+",
+                      help="revision files, oldest first, or one directory of them "
+                           "in name order")
+    diff.add_argument("--top", type=int, default=10,
+                      help="number of top shadow glyphs in each report")
+    diff.add_argument("--json", action="store_true", help="emit JSON")
+    diff.set_defaults(func=_cmd_diff)
+
+    chains = commands.add_parser("chains", help="validate legal separator chains",
+                                 description="Find capacity chains such as 'IN; AS; FOR:' "
+                                             "and check them against Parts 5.2 and 11.1. "
+                                             "Exits with status 1 when any is malformed.")
+    chains.add_argument("files", nargs="+", help="documents to check ('-' for stdin)")
+    chains.add_argument("--all", action="store_true", help="also list valid chains")
+    chains.add_argument("--json", action="store_true", help="emit JSON")
+    chains.set_defaults(func=_cmd_chains)
+
+    lexicon = commands.add_parser("lexicon", help="build or query the precompiled lexicon")
+    lexicon.add_argument("action", choices=("build", "lookup"))
+    lexicon.add_argument("words", nargs="+",
+                         help="build: word lists or corpora ('-' for stdin); lookup: words")
+    lexicon.add_argument("-o", "--output", default=LEXICON_PATH,
+                         help=f"lexicon file (default: {os.path.relpath(LEXICON_PATH)})")
+    lexicon.set_defaults(func=_cmd_lexicon)
+
+    lint = commands.add_parser("lint", help="check Markdown files for unsafe tildes",
+                               description="Check Markdown files against the Part 3 "
+                                           "tilde rules. Exits with status 1 on violations.")
+    lint.add_argument("root", help="directory (or single file) to lint")
+    lint.add_argument("-j", "--workers", type=int, default=None,
+                      help="worker processes (default: CPU count)")
+    lint.add_argument("--ext", default=",".join(LINT_EXTENSIONS),
+                      help="comma-separated file extensions")
+    lint.add_argument("--cache", default=None,
+                      help=f"result cache file (default: ROOT/{LINT_CACHE_NAME})")
+    lint.add_argument("--no-cache", action="store_true", help="lint every file")
+    lint.add_argument("--json", action="store_true", help="emit JSON")
+    lint.set_defaults(func=_cmd_lint)
+
+    serve_parser = commands.add_parser("serve", help="run the local analysis service")
+    serve_parser.add_argument("--host", default=SERVICE_HOST)
+    serve_parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    serve_parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead")
+    serve_parser.add_argument("--batch-window-ms", type=float, default=2.0,
+                              help="how long to wait to coalesce requests")
+    serve_parser.add_argument("--max-batch", type=int, default=1 << 16,
+                              help="words per vectorized batch")
+    serve_parser.add_argument("--max-inflight", type=int, default=64,
+                              help="requests in flight per connection before reads pause")
+    serve_parser.set_defaults(func=_cmd_serve)
+    return parser
+
+# Commands that use the default lexicon when it exists; the others never
+# look words up and should not pay for checking it against the databases
+_LEXICON_COMMANDS = ("analyze", "scan", "serve", "transcript")
+
+def cli(argv=None):
+    """Run one non-interactive subcommand and return its exit status"""
+    started = time.perf_counter()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "analyze" and args.hits and (not args.mmap or args.file == "-"):
+        parser.error("analyze --hits needs --mmap and a file path")
+    parsed = time.perf_counter()
+    metrics = enable_metrics() if args.stats else None
+    if args.lexicon:
+        try:
+            use_lexicon(args.lexicon)
+        except (ValueError, OSError) as exc:
+            parser.error(f"--lexicon: {exc}")
+    elif args.command in _LEXICON_COMMANDS and os.path.exists(LEXICON_PATH):
+        import struct
+        try:
+            use_lexicon(LEXICON_PATH)
+        except (ValueError, struct.error, OSError):
+            pass  # Stale or damaged; analyze live instead
+    profiler = None
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        status = args.func(args)
+    except BrokenPipeError:
+        # Output piped into head & co.; stop quietly like other CLI tools
+        sys.stderr.close()
+        status = 0
+    if profiler is not None:
+        import pstats
+        profiler.disable()
+        profiler.dump_stats(args.profile)
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
+    if metrics is not None:
+        disable_metrics()
+        print(metrics.summary(), file=sys.stderr)
+        if args.stats not in ("-", "1"):
+            metrics.write(args.stats)
+    if args.timing:
+        finished = time.perf_counter()
+        launched = _process_started()
+        startup = ("" if launched is None else
+                   f"startup {(_IMPORT_STARTED - launched) * 1000:.1f} ms, ")
+        print(f"[timing] {startup}import {(started - _IMPORT_STARTED) * 1000:.1f} ms, "
+              f"parse {(parsed - started) * 1000:.1f} ms, "
+              f"{args.command} {(finished - parsed) * 1000:.1f} ms, "
+              f"total {(finished - (launched or _IMPORT_STARTED)) * 1000:.1f} ms",
+              file=sys.stderr)
+    return status
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli())
 
-if __name__ == "__main__":
     # Startup screen
     clear_screen()
     print("\n" + "═" * 70)
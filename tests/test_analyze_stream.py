@@ -0,0 +1,71 @@
+"""Chunked analysis must give the whole-text result whatever the chunk size"""
+
+import io
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+TEXT = ("The government shared information; we understand the experiment.\n"
+        "Good morning, mourning dove! Naïve café clients observe 42 objects.\n"
+        "INFORMATION-government~undo_attention, and the illuminate abstract.\n") * 7
+
+def _full_tally(text):
+    tally = cg.AnalysisTally()
+    tally.add_text(text)
+    return tally
+
+class AnalyzeStreamTest(unittest.TestCase):
+
+    def test_chunks_end_on_word_boundaries(self):
+        for size in (1, 2, 3, 7, 64, 1 << 16):
+            with self.subTest(size=size):
+                chunks = list(cg.iter_chunks(io.StringIO(TEXT), size))
+                self.assertEqual("".join(chunks), TEXT)
+                words = [w for chunk in chunks for w in re.findall(cg._WORD_PATTERN, chunk)]
+                self.assertEqual(words, re.findall(cg._WORD_PATTERN, TEXT))
+
+    def test_report_independent_of_chunk_size(self):
+        expected = _full_tally(TEXT).report()
+        for size in (1, 5, 13, 100, 1 << 16):
+            with self.subTest(size=size):
+                reports = list(cg.analyze_stream(io.StringIO(TEXT), size))
+                self.assertTrue(reports[-1]["final"])
+                self.assertFalse(any(report["final"] for report in reports[:-1]))
+                self.assertEqual(reports[-1], expected)
+
+    def test_running_reports_grow(self):
+        counts = [report["words"] for report in cg.analyze_stream(io.StringIO(TEXT), 40)]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], len(re.findall(cg._WORD_PATTERN, TEXT)))
+
+    def test_known_counts(self):
+        report = cg.analyze_text("The government shared information. Good morning.")
+        self.assertEqual(report["words"], 6)
+        self.assertEqual(report["shadow_count"], 2)
+        self.assertEqual(dict(report["top_shadows"]), {"GOVERNMENT": 1, "INFORMATION": 1})
+        self.assertEqual(report["homophone_count"], 1)
+
+    def test_empty_input(self):
+        report = cg.analyze_text("")
+        self.assertEqual(report["words"], 0)
+        self.assertEqual(report["sovereignty_score"], 100.0)
+
+    def test_file_path(self):
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt",
+                                         delete=False) as f:
+            f.write(TEXT)
+        path = f.name
+        try:
+            *_, report = cg.analyze_stream(path, 17)
+        finally:
+            os.remove(path)
+        self.assertEqual(report, _full_tally(TEXT).report())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Capacity chains (Part 5.2) and the Part 11 templates"""
+
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+def _chain(line):
+    matches = list(cg.find_chains([line]))
+    return matches[0] if matches else None
+
+class FindChainsTest(unittest.TestCase):
+
+    def test_part_11_templates(self):
+        opening = _chain("IN; AS; FOR: the principal of [Entity].")
+        self.assertEqual((opening.form, opening.problems), ("THREE-POSITION CHAIN", ()))
+        signature = _chain("Signed BY; AND > FOR: [Entity Name]")
+        self.assertEqual((signature.column, signature.text), (8, "BY; AND > FOR:"))
+        self.assertEqual((signature.form, signature.problems), ("TWO-TIER CHAIN", ()))
+
+    def test_templates_in_the_manual_are_clean(self):
+        matches = list(cg.find_chains(cg.manual_text("part11").split("\n")))
+        self.assertEqual(len(matches), 2)
+        self.assertTrue(all(match.problems == () for match in matches))
+
+    def test_entity_after_opening_punctuation(self):
+        for entity in ('"Acme Corp"', "(the Company)", "[Entity Name]", "“Acme”", "42 Ltd"):
+            with self.subTest(entity=entity):
+                self.assertEqual(_chain(f"IN; AS; FOR: {entity}").problems, ())
+
+    def test_missing_entity(self):
+        for line in ("IN; AS; FOR:", "IN; AS; FOR: ...", "IN; AS; FOR: []"):
+            with self.subTest(line=line):
+                self.assertEqual(_chain(line).problems, ("missing-entity",))
+
+    def test_problems(self):
+        cases = {
+            "IN;AS;FOR: X": ("spacing",),
+            "IN AS FOR: X": ("missing-separator", "non-canonical"),
+            "IN; AS: FOR: X": ("colon-inside", "non-canonical"),
+            "IN-AS-FOR: X": ("joiner-separator", "non-canonical"),
+            "IN; AS; FOR X": ("missing-colon", "non-canonical"),
+            "IN_AS_FOR: X": ("joiner-separator", "court-caution", "non-canonical"),
+            "BY > FOR: X": ("non-canonical", "outside-template"),
+        }
+        for line, problems in cases.items():
+            with self.subTest(line=line):
+                self.assertEqual(_chain(line).problems, problems)
+        self.assertEqual(_chain("IN AS FOR: X").suggestion, "IN; AS; FOR:")
+
+    def test_prose_is_not_a_chain(self):
+        self.assertIsNone(_chain("IN AND FOR the people"))
+        self.assertIsNone(_chain("Time: 10am"))
+
+    def test_iter_chains_numbers_lines(self):
+        text = "Preamble\nIN; AS; FOR: Acme\n\nSigned BY; AND > FOR: [Entity Name]\n"
+        self.assertEqual([(m.line, m.form) for m in cg.iter_chains(io.StringIO(text))],
+                         [(2, "THREE-POSITION CHAIN"), (4, "TWO-TIER CHAIN")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Word components and the Part 6 parsing levels"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+class ExtractComponentsTest(unittest.TestCase):
+
+    def test_part_6_words(self):
+        cases = {
+            "government": ("", "GOVERN", "MENT"),
+            "information": ("IN", "FORM", "ATION"),
+            "representative": ("RE", "PRESENT", "ATIVE"),
+            "experiment": ("EX", "PERI", "MENT"),
+            "UNDERSTAND": ("UNDER", "STAND", ""),
+            "undo": ("UN", "DO", ""),
+            "table": ("", "TABLE", ""),
+        }
+        for word, expected in cases.items():
+            with self.subTest(word=word):
+                self.assertEqual(tuple(cg.extract_components(word)), expected)
+
+    def test_unsplittable_words_stay_whole(self):
+        for word in ("", "naïve", "in-form", "ab1cd"):
+            with self.subTest(word=word):
+                self.assertEqual(cg.extract_components(word), ("", word.upper(), ""))
+
+    def test_components_rejoin(self):
+        for word in ("information", "attention", "immune", "illuminate", "shipment"):
+            self.assertEqual("".join(cg.extract_components(word)), word.upper())
+
+class ParseWordTest(unittest.TestCase):
+
+    def test_casual(self):
+        self.assertEqual(cg.parse_word("government", cg.PARSE_CASUAL), "framework")
+        self.assertEqual(cg.parse_word("Information", "casual"), "Knowledge")
+        self.assertEqual(cg.parse_word("INFORMATION", "casual"), "KNOWLEDGE")
+        self.assertEqual(cg.parse_word("table", "casual"), "table")
+
+    def test_structural(self):
+        self.assertEqual(cg.parse_word("government"), "govern-ment")
+        self.assertEqual(cg.parse_word("representative"), "re-present-ative")
+        self.assertEqual(cg.parse_word("INFORMATION"), "in~formation")
+        self.assertEqual(cg.parse_word("undo"), "un-do")
+
+    def test_ceremonial(self):
+        self.assertEqual(cg.parse_word("government", "ceremonial"), "GOVERN_MENT")
+        self.assertEqual(cg.parse_word("representative", 3), "RE_PRESENT_ATIVE")
+        self.assertEqual(cg.parse_word("information", 3), "IN_FORM_ATION")
+
+    def test_educational(self):
+        self.assertEqual(cg.parse_word("experiment", "educational"),
+                         "EX[out]-PERI[try]-MENT[mind]")
+        self.assertEqual(cg.parse_word("government", 4), "GOVERN[steer]-MENT[mind]")
+
+    def test_unknown_level(self):
+        for level in (0, 5, "formal"):
+            with self.assertRaises(ValueError):
+                cg.parse_word("government", level)
+
+if __name__ == "__main__":
+    unittest.main()
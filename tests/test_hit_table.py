@@ -0,0 +1,91 @@
+"""HitTable columns, views and merging"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+TEXT = ("The government shared information.\n"
+        "Good morning; undo our hour, UNDERSTAND the experiment.\n") * 10
+
+class HitTableTest(unittest.TestCase):
+
+    def table(self, rows):
+        table = cg.HitTable()
+        for offset, word, prefix, flags in rows:
+            table.append(offset, table.intern(word), prefix, flags)
+        return table
+
+    def test_rows(self):
+        table = self.table([(4, "GOVERNMENT", cg.PREFIX_NONE, cg.HIT_SHADOW),
+                            (9, "OUR", cg.PREFIX_NONE, cg.HIT_HOMOPHONE),
+                            (30, "GOVERNMENT", cg.PREFIX_NONE, cg.HIT_SHADOW)])
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.vocabulary, ["GOVERNMENT", "OUR"])
+        self.assertEqual((table[1].offset, table[1].word, table[1].kind), (9, "OUR", "homophone"))
+        self.assertEqual(table[-1].offset, 30)
+        self.assertEqual([hit.offset for hit in table], [4, 9, 30])
+        with self.assertRaises(IndexError):
+            table[3]
+        with self.assertRaises(IndexError):
+            table[-4]
+        self.assertEqual(table.nbytes, 3 * 14)
+
+    def test_counts(self):
+        table = self.table([(0, "A", 0, cg.HIT_SHADOW),
+                            (1, "B", 0, cg.HIT_SHADOW | cg.HIT_HOMOPHONE),
+                            (2, "A", 0, cg.HIT_SHADOW)])
+        self.assertEqual(table[1].kind, "shadow+homophone")
+        self.assertEqual(table.counts(), {"A": 2, "B": 1})
+        self.assertEqual(table.counts(cg.HIT_HOMOPHONE), {"B": 1})
+        self.assertEqual(table.counts(cg.HIT_SHADOW, start=2), {"A": 1})
+
+    def test_merge_remaps_ids_and_offsets(self):
+        first = self.table([(0, "A", 0, cg.HIT_SHADOW)])
+        second = self.table([(1, "B", 1, cg.HIT_HOMOPHONE), (5, "A", 2, cg.HIT_SHADOW)])
+        first.merge(second, base=100)
+        self.assertEqual([(hit.offset, hit.word, hit.prefix) for hit in first],
+                         [(0, "A", 0), (101, "B", 1), (105, "A", 2)])
+        self.assertEqual(first.vocabulary, ["A", "B"])
+
+    def test_columns(self):
+        table = self.table([(7, "A", cg.PREFIX_POSITIONAL, cg.HIT_SHADOW)])
+        columns = table.columns()
+        self.assertEqual(columns["offset"].tolist(), [7])
+        self.assertEqual(columns["word_id"].tolist(), [0])
+        self.assertEqual(columns["prefix"].tolist(), [cg.PREFIX_POSITIONAL])
+        self.assertEqual(columns["flags"].tolist(), [cg.HIT_SHADOW])
+
+class CollectHitsTest(unittest.TestCase):
+
+    def test_hits_point_at_words(self):
+        tally, table = cg.collect_hits(io.StringIO(TEXT), 16)
+        for hit in table:
+            self.assertEqual(TEXT[hit.offset:hit.offset + len(hit.word)].upper(), hit.word)
+        self.assertEqual(tally.report(), cg.analyze_text(TEXT))
+
+    def test_prefix_codes(self):
+        _, table = cg.collect_hits(io.StringIO("information undo government"))
+        self.assertEqual([(hit.word, hit.prefix) for hit in table],
+                         [("INFORMATION", cg.PREFIX_POSITIONAL), ("UNDO", cg.PREFIX_OPERATIONAL),
+                          ("GOVERNMENT", cg.PREFIX_NONE)])
+
+    def test_matches_mapped_hits(self):
+        with tempfile.NamedTemporaryFile("w", encoding="ascii", suffix=".txt",
+                                         delete=False) as f:
+            f.write(TEXT)
+        try:
+            mapped = [(hit.offset, hit.word, hit.prefix, hit.flags)
+                      for hit, _ in cg.iter_mapped_hits(f.name)]
+        finally:
+            os.remove(f.name)
+        _, table = cg.collect_hits(io.StringIO(TEXT))
+        self.assertEqual(mapped, [(hit.offset, hit.word, hit.prefix, hit.flags) for hit in table])
+
+if __name__ == "__main__":
+    unittest.main()
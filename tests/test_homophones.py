@@ -0,0 +1,55 @@
+"""PatternAutomaton and streamed homophone hits"""
+
+import io
+import os
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+TEXT = ("Write the right rite; our hour is near. Whole hole, sole soul!\n"
+        "Rewrite overwrite writer OUR-hour C c see_sea Due-Do knowing.\n"
+        "Good morning, mourning PROFIT prophet capital Capitol.\n") * 5
+
+def _reference(text):
+    """(offset, word) for every whole word found in the homophone index"""
+    index = cg.homophone_index()
+    return [(m.start(), m.group()) for m in re.finditer(r"[A-Za-z]+", text)
+            if m.group().upper() in index]
+
+class PatternAutomatonTest(unittest.TestCase):
+
+    def test_whole_words_only(self):
+        automaton = cg.PatternAutomaton({"OUR": 1, "HOUR": 2, "AN": 3})
+        hits = list(automaton.iter_matches("Hour, our, tour, ours, an, plan, Our"))
+        self.assertEqual(hits, [(0, "Hour", 2), (6, "our", 1), (23, "an", 3), (33, "Our", 1)])
+
+    def test_suffix_patterns_in_one_word(self):
+        automaton = cg.PatternAutomaton({"SEA": "a", "EA": "b", "A": "c"})
+        self.assertEqual(list(automaton.iter_matches("sea ea a")),
+                         [(0, "sea", "a"), (4, "ea", "b"), (7, "a", "c")])
+
+    def test_base_offset(self):
+        automaton = cg.PatternAutomaton({"SEE": None})
+        self.assertEqual([offset for offset, _, _ in automaton.iter_matches("I see", 100)], [102])
+
+    def test_find_homophones_matches_reference(self):
+        hits = cg.find_homophones(TEXT)
+        self.assertEqual([(hit.offset, hit.word) for hit in hits], _reference(TEXT))
+        for hit in hits:
+            group = cg.homophone_index()[hit.word.upper()]
+            self.assertEqual((hit.rank, hit.category), (group["rank"], group["category"]))
+
+    def test_offsets_across_chunks(self):
+        expected = cg.find_homophones(TEXT)
+        for size in (1, 3, 8, 50, 1 << 16):
+            with self.subTest(size=size):
+                self.assertEqual(list(cg.iter_homophones(io.StringIO(TEXT), size)), expected)
+                for hit in cg.iter_homophones(io.StringIO(TEXT), size):
+                    self.assertEqual(TEXT[hit.offset:hit.offset + len(hit.word)], hit.word)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Letter statistics (Part 8) across blocks, chunks and merges"""
+
+import collections
+import io
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+TEXT = ("Know the knife; STAND and stay true. Bless the blood, trust it!\n"
+        "Naïve café — a I x, the THE tHe. 42abc def\n") * 9
+
+def _reference(data):
+    """(letters, pairs, initials, words) counted word by word over ASCII letters"""
+    letters, pairs, initials = collections.Counter(), collections.Counter(), collections.Counter()
+    words = re.findall(rb"[A-Za-z]+", data)
+    for word in words:
+        word = word.upper().decode()
+        letters.update(word)
+        pairs.update(word[i:i + 2] for i in range(len(word) - 1))
+        if len(word) > 1:
+            initials[word[:2]] += 1
+    return letters, pairs, initials, len(words)
+
+class LetterCountsTest(unittest.TestCase):
+
+    def assert_matches(self, counts, data):
+        letters, pairs, initials, words = _reference(data)
+        self.assertEqual(counts.words, words)
+        for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+            self.assertEqual(counts.letter(letter), letters[letter], letter)
+        self.assertEqual(int(counts.pairs.sum()), sum(pairs.values()))
+        self.assertEqual(int(counts.initials.sum()), sum(initials.values()))
+        for pair, count in pairs.items():
+            self.assertEqual(counts.pair(pair), count, pair)
+        for pair, count in initials.items():
+            self.assertEqual(counts.pair(pair, initial=True), count, pair)
+
+    def test_add_text(self):
+        counts = cg.LetterCounts()
+        counts.add_text(TEXT)
+        self.assert_matches(counts, TEXT.encode("ascii", "replace"))
+
+    def test_tail_joins_blocks(self):
+        data = TEXT.encode("utf-8")
+        for size in (1, 2, 3, 7, 64, len(data)):
+            with self.subTest(size=size):
+                counts = cg.LetterCounts()
+                tail = b"\x1a\x1a"
+                for start in range(0, len(data), size):
+                    tail = counts.add_bytes(data[start:start + size], tail)
+                self.assert_matches(counts, data)
+
+    def test_blocks_without_tail_split_words(self):
+        counts = cg.LetterCounts()
+        counts.add_bytes(b"kni")
+        counts.add_bytes(b"fe")
+        self.assertEqual((counts.words, counts.pair("IF")), (2, 0))
+
+    def test_merge(self):
+        first, second = cg.LetterCounts(), cg.LetterCounts()
+        half = TEXT.index(" ", len(TEXT) // 2)
+        first.add_text(TEXT[:half])
+        second.add_text(TEXT[half:])
+        self.assertIs(first.merge(second), first)
+        self.assert_matches(first, TEXT.encode("ascii", "replace"))
+
+    def test_count_letters_file_and_stream(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".txt", delete=False) as f:
+            f.write(TEXT.encode("utf-8"))
+        try:
+            self.assert_matches(cg.count_letters(f.name, 5), TEXT.encode("utf-8"))
+        finally:
+            os.remove(f.name)
+        self.assert_matches(cg.count_letters(io.StringIO(TEXT), 5),
+                            TEXT.encode("ascii", "replace"))
+
+    def test_profile(self):
+        counts = cg.LetterCounts()
+        counts.add_text("Know the knife")
+        profile = counts.profile()
+        self.assertEqual((profile["letters"], profile["words"], profile["pairs"]), (12, 3, 9))
+        kn = next(row for row in profile["digraphs"] if row["pair"] == "KN")
+        self.assertEqual((kn["count"], kn["initial"]), (2, 2))
+        self.assertEqual(profile["top_letters"][0], ("E", 2))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""The precompiled lexicon and the lexicon command"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+WORDS = ["undo", "Government", "information", "table", "our", "hour", "experiment",
+         "illuminate", "K", "see"]
+
+def _random_words(count, seed):
+    rng = random.Random(seed)
+    return ["".join(rng.choice("ABCDEIMNORSTUX") for _ in range(rng.randrange(1, 12)))
+            for _ in range(count)]
+
+class LexiconTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "lexicon.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_entries_match_live_analysis(self):
+        words = WORDS + _random_words(2000, 3)
+        cg.build_lexicon(words, self.path)
+        lexicon = cg.Lexicon(self.path)
+        try:
+            for word in words:
+                entry = lexicon.lookup(word)
+                upper = word.upper()
+                self.assertEqual(entry.word, upper)
+                self.assertEqual(entry.shadow, cg.is_shadow(upper), word)
+                self.assertEqual(entry.homophone, upper in cg.homophone_index(), word)
+                self.assertEqual(entry.letter_sum, cg.letter_sum(upper), word)
+                self.assertEqual(entry.resonance, cg.calculate_resonance(upper), word)
+                self.assertEqual(entry.components, cg.extract_components(upper), word)
+            self.assertIsNone(lexicon.lookup("ZEBRA"))
+            self.assertEqual(lexicon.is_shadow("ZEBRA"), cg.is_shadow("ZEBRA"))
+            self.assertEqual(lexicon.resonance("zebra"), cg.calculate_resonance("zebra"))
+        finally:
+            lexicon.close()
+
+    def test_damaged_files_are_refused(self):
+        cg.build_lexicon(WORDS, self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for name, content in (("empty", b""), ("truncated", data[:10]),
+                              ("short", data[:len(data) // 2]), ("foreign", b"x" * len(data))):
+            with self.subTest(name=name):
+                with open(self.path, "wb") as f:
+                    f.write(content)
+                with self.assertRaises(ValueError):
+                    cg.Lexicon(self.path)
+
+class StaleLexiconTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = cg.DATABASE_DIR, cg.DATABASE_CACHE_DIR
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "lexicon.bin")
+        cg.DATABASE_DIR = os.path.join(self.tmp, "databases")
+        cg.DATABASE_CACHE_DIR = os.path.join(cg.DATABASE_DIR, "__pycache__")
+        shutil.copytree(self.saved[0], cg.DATABASE_DIR,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        cg.reload_databases()
+
+    def tearDown(self):
+        cg.DATABASE_DIR, cg.DATABASE_CACHE_DIR = self.saved
+        shutil.rmtree(self.tmp)
+        cg.reload_databases()
+
+    def test_edited_database_refuses_lexicon(self):
+        cg.build_lexicon(WORDS, self.path)
+        cg.Lexicon(self.path).close()
+        shadows = os.path.join(cg.DATABASE_DIR, "shadows.json")
+        with open(shadows, encoding="utf-8") as f:
+            data = json.load(f)
+        data["semantic"]["TABLE"] = {"breakdown": "TABLE", "meaning": "test"}
+        with open(shadows, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        cg.reload_databases()
+        with self.assertRaisesRegex(ValueError, "rebuild"):
+            cg.Lexicon(self.path)
+
+class LexiconCommandTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "lexicon.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def run_cli(self, *argv):
+        out, err = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            status = cg.cli(list(argv))
+        return status, out.getvalue(), err.getvalue()
+
+    def test_build_and_lookup(self):
+        words = os.path.join(self.tmp, "words.txt")
+        with open(words, "w", encoding="utf-8") as f:
+            f.write("undo the government\n")
+        status, out, _ = self.run_cli("lexicon", "build", words, "-o", self.path)
+        self.assertEqual(status, 0)
+        self.assertIn("Wrote 3 words", out)
+        status, out, _ = self.run_cli("lexicon", "lookup", "undo", "table", "-o", self.path)
+        self.assertEqual(status, 1)
+        self.assertIn("UNDO: shadow; components UN-DO; letter sum 54, resonance 9", out)
+        self.assertIn("TABLE: not in lexicon", out)
+
+    def test_missing_or_bad_lexicon_is_a_usage_error(self):
+        status, out, err = self.run_cli("lexicon", "lookup", "undo", "-o", self.path)
+        self.assertEqual((status, out), (2, ""))
+        self.assertIn("lexicon build", err)
+        with open(self.path, "wb") as f:
+            f.write(b"not a lexicon" * 10)
+        status, _, err = self.run_cli("lexicon", "lookup", "undo", "-o", self.path)
+        self.assertEqual(status, 2)
+        self.assertIn("not a CodexGlyph lexicon", err)
+
+if __name__ == "__main__":
+    unittest.main()
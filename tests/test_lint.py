@@ -0,0 +1,111 @@
+"""Tilde linter rules and the lint_tree cache"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+def _rules(text):
+    return [(v.column, v.rule, v.text, v.suggestion) for v in cg.lint_text(text)]
+
+class LintTextTest(unittest.TestCase):
+
+    def test_clean_text(self):
+        for text in ("", "no tildes here", "in~formation", "IN~FORM ex~periment",
+                     "~5 minutes", "wait~"):
+            with self.subTest(text=text):
+                self.assertEqual(cg.lint_text(text), [])
+
+    def test_prefix(self):
+        self.assertEqual(_rules("un~do it"), [(1, "tilde-prefix", "un~do", "un-do")])
+        self.assertEqual(_rules("a x~yz"), [(3, "tilde-prefix", "x~yz", "x-yz")])
+
+    def test_wrap(self):
+        self.assertEqual(_rules("the ~word~ here"), [(5, "tilde-wrap", "~word~", "word")])
+        self.assertEqual(_rules("~~big deal~~"), [(1, "tilde-wrap", "~~big deal~~", "big deal")])
+        self.assertEqual(_rules("~in~"), [(1, "tilde-wrap", "~in~", "in")])
+
+    def test_chain(self):
+        self.assertEqual(_rules("a~b~c"), [(1, "tilde-chain", "a~b~c", "a-b-c")])
+        self.assertEqual(_rules("in~form~ation"),
+                         [(1, "tilde-chain", "in~form~ation", "in~form-ation")])
+        self.assertEqual(_rules("a~~b"), [(1, "tilde-chain", "a~~b", "a-b")])
+
+    def test_tildes_at_word_ends(self):
+        self.assertEqual(_rules("in~formation~ text"),
+                         [(1, "tilde-chain", "in~formation~", "in~formation")])
+        self.assertEqual(_rules("~in~formation"),
+                         [(1, "tilde-chain", "~in~formation", "in~formation")])
+        self.assertEqual(_rules("a ~b~c d"), [(3, "tilde-chain", "~b~c", "b-c")])
+
+    def test_code_is_skipped(self):
+        text = "`a~b~c` and\n```\nun~do ~x~\n```\n~~~\nx~y\n~~~\nun~do"
+        self.assertEqual([(v.line, v.rule) for v in cg.lint_text(text)], [(8, "tilde-prefix")])
+
+    def test_line_and_column(self):
+        violations = cg.lint_text("first line\nsecond un~do\n")
+        self.assertEqual([(v.line, v.column) for v in violations], [(2, 8)])
+
+class LintTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = os.path.join(self.root, cg.LINT_CACHE_NAME)
+        self.write("a.md", "un~do\n")
+        self.write("sub/b.markdown", "in~formation\n")
+        self.write("c.txt", "un~do\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, text):
+        path = os.path.join(self.root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def lint(self):
+        results, stats = cg.lint_tree(self.root, workers=1)
+        return {os.path.relpath(path, self.root): [v.rule for v in violations]
+                for path, violations in results}, stats
+
+    def test_results_and_cache(self):
+        results, stats = self.lint()
+        self.assertEqual(results, {"a.md": ["tilde-prefix"],
+                                   os.path.join("sub", "b.markdown"): []})
+        self.assertEqual(stats, {"files": 2, "linted": 2, "cached": 0})
+        self.assertTrue(os.path.exists(self.cache))
+
+        again, stats = self.lint()
+        self.assertEqual(again, results)
+        self.assertEqual(stats, {"files": 2, "linted": 0, "cached": 2})
+
+    def test_changed_file_is_relinted(self):
+        self.lint()
+        path = self.write("a.md", "un~do and a~b~c\n")
+        os.utime(path, ns=(1, 1))
+        results, stats = self.lint()
+        self.assertEqual(results["a.md"], ["tilde-prefix", "tilde-chain"])
+        self.assertEqual(stats["linted"], 1)
+
+    def test_touched_but_unchanged_file(self):
+        self.lint()
+        os.utime(os.path.join(self.root, "a.md"), ns=(1, 1))
+        results, stats = self.lint()
+        self.assertEqual(results["a.md"], ["tilde-prefix"])
+        self.assertEqual(stats["linted"], 0)
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(self.cache, "w") as f:
+            f.write("{not json")
+        _, stats = self.lint()
+        self.assertEqual(stats["linted"], 2)
+
+if __name__ == "__main__":
+    unittest.main()
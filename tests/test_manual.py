@@ -0,0 +1,60 @@
+"""Manual tables rendered from the databases"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+class ManualTextTest(unittest.TestCase):
+
+    def test_no_placeholders_left(self):
+        for part in cg.MANUAL_CONTENT:
+            self.assertNotIn("{{", cg.manual_text(part), part)
+
+    def test_tables_follow_databases(self):
+        part7 = cg.manual_text("part7")
+        for group in cg.homophone_database():
+            self.assertIn(f"{group['rank']}. {'/'.join(group['words'])} - {group['note']}", part7)
+        self.assertIn("  K (11) - Master duality, sharp knowing", cg.manual_text("part8"))
+        self.assertIn("  KN - Sharp knowing (KNOW, KNIFE)", cg.manual_text("part8"))
+        part9 = cg.manual_text("part9")
+        self.assertIn(f"9.1 V+CC Prefixes ({len(cg.vcc_rules().prefixes)} total)", part9)
+        self.assertIn(", ".join(cg.vcc_rules().prefixes), part9)
+        self.assertIn("  2. INFORMATION → IN~FORMATION (forming within)", part9)
+        self.assertIn("  5. SYSTEM → (organized whole)", part9)
+        for term, text in cg.load_database("glossary")["terms"].items():
+            self.assertIn(f"{term} - {text}", cg.manual_text("glossary"))
+
+class SavedDatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = cg.DATABASE_DIR, cg.DATABASE_CACHE_DIR
+        self.tmp = tempfile.mkdtemp()
+        cg.DATABASE_DIR = os.path.join(self.tmp, "databases")
+        cg.DATABASE_CACHE_DIR = os.path.join(cg.DATABASE_DIR, "__pycache__")
+        shutil.copytree(self.saved[0], cg.DATABASE_DIR,
+                        ignore=shutil.ignore_patterns("__pycache__"))
+        cg.reload_databases()
+
+    def tearDown(self):
+        cg.DATABASE_DIR, cg.DATABASE_CACHE_DIR = self.saved
+        shutil.rmtree(self.tmp)
+        cg.reload_databases()
+
+    def test_saved_homophones_reach_the_manual(self):
+        self.assertEqual(cg.search_manual("ZYX"), [])
+        self.assertNotIn("ZYX", cg.manual_text("part7"))
+        group = cg.PhoneticGroup("Z2", ("ZYX", "ZYKS"), (1, 1))
+        added = cg.extend_homophone_database([group])
+        self.assertEqual(len(added), 1)
+        line = f"  {added[0]['rank']}. ZYX/ZYKS - Phonetic key 'Z2'"
+        self.assertIn("DISCOVERED:\n" + line, cg.manual_text("part7"))
+        self.assertEqual([text for _, _, text in cg.search_manual("ZYX")], [line.strip()])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""mmap analysis on raw bytes must match the text path"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+TEXT = ("The government shared information; GOVERNMENT Government.\n"
+        "Good morning, mourning dove! Naïve café clients — our hour.\n"
+        "ünder¬stand INFORMATIONé 日本 undo~attention experiment\n") * 20
+
+class AnalyzeMappedTest(unittest.TestCase):
+
+    def setUp(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".txt", delete=False) as f:
+            f.write(TEXT.encode("utf-8"))
+        self.path = f.name
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_report_matches_text(self):
+        self.assertEqual(cg.analyze_mapped(self.path), cg.analyze_text(TEXT))
+
+    def test_report_with_hits_matches_text(self):
+        hits = cg.HitTable()
+        self.assertEqual(cg.analyze_mapped(self.path, hits), cg.analyze_text(TEXT))
+        self.assertEqual(len(hits), len(cg.collect_hits(io.StringIO(TEXT))[1]))
+
+    def test_no_hit_rows_without_a_table(self):
+        tally = cg.AnalysisTally()
+        with cg.MappedFile(self.path) as mapped:
+            table = cg._scan_buffer(mapped.map, tally)
+        self.assertEqual(len(table), 0)
+        self.assertEqual(tally.shadows["GOVERNMENT"], 60)
+
+    def test_hit_offsets_are_bytes(self):
+        data = TEXT.encode("utf-8")
+        for hit, snippet in cg.iter_mapped_hits(self.path, context=5):
+            self.assertEqual(data[hit.offset:hit.offset + len(hit.word)].upper(),
+                             hit.word.encode("ascii"))
+            self.assertIn(hit.word.upper(), snippet.upper())
+
+    def test_empty_file(self):
+        with open(self.path, "wb"):
+            pass
+        self.assertEqual(cg.analyze_mapped(self.path), cg.analyze_text(""))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Polarity matching (Part 4) and the shadow predicate it shares"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+TEXT = ("I do not understand. We understand the impossible, not impossible; "
+        "never not undo. Nothing about the government!\n") * 6
+
+def _hits(text, window=None):
+    return [(hit.word, hit.acceptable) for hit in cg.PolarityMatcher(window).feed(text)]
+
+class PolarityMatcherTest(unittest.TestCase):
+
+    def test_part_4_examples(self):
+        self.assertEqual(_hits("We do not understand it."), [("UNDERSTAND", True)])
+        self.assertEqual(_hits("We understand it."), [("UNDERSTAND", False)])
+        self.assertEqual(_hits("It is impossible."), [("IMPOSSIBLE", True)])
+        self.assertEqual(_hits("It is not impossible."), [("IMPOSSIBLE", False)])
+        self.assertEqual(_hits("never not undo"), [("UNDO", False)])
+
+    def test_window_and_clause_punctuation(self):
+        self.assertEqual(_hits("not a b c understand"), [("UNDERSTAND", True)])
+        self.assertEqual(_hits("not a b c d understand"), [("UNDERSTAND", False)])
+        self.assertEqual(_hits("not a b c d understand", window=5), [("UNDERSTAND", True)])
+        self.assertEqual(_hits("not; understand"), [("UNDERSTAND", False)])
+
+    def test_hit_fields(self):
+        hit, = cg.PolarityMatcher().feed("so we understand")
+        self.assertEqual((hit.offset, hit.negations), (6, 0))
+        self.assertEqual(hit.alternatives, ("GRASP", "KNOW", "COMPREHEND"))
+        hit, = cg.PolarityMatcher().feed("undo")
+        self.assertEqual(hit.alternatives, ("UN-DO",))
+
+    def test_chunks_match_one_pass(self):
+        expected = list(cg.PolarityMatcher().feed(TEXT))
+        for size in (1, 7, 64, 1 << 16):
+            with self.subTest(size=size):
+                self.assertEqual(list(cg.iter_polarity(io.StringIO(TEXT), size)), expected)
+
+    def test_report(self):
+        report = cg.analyze_polarity(io.StringIO(TEXT))
+        polarity = report["polarity"]
+        self.assertEqual(polarity["acceptable"] + polarity["flagged"], report["shadow_count"])
+        # "Nothing about the government" is a negation cue within the window
+        self.assertEqual(dict(polarity["top_acceptable"]),
+                         {"UNDERSTAND": 6, "IMPOSSIBLE": 6, "GOVERNMENT": 6})
+        self.assertEqual(dict(polarity["top_flagged"]),
+                         {"UNDERSTAND": 6, "IMPOSSIBLE": 6, "UNDO": 6})
+
+class ShadowTestRoutingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        path = os.path.join(self.tmp, "lexicon.bin")
+        cg.build_lexicon(["UNDERSTAND", "GOVERNMENT", "TABLE", "UNDO"], path)
+        self.saved = cg.LEXICON
+        cg.LEXICON = cg.Lexicon(path)
+
+    def tearDown(self):
+        cg.LEXICON.close()
+        cg.LEXICON = self.saved
+        for name in os.listdir(self.tmp):
+            os.remove(os.path.join(self.tmp, name))
+        os.rmdir(self.tmp)
+
+    def test_every_path_asks_the_lexicon(self):
+        paths = {
+            "collect_hits": lambda: cg.collect_hits(io.StringIO("understand")),
+            "_scan_line": lambda: cg._scan_line("government"),
+            "session": lambda: cg.AnalysisSession("table"),
+            "polarity": lambda: list(cg.PolarityMatcher().feed("undo")),
+        }
+        for name, run in paths.items():
+            with self.subTest(path=name):
+                cg.LEXICON.shadow_memo.clear()
+                run()
+                self.assertTrue(cg.LEXICON.shadow_memo, name)
+
+    def test_results_unchanged(self):
+        with_lexicon = cg.collect_hits(io.StringIO(TEXT))[0].report()
+        cg.LEXICON, lexicon = None, cg.LEXICON
+        try:
+            self.assertEqual(cg.collect_hits(io.StringIO(TEXT))[0].report(), with_lexicon)
+        finally:
+            cg.LEXICON = lexicon
+
+if __name__ == "__main__":
+    unittest.main()
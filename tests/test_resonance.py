@@ -0,0 +1,64 @@
+"""Resonance numbers (Part 10.3), scalar and batch"""
+
+import doctest
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+def _random_words(count, seed):
+    rng = random.Random(seed)
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-~1é "
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 20)))
+            for _ in range(count)]
+
+class ResonanceTest(unittest.TestCase):
+
+    def test_love(self):
+        self.assertEqual(cg.letter_sum("LOVE"), 54)
+        self.assertEqual(cg.calculate_resonance("LOVE"), 9)
+
+    def test_master_numbers_survive(self):
+        self.assertEqual(cg.calculate_resonance("K"), 11)
+        self.assertEqual(cg.calculate_resonance("KK"), 22)
+        self.assertEqual(cg.reduce_resonance(29), 11)
+        self.assertEqual(cg.reduce_resonance(38), 11)
+        self.assertEqual(cg.reduce_resonance(99), 99)
+        self.assertEqual(cg.reduce_resonance(100), 1)
+
+    def test_reduces_to_one_digit(self):
+        for total in range(200):
+            result = cg.reduce_resonance(total)
+            self.assertTrue(result <= 9 or result in cg.MASTER_NUMBERS, total)
+
+    def test_case_and_whitespace(self):
+        for word in ("love", "Love", "lOvE", " LOVE\n"):
+            self.assertEqual(cg.calculate_resonance(word), 9, word)
+
+    def test_non_letters_count_zero(self):
+        self.assertEqual(cg.calculate_resonance(""), 0)
+        self.assertEqual(cg.letter_sum("ab1cd"), cg.letter_sum("abcd"))
+        self.assertEqual(cg.letter_sum("café"), cg.letter_sum("caf"))
+
+    def test_batch_matches_scalar(self):
+        words = ["LOVE", "K", "KK", "", "Café", "in~form"] + _random_words(3000, 10)
+        sums, reduced = cg.calculate_resonance_batch(words)
+        self.assertEqual(sums.tolist(), [cg.letter_sum(word.strip()) for word in words])
+        self.assertEqual(reduced.tolist(), [cg.calculate_resonance(word) for word in words])
+
+    def test_batch_empty(self):
+        sums, reduced = cg.calculate_resonance_batch([])
+        self.assertEqual((len(sums), len(reduced)), (0, 0))
+
+class DoctestTest(unittest.TestCase):
+
+    def test_module_doctests(self):
+        failures, _ = doctest.testmod(cg)
+        self.assertEqual(failures, 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""ResultCache storage, lookup and eviction"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+def _tally(text):
+    tally = cg.AnalysisTally()
+    tally.add_text(text)
+    return tally
+
+def _counts(tally):
+    return tally.words, dict(tally.shadows), dict(tally.homophones)
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "cache", "results.sqlite")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path, os.path.getsize(path)
+
+    def test_store_and_get(self):
+        tally = _tally("The government shared information. Good morning.")
+        with cg.ResultCache(self.path) as cache:
+            self.assertIsNone(cache.get("abc"))
+            cache.store([("abc", tally)])
+            self.assertEqual(_counts(cache.get("abc")), _counts(tally))
+            self.assertEqual(cache.stats["stored"], 1)
+        with cg.ResultCache(self.path) as cache:
+            self.assertEqual(_counts(cache.get("abc")), _counts(tally))
+
+    def test_lookup_files(self):
+        first = self.write("a.txt", "undo the government")
+        second = self.write("b.txt", "our hour")
+        with cg.ResultCache(self.path) as cache:
+            missing, hits, digests = cache.lookup_files([first, second])
+            self.assertEqual((missing, hits), ([first, second], []))
+            cache.store([(digests[first[0]], _tally("undo the government"))])
+            missing, hits, _ = cache.lookup_files([first, second])
+            self.assertEqual(missing, [second])
+            self.assertEqual([(path, _counts(t)) for path, t in hits],
+                             [(first[0], _counts(_tally("undo the government")))])
+            self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (1, 3))
+
+    def test_changed_content_misses(self):
+        path, size = self.write("a.txt", "government")
+        with cg.ResultCache(self.path) as cache:
+            _, _, digests = cache.lookup_files([(path, size)])
+            cache.store([(digests[path], _tally("government"))])
+            path, size = self.write("a.txt", "experiment")
+            os.utime(path, ns=(1, 1))
+            missing, hits, _ = cache.lookup_files([(path, size)])
+            self.assertEqual((missing, hits), ([(path, size)], []))
+
+    def test_other_database_version_misses(self):
+        with cg.ResultCache(self.path) as cache:
+            cache.store([("abc", _tally("undo"))])
+            cache.version = "other"
+            self.assertIsNone(cache.get("abc"))
+
+    def test_evict_by_size_keeps_recent(self):
+        with cg.ResultCache(self.path) as cache:
+            for name in ("old", "mid", "new"):
+                cache.store([(name, _tally("the government " * 20))])
+                time.sleep(0.01)
+            cache.get("old")
+            size = cache.db.execute("SELECT size FROM results WHERE digest = 'old'").fetchone()[0]
+            cache.max_bytes = 2 * size
+            self.assertEqual(cache.evict(), 1)
+            self.assertIsNone(cache.get("mid"))
+            self.assertIsNotNone(cache.get("old"))
+            self.assertIsNotNone(cache.get("new"))
+            self.assertEqual(cache.stats["evicted"], 1)
+
+    def test_evict_by_age(self):
+        with cg.ResultCache(self.path, max_age=60) as cache:
+            cache.store([("stale", _tally("undo")), ("fresh", _tally("undo"))])
+            with cache.db:
+                cache.db.execute("UPDATE results SET accessed = ? WHERE digest = 'stale'",
+                                 (time.time() - 3600,))
+            self.assertEqual(cache.evict(), 1)
+            self.assertIsNone(cache.get("stale"))
+            self.assertIsNotNone(cache.get("fresh"))
+
+    def test_corrupt_database_is_recreated(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"this is not a sqlite database" * 100)
+        with cg.ResultCache(self.path) as cache:
+            cache.store([("abc", _tally("undo"))])
+            self.assertIsNotNone(cache.get("abc"))
+
+    def test_scan_corpus_uses_cache(self):
+        root = os.path.join(self.tmp, "corpus")
+        os.makedirs(root)
+        for i in range(3):
+            with open(os.path.join(root, f"{i}.txt"), "w", encoding="utf-8") as f:
+                f.write("The government shared information. " * (i + 1))
+        with cg.ResultCache(self.path) as cache:
+            _, cold = cg.scan_corpus(root, workers=1, cache=cache)
+            _, warm = cg.scan_corpus(root, workers=1, cache=cache)
+            self.assertEqual(cache.stats["misses"], 3)
+            self.assertEqual(cache.stats["hits"], 3)
+        self.assertEqual(_counts(warm), _counts(cold))
+        self.assertEqual(cold.shadows["GOVERNMENT"], 6)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Revision diffs (Part 12.2) against full re-analysis"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+LINES = ["The government shared information.", "Good morning to you.",
+         "We understand the experiment.", "A quiet river.", "Our hour has come.",
+         "IN; AS; FOR: Acme", "Plain words only.", "Undo the knot."]
+
+def _apply(old, opcodes, new):
+    """Rebuild new from old using opcodes, taking replacement lines from new"""
+    result = list(old)
+    for _, i1, i2, j1, j2 in reversed(opcodes):
+        result[i1:i2] = new[j1:j2]
+    return result
+
+def _mutate(lines, rng, edits):
+    lines = list(lines)
+    for _ in range(edits):
+        i = rng.randrange(len(lines) + 1)
+        action = rng.randrange(3)
+        if action == 0 or not lines:
+            lines.insert(i, rng.choice(LINES))
+        elif action == 1 and i < len(lines):
+            del lines[i]
+        elif i < len(lines):
+            lines[i] = rng.choice(LINES) + f" {i}"
+    return lines
+
+class LineOpcodesTest(unittest.TestCase):
+
+    def test_identical(self):
+        self.assertEqual(cg._line_opcodes(LINES, list(LINES)), [])
+
+    def test_opcodes_rebuild_the_new_lines(self):
+        rng = random.Random(25)
+        for trial in range(200):
+            old = [f"line {rng.randrange(50)}" for _ in range(rng.randrange(0, 400))]
+            new = _mutate(old, rng, rng.randrange(0, 30))
+            with self.subTest(trial=trial):
+                opcodes = cg._line_opcodes(old, new)
+                self.assertEqual(_apply(old, opcodes, new), new)
+                for tag, i1, i2, j1, j2 in opcodes:
+                    self.assertNotEqual(old[i1:i2], new[j1:j2])
+
+    def test_large_gap_doubles_the_window(self):
+        old = [f"old {i}" for i in range(1000)] + ["same"] * 5
+        new = [f"new {i}" for i in range(300)] + ["same"] * 5
+        self.assertEqual(_apply(old, cg._line_opcodes(old, new), new), new)
+
+class RevisionHistoryTest(unittest.TestCase):
+
+    def assert_matches_full(self, diff, text, history):
+        self.assertEqual(history.session.text, text)
+        full = cg.analyze_text(text)
+        report = dict(diff.report)
+        # Tied counts may be listed in a different order after edits
+        for key in ("top_shadows", "top_homophones"):
+            self.assertEqual(dict(report.pop(key)), dict(full.pop(key)))
+        self.assertEqual(report, full)
+
+    def test_random_revisions_match_full_analysis(self):
+        rng = random.Random(11)
+        history = cg.RevisionHistory()
+        lines = list(LINES)
+        for _ in range(40):
+            lines = _mutate(lines, rng, rng.randrange(1, 6))
+            text = "\n".join(lines)
+            self.assert_matches_full(history.add(text), text, history)
+
+    def test_shadows_added_and_removed(self):
+        history = cg.RevisionHistory()
+        first = history.add("The government met.\nA quiet river.")
+        self.assertIsNone(first.score_delta)
+        self.assertEqual(first.shadows_added, [("GOVERNMENT", 1)])
+        diff = history.add("The information met.\nA quiet river.")
+        self.assertEqual(diff.shadows_added, [("INFORMATION", 1)])
+        self.assertEqual(diff.shadows_removed, [("GOVERNMENT", 1)])
+        self.assertEqual(diff.score_delta, 0.0)
+        diff = history.add("The people met.\nA quiet river.")
+        self.assertEqual(diff.shadows_removed, [("INFORMATION", 1)])
+        self.assertGreater(diff.score_delta, 0)
+
+    def test_chains_changed(self):
+        history = cg.RevisionHistory()
+        history.add("Preamble\nIN; AS; FOR: Acme\nEnd")
+        diff = history.add("Preamble\nIN;AS;FOR: Acme\nEnd")
+        self.assertEqual([(c.line, c.problems) for c in diff.chains_added], [(2, ("spacing",))])
+        self.assertEqual([(c.line, c.problems) for c in diff.chains_removed], [(2, ())])
+        diff = history.add("Preamble\nIN;AS;FOR: Acme\nEnd\nmore")
+        self.assertEqual((diff.chains_added, diff.chains_removed), ([], []))
+
+    def test_moved_lines_are_not_rescanned(self):
+        history = cg.RevisionHistory()
+        history.add("\n".join(LINES))
+        moved = LINES[4:] + LINES[:4]
+        diff = history.add("\n".join(moved))
+        self.assertEqual(diff.lines_scanned, 0)
+        self.assertEqual((diff.shadows_added, diff.shadows_removed), ([], []))
+        self.assert_matches_full(diff, "\n".join(moved), history)
+
+    def test_diff_revisions_files(self):
+        paths = []
+        try:
+            for text in ("The government.", "The government and information."):
+                with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".txt",
+                                                 delete=False) as f:
+                    f.write(text)
+                paths.append(f.name)
+            diffs = list(cg.diff_revisions(paths))
+        finally:
+            for path in paths:
+                os.remove(path)
+        self.assertEqual([diff.label for diff in diffs], paths)
+        self.assertEqual(diffs[1].shadows_added, [("INFORMATION", 1)])
+
+if __name__ == "__main__":
+    unittest.main()
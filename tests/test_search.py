@@ -0,0 +1,54 @@
+"""The search index must find what the linear scan finds"""
+
+import os
+import random
+import re
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+def _manual_terms(count, seed):
+    """Distinct single terms from the manual plus fragments of them"""
+    words = sorted(set(re.findall(r"\S+", "\n".join(map(cg.manual_text, cg.MANUAL_CONTENT)))))
+    rng = random.Random(seed)
+    terms = rng.sample(words, count)
+    terms += [word[1:4] for word in terms if len(word) > 4]
+    # AND and OR are query operators, not terms
+    return [term for term in terms if '"' not in term and term not in ("AND", "OR")]
+
+class SearchIndexTest(unittest.TestCase):
+
+    def test_single_terms_match_linear_scan(self):
+        for term in ["tilde", "SHADOW", "in~formation", "ab", "x", "part",
+                     "⭐", "IN;"] + _manual_terms(200, 1):
+            with self.subTest(term=term):
+                self.assertEqual(sorted(cg.search_manual(term)),
+                                 sorted(cg.search_manual_linear(term)))
+
+    def test_exact_token_ranks_first(self):
+        results = cg.search_manual("form")
+        self.assertIn("form", re.findall(cg._TOKEN_PATTERN, results[0][2].lower()))
+
+    def test_and_or_queries(self):
+        shadow = set(cg.search_manual_linear("shadow"))
+        tilde = set(cg.search_manual_linear("tilde"))
+        self.assertEqual(set(cg.search_manual("shadow tilde")), shadow & tilde)
+        self.assertEqual(set(cg.search_manual("shadow AND tilde")), shadow & tilde)
+        self.assertEqual(set(cg.search_manual("shadow OR tilde")), shadow | tilde)
+
+    def test_phrase_and_prefix(self):
+        self.assertEqual(sorted(cg.search_manual('"sovereign alternatives"')),
+                         sorted(cg.search_manual_linear("sovereign alternatives")))
+        index = cg.get_search_index()
+        for part, line, text in cg.search_manual("homophon*"):
+            self.assertIn((part, line), index.prefix("homophon"))
+
+    def test_no_match(self):
+        self.assertEqual(cg.search_manual("zzqxv"), [])
+        self.assertEqual(cg.search_manual(""), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""AnalysisService driven through ServiceClient, standing in for local tools"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+class AnalysisServiceTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        # A wide batch window so concurrent requests are sure to share a batch
+        self.service = cg.AnalysisService(window=0.05)
+        server = await self.service.start("127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self.clients = []
+
+    async def asyncTearDown(self):
+        for client in self.clients:
+            await client.close()
+        await self.service.close()
+
+    async def connect(self):
+        client = await cg.ServiceClient.connect("127.0.0.1", self.port)
+        self.clients.append(client)
+        return client
+
+    async def test_ping_and_stats(self):
+        client = await self.connect()
+        self.assertEqual(await client.request("ping"), "pong")
+        stats = await client.request("stats")
+        self.assertEqual(stats["requests_by_op"], {"ping": 1})
+
+    async def test_detect_matches_scalar(self):
+        client = await self.connect()
+        words = ["INFORMATION", "table", "undo", "INTERNAL", ""]
+        result = await client.request("detect", words=words)
+        self.assertEqual(result["vcc"], [cg.detect_vcc(word) for word in words])
+
+    async def test_concurrent_requests_are_batched(self):
+        clients = [await self.connect() for _ in range(4)]
+        words = [["INFORMATION", "table"], ["EXPERIMENT"], ["undo", "river"], ["garden"]]
+        results = await asyncio.gather(*(client.request("detect", words=w)
+                                         for client, w in zip(clients, words)))
+        for w, result in zip(words, results):
+            self.assertEqual(result["vcc"], [cg.detect_vcc(word) for word in w])
+        stats = await clients[0].request("stats")
+        self.assertLess(stats["batches"], len(words))
+
+    async def test_bad_request_fails_only_its_own_client(self):
+        good, bad = await self.connect(), await self.connect()
+        results = await asyncio.gather(good.request("detect", words=["INFORMATION"]),
+                                       bad.request("detect", words=[1, None]),
+                                       return_exceptions=True)
+        self.assertEqual(results[0]["vcc"], [True])
+        self.assertIsInstance(results[1], RuntimeError)
+
+    async def test_batch_error_reaches_only_its_request(self):
+        calls = []
+
+        def func(words):
+            calls.append(list(words))
+            if "BOOM" in words:
+                raise ValueError("bad word")
+            return [[word.lower() for word in words]]
+
+        batcher = cg._RequestBatcher(func, cg.ServiceStats(), window=0.05)
+        try:
+            results = await asyncio.gather(batcher.submit(["A", "B"]),
+                                           batcher.submit(["BOOM"]),
+                                           return_exceptions=True)
+        finally:
+            batcher.task.cancel()
+        self.assertEqual(results[0], [["a", "b"]])
+        self.assertIsInstance(results[1], ValueError)
+        self.assertEqual(calls[0], ["A", "B", "BOOM"])
+
+    async def test_words_must_be_a_list_of_strings(self):
+        client = await self.connect()
+        for words in ("rain", [1, None], None, {"a": 1}):
+            with self.assertRaises(RuntimeError):
+                await client.request("detect", words=words)
+            with self.assertRaises(RuntimeError):
+                await client.request("resonance", words=words)
+        result = await client.request("resonance", words=["LOVE"])
+        self.assertEqual(result["resonance"], [9])
+
+    async def test_close_with_connected_clients(self):
+        client = await self.connect()
+        await client.request("ping")
+        await self.service.close()
+        self.assertEqual(self.service.connections, {})
+        await asyncio.wait_for(client.listener, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""AnalysisSession running totals under edits"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+TEXT = ("The government shared information.\n"
+        "Good morning, we understand.\n"
+        "\n"
+        "Our hour of profit; the experiment is whole.")
+
+WORDS = ["government", "information", "morning", "our", "hour", "table", "the",
+         "understand", "river", "profit", "naïve", "in~form", "\n", " ", ", ", ".\n"]
+
+class AnalysisSessionTest(unittest.TestCase):
+
+    def assert_consistent(self, session):
+        consistent, full = session.verify()
+        self.assertTrue(consistent)
+        report = session.report()
+        # Tied counts may be listed in a different order after edits
+        for key in ("top_shadows", "top_homophones"):
+            self.assertEqual(dict(report.pop(key)), dict(full.pop(key)))
+        self.assertEqual(report, full)
+
+    def test_initial_text(self):
+        session = cg.AnalysisSession(TEXT)
+        self.assertEqual(session.text, TEXT)
+        self.assertEqual(len(session), 4)
+        self.assertEqual(session.report(), cg.analyze_text(TEXT))
+        self.assert_consistent(session)
+
+    def test_line_operations(self):
+        session = cg.AnalysisSession(TEXT)
+        session.set_line(2, "Information about the government")
+        session.insert_lines(0, ["UNDERSTAND", "table"])
+        session.delete_lines(1)
+        session.delete_lines(3, 5)
+        self.assertEqual(session.lines, ["UNDERSTAND", "The government shared information.",
+                                         "Good morning, we understand."])
+        self.assert_consistent(session)
+        self.assertEqual(session.tally.shadows["UNDERSTAND"], 2)
+
+    def test_edits_across_lines(self):
+        session = cg.AnalysisSession(TEXT)
+        session.edit((0, 4), (1, 4), "information\nis")
+        self.assertEqual(session.lines[0], "The information")
+        self.assertEqual(session.lines[1], "is morning, we understand.")
+        session.edit((0, 0), (0, 0), "Government\n")
+        session.edit((3, 0), (4, 10), "")
+        self.assert_consistent(session)
+
+    def test_random_edits_stay_consistent(self):
+        rng = random.Random(7)
+        session = cg.AnalysisSession(TEXT)
+        for _ in range(300):
+            start_line = rng.randrange(len(session))
+            end_line = rng.randrange(start_line, min(len(session), start_line + 3))
+            start_col = rng.randrange(len(session.lines[start_line]) + 1)
+            end_col = rng.randrange(len(session.lines[end_line]) + 1)
+            if end_line == start_line and end_col < start_col:
+                start_col, end_col = end_col, start_col
+            text = "".join(rng.choice(WORDS) for _ in range(rng.randrange(4)))
+            session.edit((start_line, start_col), (end_line, end_col), text)
+            consistent, _ = session.verify()
+            self.assertTrue(consistent)
+        self.assert_consistent(session)
+
+    def test_shadow_lines(self):
+        session = cg.AnalysisSession(TEXT)
+        self.assertEqual(list(session.shadow_lines()),
+                         [(0, "GOVERNMENT"), (0, "INFORMATION"), (1, "UNDERSTAND"),
+                          (3, "EXPERIMENT")])
+
+    def test_bad_ranges(self):
+        session = cg.AnalysisSession(TEXT)
+        with self.assertRaises(IndexError):
+            session.replace_lines(3, 9, [])
+        with self.assertRaises(IndexError):
+            session.edit((0, 0), (7, 0), "")
+        with self.assertRaises(ValueError):
+            session.edit((1, 2), (1, 1), "")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+"""SRT/WebVTT cue parsing and windowed transcript alerts (Part 12.3)"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+SRT = ("﻿1\r\n00:00:01,000 --> 00:00:02,500\r\n<i>The government</i> shared\r\n"
+       "information &amp; more\r\n\r\n"
+       "2\n00:00:03,000 --> 00:00:04,000\n{\\an8}Good morning\n\n"
+       "3\n00:01:05,250 --> 00:01:06,000\nlast cue without a blank line")
+
+VTT = ("WEBVTT - title\n\n"
+       "NOTE a comment\nspanning lines\n\n"
+       "STYLE\n::cue { color: yellow }\n\n"
+       "REGION\nid:fred width:40%\n\n"
+       "intro\n00:01.000 --> 00:02.000 align:start position:10%\n"
+       "<v Speaker>We <c.yellow>understand</c><00:01.500> you\n\n"
+       "01:00:00.000 --> 01:00:01.000\nno identifier\n\n"
+       "just some text\nwithout timing\n")
+
+def _cues(text):
+    return list(cg.iter_cues(io.StringIO(text)))
+
+def _cue(start, text, length=1.0):
+    return cg.Cue(0, start, start + length, text)
+
+class CueParserTest(unittest.TestCase):
+
+    def test_srt(self):
+        self.assertEqual(_cues(SRT), [
+            cg.Cue(1, 1.0, 2.5, "The government shared information & more"),
+            cg.Cue(2, 3.0, 4.0, "Good morning"),
+            cg.Cue(3, 65.25, 66.0, "last cue without a blank line"),
+        ])
+
+    def test_webvtt_skips_header_and_blocks(self):
+        self.assertEqual(_cues(VTT), [
+            cg.Cue(1, 1.0, 2.0, "We understand you"),
+            cg.Cue(2, 3600.0, 3601.0, "no identifier"),
+        ])
+
+    def test_feed_line(self):
+        parser = cg.CueParser()
+        self.assertIsNone(parser.feed_line("00:00:01,000 --> 00:00:02,000\n"))
+        self.assertIsNone(parser.feed_line("hello\n"))
+        self.assertEqual(parser.feed_line("\n"), cg.Cue(1, 1.0, 2.0, "hello"))
+        self.assertIsNone(parser.close())
+
+    def test_timestamps(self):
+        self.assertEqual(cg.parse_timestamp("00:00:01,5"), 1.5)
+        self.assertEqual(cg.format_timestamp(3723.45), "01:02:03.450")
+
+    def test_follow_reads_the_file(self):
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".srt",
+                                         delete=False) as f:
+            f.write(SRT)
+        try:
+            cues = list(cg.iter_cues(f.name, follow=True, poll=0.01, idle_timeout=0.02))
+        finally:
+            os.remove(f.name)
+        self.assertEqual([cue.text for cue in cues], [cue.text for cue in _cues(SRT)])
+
+class TranscriptMonitorTest(unittest.TestCase):
+
+    def test_cue_report(self):
+        monitor = cg.TranscriptMonitor()
+        report = monitor.add(_cue(0, "The government said our hour is information"))
+        self.assertEqual(report.words, 7)
+        self.assertEqual(report.shadows, ("GOVERNMENT", "INFORMATION"))
+        self.assertEqual(report.homophones, ("OUR", "HOUR"))
+        self.assertIsNone(report.alert)
+
+    def test_needs_min_words(self):
+        monitor = cg.TranscriptMonitor(min_words=20)
+        report = monitor.add(_cue(0, "government information undo"))
+        self.assertIsNone(report.alert)
+
+    def test_alerts_are_edge_triggered_and_rearm(self):
+        monitor = cg.TranscriptMonitor(window=10, threshold=20, min_words=10)
+        dense = "the government shared information and we understand the experiment"
+        clean = "the river runs past a quiet garden in the early light today"
+        alerts = []
+        timeline = [dense] * 3 + [clean] * 12 + [dense] * 6
+        for second, text in enumerate(timeline):
+            alerts.append(monitor.add(_cue(second * 2.0, text)).alert)
+        # One alert per rise above the threshold, none while it stays there
+        raised = [i for i, alert in enumerate(alerts) if alert]
+        self.assertEqual(len(raised), 2)
+        self.assertEqual(raised[0], 1)
+        self.assertEqual(raised[1], 18)
+        first = alerts[raised[0]]
+        self.assertEqual((first.start, first.end, first.words), (0.0, 3.0, 18))
+        self.assertEqual(first.hits, 8)
+        self.assertEqual(first.percent, round(100 * 8 / 18, 2))
+        self.assertEqual(len(monitor.alerts), 2)
+
+    def test_window_drops_old_cues(self):
+        monitor = cg.TranscriptMonitor(window=5, min_words=1)
+        monitor.add(_cue(0, "government government"))
+        monitor.add(_cue(10, "river"))
+        self.assertEqual((monitor.window_words, sum(monitor.window_hits.values())), (1, 0))
+
+    def test_report(self):
+        monitor = cg.TranscriptMonitor()
+        for cue in _cues(SRT):
+            monitor.add(cue)
+        report = monitor.report()
+        expected = cg.analyze_text(" ".join(cue.text for cue in _cues(SRT)))
+        self.assertEqual(report["cues"], 3)
+        self.assertEqual((report["words"], report["shadow_count"], report["homophone_count"]),
+                         (expected["words"], expected["shadow_count"],
+                          expected["homophone_count"]))
+        self.assertEqual(report["alerts"], [])
+
+if __name__ == "__main__":
+    unittest.main()
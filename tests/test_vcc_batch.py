@@ -0,0 +1,68 @@
+"""detect_vcc_batch must agree with the scalar detector word for word"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codexglyph_manual_complete as cg
+
+EDGE_WORDS = [
+    "", "a", "IN", "INF", "INFO", "info", "Information", "INFORMATION",
+    "INTERNAL", "UNDERSTAND", "UNDO", "IMMUNE", "IMPEDE", "IMAGE", "IMNX",
+    "ILLUMINATE", "ILKS", "IRRADIATE", "IRKS", "OBJECT", "ABSTRACT",
+    "EXPERIMENT", "ATTENTION", "AEIOU", "in-form", "in~form", "ïnform",
+    "INFORMÉ", "ab1cd", "OBJ3CT", "  INFO", "ADJUST ", "x" * 300,
+    "IN" + "F" * 300,
+]
+
+def _random_words(count, seed):
+    rng = random.Random(seed)
+    prefixes = cg.vcc_rules().prefixes + cg.vcc_rules().excluded + ("", "A", "E", "OU")
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-~1é"
+    words = []
+    for _ in range(count):
+        body = "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 12)))
+        words.append(rng.choice(prefixes) + body)
+    return words
+
+class DetectVccBatchTest(unittest.TestCase):
+
+    def assert_matches_scalar(self, words):
+        is_vcc, types = cg.detect_vcc_batch(words)
+        self.assertEqual(len(is_vcc), len(words))
+        self.assertEqual(len(types), len(words))
+        operational = cg.vcc_rules().operational
+        for word, flag, code in zip(words, is_vcc.tolist(), types.tolist()):
+            prefix = cg.vcc_prefix(word)
+            expected = (cg.PREFIX_NONE if prefix is None
+                        else cg.PREFIX_OPERATIONAL if prefix in operational
+                        else cg.PREFIX_POSITIONAL)
+            self.assertEqual(flag, cg.detect_vcc(word), word)
+            self.assertEqual(code, expected, word)
+
+    def test_empty_input(self):
+        is_vcc, types = cg.detect_vcc_batch([])
+        self.assertEqual(len(is_vcc), 0)
+        self.assertEqual(len(types), 0)
+
+    def test_edge_cases(self):
+        self.assert_matches_scalar(EDGE_WORDS)
+
+    def test_single_word(self):
+        for word in ("INFORMATION", "", "table"):
+            self.assert_matches_scalar([word])
+
+    def test_random_words(self):
+        for seed in range(5):
+            self.assert_matches_scalar(_random_words(2000, seed))
+
+    def test_generator_input(self):
+        words = _random_words(500, 99)
+        is_vcc, _ = cg.detect_vcc_batch(word for word in words)
+        self.assertEqual(is_vcc.tolist(), [cg.detect_vcc(word) for word in words])
+
+if __name__ == "__main__":
+    unittest.main()